@@ -0,0 +1,265 @@
+import math
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from starlette.exceptions import HTTPException
+from google.adk.plugins.base_plugin import BasePlugin
+from resilience import LatencyTracker
+
+
+
+logger = logging.getLogger(__name__)
+# Whom a request is running for, so downstream limiters (MCP) can queue fairly.
+current_user = contextvars.ContextVar("trendpup_user", default="anonymous")
+
+
+
+class AdmissionRejected(HTTPException):
+    # A Starlette HTTPException so a caller that checks admission before
+    # starting the response can answer 429 with a Retry-After header.
+    def __init__(self, scope: str, reason: str, retry_after: float):
+        self.scope = scope
+        self.reason = reason
+        self.retry_after = max(retry_after, 0.1)
+        super().__init__(
+            status_code=429,
+            detail=f"{scope} is busy ({reason}), retry after {self.retry_after:.1f}s",
+            headers={"Retry-After": str(math.ceil(self.retry_after))},
+        )
+
+    def result(self) -> dict:
+        return {"success": False, "busy": True, "error": self.detail, "retry_after": round(self.retry_after, 2)}
+
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        # 0 when a token was taken, otherwise the seconds until one is available.
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+
+class _Waiter:
+    def __init__(self, user: str, loop=None):
+        self.user = user
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+        self.enqueued = time.monotonic()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+
+class FairLimiter:
+    # Global concurrency limit with a bounded wait queue. Waiters are queued
+    # per user and freed slots go round-robin across users, so one user with
+    # many requests in flight cannot push everyone else to the back. Async and
+    # threaded callers share the same slots.
+    def __init__(self, scope: str, max_concurrent: int, max_queue: int, max_wait: float,
+                 user_rate: float = 0, user_burst: float = 0, max_users: int = 10000):
+        self.scope = scope
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.user_rate = user_rate
+        self.user_burst = user_burst or max(1.0, user_rate)
+        self.max_users = max_users
+        self.active = 0
+        self.queued = 0
+        self._queues = OrderedDict()
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.waits = LatencyTracker(window=1000, min_samples=1)
+        self.admitted = 0
+        self.rejected = {}
+        self.wait_seconds = 0.0
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return AdmissionRejected(self.scope, reason, retry_after)
+
+    def _retry_after(self) -> float:
+        p50 = self.waits.percentile("wait", 0.5) or 0
+        return max(1.0, p50 * 2)
+
+    def _admit(self, user: str, loop=None):
+        # Runs under the lock: a free slot, a rejection or a waiter to block on.
+        if self.user_rate > 0:
+            bucket = self._buckets.get(user)
+            if bucket is None:
+                bucket = self._buckets[user] = TokenBucket(self.user_rate, self.user_burst)
+                while len(self._buckets) > self.max_users:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(user)
+            wait = bucket.take()
+            if wait > 0:
+                return self._reject("rate_limited", wait)
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+            return None
+        if self.queued >= self.max_queue:
+            return self._reject("queue_full", self._retry_after())
+        waiter = _Waiter(user, loop)
+        self._queues.setdefault(user, deque()).append(waiter)
+        self.queued += 1
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        # True if the slot was handed over before the waiter gave up.
+        with self._lock:
+            if waiter.granted:
+                return True
+            queue = self._queues.get(waiter.user)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                self.queued -= 1
+                if not queue:
+                    del self._queues[waiter.user]
+            return False
+
+    def _admitted(self, waited: float):
+        with self._lock:
+            self.admitted += 1
+            self.wait_seconds += waited
+        self.waits.observe("wait", waited)
+
+    async def acquire_async(self, user: str = None):
+        user = user or current_user.get()
+        with self._lock:
+            outcome = self._admit(user, asyncio.get_running_loop())
+        if outcome is None:
+            self._admitted(0)
+            return
+        if isinstance(outcome, AdmissionRejected):
+            raise outcome
+        try:
+            await asyncio.wait_for(asyncio.shield(outcome.future), self.max_wait)
+        except asyncio.TimeoutError:
+            if not self._abandon(outcome):
+                with self._lock:
+                    raise self._reject("queue_timeout", self._retry_after())
+        except asyncio.CancelledError:
+            if self._abandon(outcome):
+                self.release()
+            raise
+        self._admitted(time.monotonic() - outcome.enqueued)
+
+    def acquire(self, user: str = None):
+        user = user or current_user.get()
+        with self._lock:
+            outcome = self._admit(user)
+        if outcome is None:
+            self._admitted(0)
+            return
+        if isinstance(outcome, AdmissionRejected):
+            raise outcome
+        if not outcome.event.wait(self.max_wait) and not self._abandon(outcome):
+            with self._lock:
+                raise self._reject("queue_timeout", self._retry_after())
+        self._admitted(time.monotonic() - outcome.enqueued)
+
+    def release(self):
+        with self._lock:
+            waiter = None
+            while self._queues and waiter is None:
+                user, queue = next(iter(self._queues.items()))
+                waiter = queue.popleft()
+                self.queued -= 1
+                if queue:
+                    self._queues.move_to_end(user)
+                else:
+                    del self._queues[user]
+            if waiter is None:
+                self.active -= 1
+                return
+            # The slot passes straight to the next user in turn.
+            waiter.granted = True
+        waiter.wake()
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth = {user: len(queue) for user, queue in self._queues.items()}
+            stats = {
+                "active": self.active,
+                "queued": self.queued,
+                "waiting_users": len(depth),
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "wait_seconds": self.wait_seconds,
+            }
+        stats["wait_p50"] = self.waits.percentile("wait", 0.5)
+        stats["wait_p95"] = self.waits.percentile("wait", 0.95)
+        stats["max_user_depth"] = max(depth.values(), default=0)
+        return stats
+
+
+
+class AdmissionPlugin(BasePlugin):
+    # `admit` runs as the root agent's before_agent_callback. By then /run_sse
+    # has already started streaming, so a rejection cannot become an HTTP
+    # status; the caller turns it into a reply instead. Turns are keyed by
+    # session: the frontend sends one user id for every visitor. The plugin's
+    # run hooks release the slot however the run ends; slots held longer than
+    # `max_hold` are reclaimed in case a run never reported back.
+    def __init__(self, limiter: FairLimiter, max_hold: float = 600):
+        super().__init__(name="admission")
+        self.limiter = limiter
+        self.max_hold = max_hold
+        self._held = {}
+        self._lock = threading.Lock()
+
+    def _reap(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [invocation for invocation, started in self._held.items() if now - started > self.max_hold]
+            for invocation in stale:
+                del self._held[invocation]
+        for invocation in stale:
+            logger.warning(f"Reclaiming admission slot held by invocation {invocation}")
+            self.limiter.release()
+
+    def _release(self, invocation_id: str):
+        with self._lock:
+            held = self._held.pop(invocation_id, None)
+        if held is not None:
+            self.limiter.release()
+
+    async def admit(self, callback_context):
+        self._reap()
+        key = callback_context.session.id or callback_context.user_id or "anonymous"
+        current_user.set(key)
+        await self.limiter.acquire_async(key)
+        with self._lock:
+            self._held[callback_context.invocation_id] = time.monotonic()
+        return None
+
+    def release(self, callback_context):
+        self._release(callback_context.invocation_id)
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        self._release(invocation_context.invocation_id)
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        self._release(invocation_context.invocation_id)
@@ -1,16 +1,33 @@
 import os
+import math
 import asyncio
 import logging
-import threading
-import time
-import json
-import requests
 from google.adk.agents import Agent
 from dotenv import load_dotenv
 from prompts import return_instructions_root
-from google.adk.tools import (google_search, FunctionTool, AgentTool)
-import requests
-import json
+from google.adk.tools import (google_search, FunctionTool, AgentTool, ToolContext)
+from google.genai import types
+from mcp_client import SonicMCPClient, parse_tool_content
+from mcp_cache import ToolResultCache, WRITE_TOOLS, normalize_arguments
+from singleflight import SingleFlight
+from token_index import TokenIndex
+from token_analytics import AnalyticsSnapshot
+from readme_index import ReadmeIndex
+from tweet_store import TweetStore
+from router import FastPathRouter
+from prefetch import ParallelPrefetch
+from projection import project_result, fit_budget
+from block_scanner import BlockRangeScanner, BlockDiskCache
+from portfolio import TokenMetadataCache, BALANCE_OF_ABI, resolve_tokens, value_holding
+from tx_tracker import ConfirmationTracker
+from transfer_queue import BulkTransferQueue, IdempotencyStore, is_native
+from telemetry import Telemetry
+from answer_cache import AnswerCache, DataVersion
+from model_tiers import TieredLlm
+from context_ledger import ContextLedger
+from admission import FairLimiter, AdmissionPlugin, AdmissionRejected
+from shared_cache import SharedCache
+from google.adk.apps import App
 
 
 
@@ -20,143 +37,246 @@ logger = logging.getLogger(__name__)
 
 
 
+README_PATH = os.getenv("README_PATH", os.path.join(os.path.dirname(__file__), '..', 'README.md'))
+TOKEN_DATA_PATH = os.getenv(
+    "TOKEN_DATA_PATH", os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'ai_analyzer.json')
+)
+TWEETS_PATH = os.getenv("TWEETS_PATH", os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'tweets.json'))
+# Set by serve.py so its worker processes share MCP results and parsed token data.
+shared_cache = SharedCache(
+    os.getenv("SHARED_CACHE_PATH"), max_bytes=int(os.getenv("SHARED_CACHE_BYTES", str(256 * 1024 * 1024)))
+) if os.getenv("SHARED_CACHE_PATH") else None
+mcp_client = SonicMCPClient()
+mcp_cache = ToolResultCache(shared=shared_cache)
+mcp_flights = SingleFlight()
+readme_index = ReadmeIndex(README_PATH)
+token_index = TokenIndex(TOKEN_DATA_PATH, shared=shared_cache)
+analytics_snapshot = AnalyticsSnapshot(token_index, os.getenv("ANALYTICS_SNAPSHOT_PATH") or None, shared=shared_cache)
+token_metadata = TokenMetadataCache()
+tweet_store = TweetStore(
+    TWEETS_PATH,
+    os.getenv("TWEET_STORE_PATH", os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'tweets.sqlite')),
+)
+context_ledger = ContextLedger(max_diff_ratio=float(os.getenv("CONTEXT_DIFF_MAX_RATIO", "0.5")))
+telemetry = Telemetry(
+    trace_spans=os.getenv("TRACE_SPANS", "0") == "1",
+    max_spans=int(os.getenv("TRACE_MAX_SPANS", "5000")),
+)
+
+
+
 def sonic_mcp_call(method: str, params: dict = None) -> dict:
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {},
-            "id": 1
-        }
-        response = requests.post(
-            "http://localhost:3002/api",
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=30
+    if method != "tools/call":
+        return mcp_client.call_sync(method, params)
+    name, arguments = params["name"], params.get("arguments", {})
+    cached = mcp_cache.get(name, arguments)
+    if cached is not None:
+        return cached
+    result = mcp_client.call_sync(method, params, idempotent=name not in WRITE_TOOLS)
+    mcp_cache.observe(name, arguments, result)
+    return result
+
+
+
+async def sonic_mcp_call_async(method: str, params: dict = None) -> dict:
+    if method != "tools/call":
+        return await mcp_client.call(method, params)
+    name, arguments = params["name"], params.get("arguments", {})
+    cached = await mcp_cache.get_async(name, arguments)
+    if cached is not None:
+        return cached
+    if name in WRITE_TOOLS:
+        result = await mcp_client.call(method, params)
+        track_submission(name, result)
+    else:
+        result = await mcp_flights.do(
+            (method, name, normalize_arguments(arguments)),
+            lambda: mcp_client.call(method, params, idempotent=True),
+            label=name,
         )
-        if response.status_code == 200:
-            result = response.json()
-            if "result" in result:
-                return {"success": True, "data": result["result"]}
-            elif "error" in result:
-                return {"success": False, "error": result["error"]}
-        else:
-            return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    await mcp_cache.observe_async(name, arguments, result)
+    return result
+
+
+
+async def sonic_mcp_batch_async(calls: list) -> list:
+    results = [None] * len(calls)
+    pending = []
+    for index, (method, params) in enumerate(calls):
+        if method == "tools/call":
+            results[index] = await mcp_cache.get_async(params["name"], params.get("arguments", {}))
+        if results[index] is None:
+            pending.append(index)
+    fetched = await mcp_client.call_batch(
+        [calls[index] for index in pending],
+        idempotent=not any(params.get("name") in WRITE_TOOLS for _, params in calls),
+    )
+    for index, result in zip(pending, fetched):
+        method, params = calls[index]
+        if method == "tools/call":
+            await mcp_cache.observe_async(params["name"], params.get("arguments", {}), result)
+        results[index] = result
+    return results
+
+
+
+async def fetch_receipts(tx_hashes: list) -> dict:
+    results = await sonic_mcp_batch_async([
+        ("tools/call", {"name": "get_transaction_receipt", "arguments": {"hash": tx_hash}})
+        for tx_hash in tx_hashes
+    ])
+    receipts = {}
+    for tx_hash, result in zip(tx_hashes, results):
+        content = parse_tool_content(result)
+        # Unmined transactions come back as an isError "could not be found" result.
+        if result["success"] and not result["data"].get("isError") and isinstance(content, dict):
+            receipts[tx_hash] = parse_tool_content(project_result("get_transaction_receipt", result))
+    return receipts
+
+
+
+tx_tracker = ConfirmationTracker(
+    fetch_receipts,
+    min_interval=float(os.getenv("TX_TRACKER_MIN_INTERVAL", "1")),
+    max_interval=float(os.getenv("TX_TRACKER_MAX_INTERVAL", "15")),
+    give_up_after=float(os.getenv("TX_TRACKER_GIVE_UP_AFTER", "600")),
+)
+
 
 
+def submitted_hash(result: dict) -> str:
+    # Transfers and approvals report `txHash`; write_contract reports `transactionHash`.
+    content = parse_tool_content(result)
+    if result.get("success") and not result["data"].get("isError") and isinstance(content, dict):
+        return content.get("txHash") or content.get("transactionHash")
+    return None
 
-def get_sonic_balance(address: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+
+
+def track_submission(name: str, result: dict):
+    tx_hash = submitted_hash(result)
+    if tx_hash:
+        tx_tracker.track(tx_hash, source=name)
+
+
+
+async def get_sonic_balance(address: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_balance",
         "arguments": {"address": address}
     })
 
 
 
-def get_sonic_token_info(token_address: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_sonic_token_info(token_address: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_token_info", 
         "arguments": {"tokenAddress": token_address}
     })
 
 
 
-def get_sonic_chain_info() -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_sonic_chain_info() -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_chain_info",
         "arguments": {}
     })
 
 
 
-def get_erc20_balance(address: str, token_address: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_erc20_balance(address: str, token_address: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_erc20_balance",
-        "arguments": {"address": address, "tokenAddress": token_address}
+        "arguments": {"holderAddress": address, "tokenAddress": token_address}
     })
 
 
 
-def get_token_balance(address: str, token_address: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_token_balance(address: str, token_address: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_token_balance",
-        "arguments": {"address": address, "tokenAddress": token_address}
+        "arguments": {"ownerAddress": address, "tokenAddress": token_address}
     })
 
 
 
-def get_latest_block() -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_latest_block(detail: str = "summary", fields: list[str] = None) -> dict:
+    result = await sonic_mcp_call_async("tools/call", {
         "name": "get_latest_block",
         "arguments": {}
     })
+    return project_result("get_latest_block", result, detail, fields)
 
 
 
-def get_block_by_number(block_number: int) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_block_by_number(block_number: int, detail: str = "summary", fields: list[str] = None) -> dict:
+    result = await sonic_mcp_call_async("tools/call", {
         "name": "get_block_by_number",
         "arguments": {"blockNumber": block_number}
     })
+    return project_result("get_block_by_number", result, detail, fields)
 
 
 
-def get_transaction(tx_hash: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_transaction(tx_hash: str, detail: str = "summary", fields: list[str] = None) -> dict:
+    result = await sonic_mcp_call_async("tools/call", {
         "name": "get_transaction",
-        "arguments": {"txHash": tx_hash}
+        "arguments": {"hash": tx_hash}
     })
+    return project_result("get_transaction", result, detail, fields)
 
 
 
-def get_transaction_receipt(tx_hash: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_transaction_receipt(tx_hash: str, detail: str = "summary", fields: list[str] = None) -> dict:
+    result = await sonic_mcp_call_async("tools/call", {
         "name": "get_transaction_receipt",
-        "arguments": {"txHash": tx_hash}
+        "arguments": {"hash": tx_hash}
     })
+    return project_result("get_transaction_receipt", result, detail, fields)
 
 
 
-def estimate_gas(to_address: str, data: str = "", value: str = "0") -> dict:
-    return sonic_mcp_call("tools/call", {
+async def estimate_gas(to_address: str, data: str = "", value: str = "0") -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "estimate_gas",
         "arguments": {"to": to_address, "data": data, "value": value}
     })
 
 
 
-def read_contract(contract_address: str, function_name: str, args: list = []) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def read_contract(contract_address: str, abi: list, function_name: str, args: list = [],
+                        detail: str = "summary", fields: list[str] = None) -> dict:
+    result = await sonic_mcp_call_async("tools/call", {
         "name": "read_contract",
         "arguments": {
             "contractAddress": contract_address,
+            "abi": abi,
             "functionName": function_name,
             "args": args
         }
     })
+    return project_result("read_contract", result, detail, fields)
 
 
 
-def is_contract(address: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def is_contract(address: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "is_contract",
         "arguments": {"address": address}
     })
 
 
 
-def get_supported_networks() -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_supported_networks() -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_supported_networks",
         "arguments": {}
     })
 
 
 
-def transfer_sonic_tokens(to_address: str, amount: str, private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def transfer_sonic_tokens(to_address: str, amount: str, private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "transfer_native",
         "arguments": {
             "to": to_address, 
@@ -167,11 +287,11 @@ def transfer_sonic_tokens(to_address: str, amount: str, private_key: str) -> dic
 
 
 
-def transfer_erc20_tokens(to_address: str, token_address: str, amount: str, private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def transfer_erc20_tokens(to_address: str, token_address: str, amount: str, private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "transfer_erc20",
         "arguments": {
-            "to": to_address,
+            "toAddress": to_address,
             "tokenAddress": token_address,
             "amount": amount,
             "privateKey": private_key
@@ -180,11 +300,11 @@ def transfer_erc20_tokens(to_address: str, token_address: str, amount: str, priv
 
 
 
-def transfer_token(to_address: str, token_address: str, amount: str, private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def transfer_token(to_address: str, token_address: str, amount: str, private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "transfer_token",
         "arguments": {
-            "to": to_address,
+            "toAddress": to_address,
             "tokenAddress": token_address,
             "amount": amount,
             "privateKey": private_key
@@ -193,11 +313,11 @@ def transfer_token(to_address: str, token_address: str, amount: str, private_key
 
 
 
-def approve_token_spending(spender_address: str, token_address: str, amount: str, private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def approve_token_spending(spender_address: str, token_address: str, amount: str, private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "approve_token_spending",
         "arguments": {
-            "spender": spender_address,
+            "spenderAddress": spender_address,
             "tokenAddress": token_address,
             "amount": amount,
             "privateKey": private_key
@@ -206,11 +326,12 @@ def approve_token_spending(spender_address: str, token_address: str, amount: str
 
 
 
-def write_contract(contract_address: str, function_name: str, args: list, private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def write_contract(contract_address: str, abi: list, function_name: str, args: list, private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "write_contract",
         "arguments": {
             "contractAddress": contract_address,
+            "abi": abi,
             "functionName": function_name,
             "args": args,
             "privateKey": private_key
@@ -219,25 +340,273 @@ def write_contract(contract_address: str, function_name: str, args: list, privat
 
 
 
-def get_address_from_private_key(private_key: str) -> dict:
-    return sonic_mcp_call("tools/call", {
+async def get_address_from_private_key(private_key: str) -> dict:
+    return await sonic_mcp_call_async("tools/call", {
         "name": "get_address_from_private_key",
         "arguments": {"privateKey": private_key}
     })
 
 
 
-def readme_data() -> dict:
+async def get_balances(addresses: list[str]) -> dict:
+    results = await sonic_mcp_batch_async([
+        ("tools/call", {"name": "get_balance", "arguments": {"address": address}})
+        for address in addresses
+    ])
+    return {
+        "success": all(result["success"] for result in results),
+        "data": [{"address": address, **result} for address, result in zip(addresses, results)]
+    }
+
+
+
+async def get_token_infos(token_addresses: list[str]) -> dict:
+    results = await sonic_mcp_batch_async([
+        ("tools/call", {"name": "get_token_info", "arguments": {"tokenAddress": token_address}})
+        for token_address in token_addresses
+    ])
+    return {
+        "success": all(result["success"] for result in results),
+        "data": [{"token_address": token_address, **result} for token_address, result in zip(token_addresses, results)]
+    }
+
+
+
+async def fetch_scan_block(block_number: int) -> dict:
+    # Scans bypass the in-memory result cache; finalized blocks go to the disk cache instead.
+    result = await mcp_client.call("tools/call", {
+        "name": "get_block_by_number",
+        "arguments": {"blockNumber": block_number, "includeTransactions": True}
+    }, idempotent=True)
+    content = parse_tool_content(result)
+    if not result["success"] or result["data"].get("isError") or not isinstance(content, dict):
+        return None
+    return content
+
+
+
+block_scanner = BlockRangeScanner(
+    fetch_scan_block,
+    BlockDiskCache(os.getenv(
+        "BLOCK_CACHE_PATH", os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'blocks.sqlite')
+    )),
+    concurrency=int(os.getenv("SCAN_CONCURRENCY", "8")),
+)
+
+
+
+async def scan_blocks(block_count: int = 100, start_block: int = None, end_block: int = None, address: str = "") -> dict:
     try:
-        readme_path = os.path.join(os.path.dirname(__file__), '..', 'README.md')
+        latest_result = await sonic_mcp_call_async("tools/call", {
+            "name": "get_latest_block",
+            "arguments": {}
+        })
+        latest = parse_tool_content(latest_result)
+        if not latest_result["success"] or not isinstance(latest, dict):
+            return {"success": False, "error": latest_result.get("error") or latest}
+        latest_number = int(latest["number"])
+        end = min(end_block if end_block is not None else latest_number, latest_number)
+        start = start_block if start_block is not None else end - max(1, block_count) + 1
+        max_blocks = int(os.getenv("SCAN_MAX_BLOCKS", "2000"))
+        if end - start + 1 > max_blocks:
+            start = end - max_blocks + 1
+        result = await block_scanner.scan(max(0, start), end, latest_number, address or None)
+        return {"success": True, "data": result}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+async def submit_bulk_item(item: dict, private_key: str) -> tuple:
+    if is_native(item.get("token")):
+        name, arguments = "transfer_native", {"to": item["to"], "amount": str(item["amount"])}
+    else:
+        name, arguments = "transfer_erc20", {
+            "tokenAddress": item["token"],
+            "toAddress": item["to"],
+            "amount": str(item["amount"])
+        }
+    result = await sonic_mcp_call_async("tools/call", {
+        "name": name,
+        "arguments": {**arguments, "privateKey": private_key}
+    })
+    tx_hash = submitted_hash(result)
+    if tx_hash:
+        return tx_hash, None, False
+    content = parse_tool_content(result)
+    # Only an MCP error result or a call refused before sending is a definite
+    # rejection; timeouts and transport errors may have been broadcast.
+    rejected = bool(result.get("unavailable") or result.get("busy") or (result["success"] and result["data"].get("isError")))
+    return None, result.get("error") or str(content), rejected
+
+
+
+bulk_transfers = BulkTransferQueue(
+    submit_bulk_item,
+    IdempotencyStore(os.getenv(
+        "BULK_TRANSFER_STORE_PATH", os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'transfers.sqlite')
+    )),
+    concurrency=int(os.getenv("BULK_TRANSFER_CONCURRENCY", "1")),
+)
+
+
+
+def _bulk_report(reports: list) -> dict:
+    for report in reports:
+        if report.get("tx_hash"):
+            status = tx_tracker.status(report["tx_hash"])
+            report["confirmation"] = status["status"] if status else None
+    counts = {}
+    for report in reports:
+        counts[report["status"]] = counts.get(report["status"], 0) + 1
+    return {"counts": counts, "items": reports}
+
+
+
+async def bulk_transfer(transfers: list[dict], idempotency_key: str, private_key: str) -> dict:
+    try:
+        if not idempotency_key:
+            return {"success": False, "error": "idempotency_key is required so a retry cannot send twice"}
+        max_items = int(os.getenv("BULK_TRANSFER_MAX_ITEMS", "200"))
+        if len(transfers) > max_items:
+            return {"success": False, "error": f"At most {max_items} transfers per job"}
+        invalid = [index for index, item in enumerate(transfers) if not item.get("to") or item.get("amount") in (None, "")]
+        if invalid:
+            return {"success": False, "error": f"Transfers {invalid} need both 'to' and 'amount'"}
+        reports = await bulk_transfers.run(idempotency_key, transfers, private_key)
+        return {"success": True, "data": {"idempotency_key": idempotency_key, **_bulk_report(reports)}}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+async def get_bulk_transfer_status(idempotency_key: str) -> dict:
+    try:
+        rows = await asyncio.to_thread(bulk_transfers.store.job, idempotency_key)
+        reports = [
+            {"index": row["item_index"], "to": row["to_address"], "token": row["token"], "amount": row["amount"],
+             "status": row["status"], "tx_hash": row["tx_hash"], "error": row["error"], "attempts": row["attempts"]}
+            for row in rows
+        ]
+        return {"success": True, "data": {"idempotency_key": idempotency_key, **_bulk_report(reports)}}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+def _token_analysis(symbol: str, token_address: str = None) -> dict:
+    # Holdings are on Sonic; a symbol can also name an unrelated token there,
+    # so an analysis that records its contract address must match it.
+    try:
+        results = token_index.query(symbol=symbol, chain="sonic", limit=100,
+                                    fields=["address", "price", "risk", "investmentPotential", "change24h"])
+    except Exception:
+        return None
+    tokens = results["results"]
+    if token_address:
+        matched = [token for token in tokens if (token["address"] or "").lower() == token_address.lower()]
+        tokens = matched or [token for token in tokens if not token["address"]]
+    return {name: value for name, value in tokens[0].items() if name != "address"} if tokens else None
+
+
+
+async def get_portfolio(address: str, tokens: list[str] = None) -> dict:
+    try:
+        tracked = [token for token in os.getenv("PORTFOLIO_TOKENS", "").split(",") if token.strip()]
+        try:
+            tracked += token_index.tracked_addresses()
+        except OSError:
+            pass
+        token_addresses, unresolved = resolve_tokens(tokens, token_metadata, tracked)
+        calls = [("tools/call", {"name": "get_balance", "arguments": {"address": address}})]
+        for token_address in token_addresses:
+            # Once decimals are known a bare balanceOf is enough; the MCP balance
+            # tools re-read symbol and decimals on every call.
+            if token_metadata.get(token_address):
+                calls.append(("tools/call", {"name": "read_contract", "arguments": {
+                    "contractAddress": token_address,
+                    "abi": BALANCE_OF_ABI,
+                    "functionName": "balanceOf",
+                    "args": [address]
+                }}))
+            else:
+                calls.append(("tools/call", {"name": "get_token_balance", "arguments": {
+                    "tokenAddress": token_address,
+                    "ownerAddress": address
+                }}))
+        results = await sonic_mcp_batch_async(calls)
+        native = parse_tool_content(results[0]) if results[0]["success"] else None
+        holdings, errors, zero_balances = [], [], 0
+        for token_address, result in zip(token_addresses, results[1:]):
+            content = parse_tool_content(result)
+            if not result["success"] or result["data"].get("isError") or content is None:
+                errors.append({"token_address": token_address, "error": result.get("error") or content})
+                continue
+            if isinstance(content, dict):
+                token_metadata.update(token_address, content.get("symbol"), content.get("decimals"))
+                raw = content.get("raw", "0")
+            else:
+                raw = content
+            metadata = token_metadata.get(token_address)
+            if metadata is None:
+                errors.append({"token_address": token_address, "error": "Unknown token decimals"})
+                continue
+            if int(raw) == 0:
+                zero_balances += 1
+                continue
+            holdings.append(value_holding(
+                token_address, metadata["symbol"], raw, metadata["decimals"],
+                _token_analysis(metadata["symbol"], token_address)
+            ))
+        holdings.sort(key=lambda holding: holding.get("value_usd") or 0, reverse=True)
+        return {
+            "success": True,
+            "data": {
+                "address": address,
+                "native_balance": native.get("sonic") if isinstance(native, dict) else None,
+                "holdings": holdings,
+                "total_value_usd": round(sum(holding.get("value_usd") or 0 for holding in holdings), 2),
+                "tokens_checked": len(token_addresses),
+                "zero_balances": zero_balances,
+                "errors": errors,
+                "unresolved_tokens": unresolved,
+            }
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+async def get_transaction_status(tx_hash: str) -> dict:
+    try:
+        status = tx_tracker.status(tx_hash) or tx_tracker.track(tx_hash, source="lookup")
+        return {"success": True, "data": status}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+async def wait_for_transaction(tx_hash: str, timeout_seconds: float = 30) -> dict:
+    try:
+        timeout = min(timeout_seconds, float(os.getenv("TX_WAIT_MAX_SECONDS", "120")))
+        status = await tx_tracker.wait(tx_hash, timeout)
+        return {"success": True, "data": status}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+def readme_data(tool_context: ToolContext = None) -> dict:
+    try:
+        readme_path = README_PATH
         with open(readme_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        return {
+        return context_ledger.deliver(tool_context, "readme_data", content, {
             "content": content,
             "character_count": len(content),
             "last_updated": os.path.getmtime(readme_path),
             "status": "success"
-        }
+        })
     except Exception as e:
         return {
             "error": f"Failed to load README data: {str(e)}",
@@ -247,17 +616,17 @@ def readme_data() -> dict:
 
 
 
-def token_data() -> dict:
+def token_data(tool_context: ToolContext = None) -> dict:
     try:
-        data_path = os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'ai_analyzer.json')
+        data_path = TOKEN_DATA_PATH
         with open(data_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        return {
+        return context_ledger.deliver(tool_context, "token_data", content, {
             "content": content,
             "character_count": len(content),
             "last_updated": os.path.getmtime(data_path),
             "status": "success"
-        }
+        }, records=True)
     except Exception as e:
         return {
             "error": f"Failed to load token data: {str(e)}",
@@ -267,25 +636,200 @@ def token_data() -> dict:
 
 
 
+def search_readme(query: str, top_k: int = 3, max_tokens: int = None) -> dict:
+    try:
+        budget = max_tokens or int(os.getenv("README_TOKEN_BUDGET", "1200"))
+        result = readme_index.search(query, top_k=top_k, token_budget=budget)
+        return {**result, "status": "success" if result["sections"] else "no_match"}
+    except Exception as e:
+        return {
+            "error": f"Failed to search README data: {str(e)}",
+            "sections": [],
+            "status": "error"
+        }
+
+
+
+def query_token_data(symbol: str = "", chain: str = "", min_risk: float = None, max_risk: float = None,
+                     min_potential: float = None, max_potential: float = None, min_change24h: float = None,
+                     max_change24h: float = None, sort_by: str = "investmentPotential", descending: bool = True,
+                     limit: int = 10, fields: list[str] = None) -> dict:
+    try:
+        result = token_index.query(
+            symbol=symbol, chain=chain, min_risk=min_risk, max_risk=max_risk,
+            min_potential=min_potential, max_potential=max_potential,
+            min_change24h=min_change24h, max_change24h=max_change24h,
+            sort_by=sort_by, descending=descending, limit=limit, fields=fields,
+        )
+        return {**result, "status": "success"}
+    except Exception as e:
+        return {
+            "error": f"Failed to query token data: {str(e)}",
+            "results": [],
+            "status": "error"
+        }
+
+
+
+def token_analytics(view: str = "summary", ranking: str = "", min_change24h: float = None, limit: int = 10) -> dict:
+    try:
+        return {**analytics_snapshot.view(view, ranking=ranking, min_change24h=min_change24h, limit=limit), "status": "success"}
+    except Exception as e:
+        return {
+            "error": f"Failed to read token analytics: {str(e)}",
+            "status": "error"
+        }
+
+
+
+def query_tweets(symbol: str = "", text: str = "", hours: float = 24, bucket_hours: float = 0, limit: int = 5) -> dict:
+    try:
+        return tweet_store.query(symbol=symbol, text=text, hours=hours, bucket_hours=bucket_hours, limit=limit)
+    except Exception as e:
+        return {
+            "error": f"Failed to query tweets: {str(e)}",
+            "top_tweets": [],
+            "status": "error"
+        }
+
+
+
+fast_path = FastPathRouter(
+    {
+        "balance": get_sonic_balance,
+        "token_info": get_sonic_token_info,
+        "latest_block": get_latest_block,
+        "block": get_block_by_number,
+        "transaction": get_transaction,
+        "transaction_receipt": get_transaction_receipt,
+    },
+    enabled=os.getenv("FAST_PATH_ROUTER", "1") == "1",
+)
+
+
+
+def budget_tool_result(tool, args, tool_context, tool_response):
+    fitted = fit_budget(tool_response)
+    return None if fitted is tool_response else fitted
+
+
+
+def _user_text(callback_context) -> str:
+    content = callback_context.user_content
+    return " ".join(part.text for part in (content.parts or []) if part.text) if content else ""
+
+
+
+async def fast_path_callback(callback_context) -> types.Content:
+    answer = await fast_path.answer(_user_text(callback_context))
+    if answer is None:
+        return None
+    # Short-circuiting skips after_agent_callback, so close the agent span here.
+    telemetry.after_agent(callback_context, {"fast_path": True})
+    return types.Content(role="model", parts=[types.Part(text=answer)])
+
+
+
+answer_cache = AnswerCache(
+    DataVersion([README_PATH, TOKEN_DATA_PATH]),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL", "900")),
+    max_entries=int(os.getenv("ANSWER_CACHE_ENTRIES", "512")),
+    similarity=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.85")),
+)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") == "1"
+# Answers that went through these tools depend on live chain state.
+ANSWER_CACHE_BYPASS_TOOLS = ("Sonic_MCP",)
+
+
+
+def _opening_turn(callback_context) -> bool:
+    # Follow-up questions depend on the conversation, so only opening turns are cached.
+    return all(event.invocation_id == callback_context.invocation_id for event in callback_context.session.events)
+
+
+
+async def answer_cache_callback(callback_context) -> types.Content:
+    if not ANSWER_CACHE_ENABLED or not _opening_turn(callback_context):
+        return None
+    text = _user_text(callback_context)
+    # The data version may need to hash the README and token files; keep that off the event loop.
+    answer = await asyncio.to_thread(answer_cache.get, text) if answer_cache.eligible(text) else None
+    if answer is None:
+        return None
+    telemetry.after_agent(callback_context, {"answer_cache": True})
+    return types.Content(role="model", parts=[types.Part(text=answer)])
+
+
+
+async def store_cached_answer(callback_context):
+    text = _user_text(callback_context)
+    if not ANSWER_CACHE_ENABLED or not _opening_turn(callback_context) or not answer_cache.cacheable(text):
+        return None
+    turn = [event for event in callback_context.session.events if event.invocation_id == callback_context.invocation_id]
+    if any(call.name in ANSWER_CACHE_BYPASS_TOOLS for event in turn for call in event.get_function_calls()):
+        return None
+    for event in reversed(turn):
+        if event.author == callback_context.agent_name and event.content and not event.partial \
+                and not event.get_function_calls():
+            await asyncio.to_thread(
+                answer_cache.put, text, "".join(part.text for part in event.content.parts or [] if part.text)
+            )
+            break
+    return None
+
+
+
+STRONG_MODEL = os.getenv("STRONG_MODEL", "gemini-2.5-pro")
+FAST_MODEL = os.getenv("FAST_MODEL", "gemini-2.5-flash")
+# Function tools that sign and send a transaction.
+SIGNING_TOOLS = (
+    "transfer_sonic_tokens", "transfer_erc20_tokens", "transfer_token", "approve_token_spending",
+    "write_contract", "bulk_transfer",
+)
+
+
+
+def tiered_model(write_tools: tuple, signing_tools: tuple = ()):
+    if os.getenv("MODEL_TIERING", "1") != "1":
+        return STRONG_MODEL
+    min_logprob = os.getenv("MODEL_TIER_MIN_AVG_LOGPROB")
+    return TieredLlm(
+        fast=FAST_MODEL,
+        strong=STRONG_MODEL,
+        write_tools=write_tools,
+        signing_tools=signing_tools,
+        max_fast_rounds=int(os.getenv("MODEL_TIER_MAX_FAST_ROUNDS", "3")),
+        min_avg_logprob=float(min_logprob) if min_logprob else None,
+    )
+
+
+
 rag_agent = Agent(
     model='gemini-2.5-flash',
     name='RAG_Context',
     instruction=return_instructions_root('rag'),
+    **telemetry.callbacks(),
     tools=[
+        FunctionTool(search_readme),
         FunctionTool(readme_data),
+        FunctionTool(query_token_data),
+        FunctionTool(token_analytics),
         FunctionTool(token_data),
+        FunctionTool(query_tweets),
     ],
 )
 search_agent = Agent(
     model='gemini-2.5-flash',
     name='Google_Search',
     instruction=return_instructions_root('search'),
+    **telemetry.callbacks(),
     tools=[google_search],
 )
 mcp_agent = Agent(
-    model='gemini-2.5-pro',
+    model=tiered_model(SIGNING_TOOLS, SIGNING_TOOLS),
     name='Sonic_MCP',
     instruction=return_instructions_root('mcp'),
+    **telemetry.callbacks(after_tool=[budget_tool_result]),
     tools=[
         FunctionTool(get_sonic_balance),
         FunctionTool(get_sonic_token_info),
@@ -306,21 +850,201 @@ mcp_agent = Agent(
         FunctionTool(approve_token_spending),
         FunctionTool(write_contract),
         FunctionTool(get_address_from_private_key),
+        FunctionTool(get_balances),
+        FunctionTool(get_token_infos),
+        FunctionTool(scan_blocks),
+        FunctionTool(get_portfolio),
+        FunctionTool(get_transaction_status),
+        FunctionTool(wait_for_transaction),
+        FunctionTool(bulk_transfer),
+        FunctionTool(get_bulk_transfer_status),
     ],
 )
+rag_tool = AgentTool(agent=rag_agent)
+search_tool = AgentTool(agent=search_agent)
+mcp_tool = AgentTool(agent=mcp_agent)
+context_prefetch = ParallelPrefetch(
+    {"rag": rag_tool, "search": search_tool},
+    timeouts={
+        "rag": float(os.getenv("PREFETCH_RAG_TIMEOUT", "25")),
+        "search": float(os.getenv("PREFETCH_SEARCH_TIMEOUT", "20")),
+    },
+)
+
+
+
+async def gather_context(request: str, tool_context: ToolContext) -> dict:
+    return await context_prefetch.run(request, tool_context)
+
+
+
+# Every chat turn that reaches the models holds one slot for its whole run;
+# a turn that exceeds its session's rate or finds the wait queue full gets a
+# short "busy, retry in N seconds" reply. Fast-path and cached answers skip
+# the queue.
+admission = AdmissionPlugin(
+    FairLimiter(
+        "TrendPup",
+        max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "16")),
+        max_queue=int(os.getenv("AGENT_MAX_QUEUE", "64")),
+        max_wait=float(os.getenv("AGENT_QUEUE_TIMEOUT", "30")),
+        user_rate=float(os.getenv("AGENT_USER_RATE", "0")),
+        user_burst=float(os.getenv("AGENT_USER_BURST", "5")),
+    ),
+    max_hold=float(os.getenv("AGENT_MAX_RUN_SECONDS", "600")),
+)
+
+
+
+async def admission_callback(callback_context) -> types.Content:
+    try:
+        await admission.admit(callback_context)
+    except AdmissionRejected as e:
+        telemetry.after_agent(callback_context, {"admission": "rejected"})
+        seconds = math.ceil(e.retry_after)
+        return types.Content(role="model", parts=[types.Part(text=(
+            f"TrendPup is handling a lot of requests right now. Please try again in about "
+            f"{seconds} second{'' if seconds == 1 else 's'}."
+        ))])
+    return None
+
+
+
+def start_background_work(callback_context) -> types.Content:
+    # The analytics watcher and tweet sync start with the first turn rather
+    # than at import, so loading the agent (adk start-up, benchmarks) spawns
+    # no threads. Both calls return at once when already running.
+    analytics_snapshot.start_watcher(float(os.getenv("ANALYTICS_WATCH_INTERVAL", "5")))
+    tweet_store.start_background_sync(float(os.getenv("TWEET_STORE_SYNC_INTERVAL", "60")))
+    return None
+
+
+
 root_agent = Agent(
-    model='gemini-2.5-pro',
+    model=tiered_model(("Sonic_MCP",)),
     name='TrendPup',
     instruction=return_instructions_root('root'),
+    **telemetry.callbacks(
+        before_agent=[
+            context_ledger.count_turn, start_background_work, fast_path_callback, answer_cache_callback,
+            admission_callback,
+        ],
+        after_agent=[store_cached_answer, admission.release],
+    ),
     tools=[
-    AgentTool(agent=rag_agent), 
-    AgentTool(agent=search_agent), 
-    AgentTool(agent=mcp_agent),
+    FunctionTool(gather_context),
+    rag_tool, 
+    search_tool, 
+    mcp_tool,
     ]
 )
 
 
 
+app = App(name="app", root_agent=root_agent, plugins=[admission])
+
+
+
+def runtime_metrics() -> list:
+    client, cache, flights = mcp_client.stats(), mcp_cache.stats(), mcp_flights.stats()
+    answers, ledger, analytics = answer_cache.stats(), context_ledger.stats(), analytics_snapshot.stats()
+    limits = {"agent": admission.limiter.stats(), "mcp": client["admission"]}
+    shared = shared_cache.stats()["by_namespace"] if shared_cache is not None else {}
+    tiers = {
+        llm_agent.name: llm_agent.model.stats()
+        for llm_agent in (root_agent, mcp_agent) if isinstance(llm_agent.model, TieredLlm)
+    }
+    return [
+        ("trendpup_mcp_circuit_open", "gauge", "1 while MCP calls are failing fast.",
+         [({}, int(client["breaker"]["state"] == "open"))]),
+        ("trendpup_mcp_circuit_trips_total", "counter", "Times the MCP circuit opened.",
+         [({}, client["breaker"]["trips"])]),
+        ("trendpup_mcp_fast_failed_total", "counter", "MCP calls rejected while the circuit was open.",
+         [({}, client["breaker"]["fast_failed"])]),
+        ("trendpup_mcp_hedged_requests_total", "counter", "Backup requests sent for slow reads.",
+         [({}, client["hedges"])]),
+        ("trendpup_mcp_cache_hits_total", "counter", "MCP result cache hits by tool.",
+         [({"tool": tool}, counts["hits"]) for tool, counts in cache["by_tool"].items()]),
+        ("trendpup_mcp_cache_misses_total", "counter", "MCP result cache misses by tool.",
+         [({"tool": tool}, counts["misses"]) for tool, counts in cache["by_tool"].items()]),
+        ("trendpup_mcp_cache_bytes", "gauge", "Bytes held by the MCP result cache.", [({}, cache["bytes"])]),
+        ("trendpup_mcp_coalesced_total", "counter", "Duplicate in-flight MCP reads that shared one request.",
+         [({}, flights["coalesced"])]),
+        ("trendpup_fast_path_total", "counter", "Fast path outcomes by route.", [
+            ({"route": route, "outcome": outcome}, entry[outcome])
+            for route, entry in fast_path.metrics().items() for outcome in ("answered", "fell_through")
+        ]),
+        ("trendpup_fast_path_seconds_total", "counter", "Time spent in fast path lookups by route.",
+         [({"route": route}, round(entry["total_ms"] / 1000, 6)) for route, entry in fast_path.metrics().items()]),
+        ("trendpup_fast_path_avg_seconds", "gauge", "Mean fast path lookup time by route.",
+         [({"route": route}, round(entry["avg_ms"] / 1000, 6)) for route, entry in fast_path.metrics().items()]),
+        ("trendpup_fast_path_max_seconds", "gauge", "Slowest fast path lookup by route.",
+         [({"route": route}, round(entry["max_ms"] / 1000, 6)) for route, entry in fast_path.metrics().items()]),
+        ("trendpup_tracked_transactions", "gauge", "Transactions known to the confirmation tracker by status.",
+         [({"status": status}, count) for status, count in tx_tracker.stats()["tracked"].items()]),
+        ("trendpup_answer_cache_total", "counter", "Answer cache lookups by outcome.", [
+            ({"outcome": outcome}, answers[outcome]) for outcome in ("hits", "similar_hits", "misses", "bypassed")
+        ]),
+        ("trendpup_answer_cache_evictions_total", "counter", "Answers evicted to stay under the size bound.",
+         [({}, answers["evictions"])]),
+        ("trendpup_answer_cache_entries", "gauge", "Answers currently cached.", [({}, answers["entries"])]),
+        ("trendpup_admission_active", "gauge", "Requests holding a slot.",
+         [({"scope": scope}, stats["active"]) for scope, stats in limits.items()]),
+        ("trendpup_admission_queue_depth", "gauge", "Requests waiting for a slot.",
+         [({"scope": scope}, stats["queued"]) for scope, stats in limits.items()]),
+        ("trendpup_admission_waiting_users", "gauge", "Distinct users with queued requests.",
+         [({"scope": scope}, stats["waiting_users"]) for scope, stats in limits.items()]),
+        ("trendpup_admission_admitted_total", "counter", "Requests admitted.",
+         [({"scope": scope}, stats["admitted"]) for scope, stats in limits.items()]),
+        ("trendpup_admission_rejected_total", "counter", "Requests rejected with retry-after, by reason.", [
+            ({"scope": scope, "reason": reason}, count)
+            for scope, stats in limits.items() for reason, count in stats["rejected"].items()
+        ]),
+        ("trendpup_admission_wait_seconds_total", "counter", "Time admitted requests spent queued.",
+         [({"scope": scope}, round(stats["wait_seconds"], 6)) for scope, stats in limits.items()]),
+        ("trendpup_admission_wait_seconds", "gauge", "Recent queue wait percentiles.", [
+            ({"scope": scope, "quantile": quantile}, stats[field] or 0)
+            for scope, stats in limits.items() for quantile, field in (("0.5", "wait_p50"), ("0.95", "wait_p95"))
+        ]),
+        ("trendpup_analytics_snapshot_builds_total", "counter", "Analytics snapshots rebuilt after ai_analyzer.json changed.",
+         [({}, analytics["builds"])]),
+        ("trendpup_analytics_snapshot_build_seconds", "gauge", "Time the last analytics snapshot took to build.",
+         [({}, round(analytics["build_seconds"], 6))]),
+        ("trendpup_context_deliveries_total", "counter", "readme_data/token_data results by form sent to the model.", [
+            ({"form": form}, ledger[form]) for form in ("full", "unchanged", "diffs")
+        ]),
+        ("trendpup_context_saved_chars_total", "counter", "Characters kept out of the conversation by dedup.",
+         [({}, ledger["saved_chars"])]),
+        ("trendpup_model_tier_routed_total", "counter", "Model turns by the tier the classifier picked.", [
+            ({"agent": name, "tier": tier, "reason": reason}, count)
+            for name, stats in tiers.items() for (tier, reason), count in stats["routed"].items()
+        ]),
+        ("trendpup_model_tier_calls_total", "counter", "Model calls by tier and outcome.", [
+            ({"agent": name, "tier": tier, "outcome": outcome}, count)
+            for name, stats in tiers.items() for (tier, outcome), count in stats["calls"].items()
+        ]),
+        ("trendpup_model_tier_seconds_total", "counter", "Time spent in each model tier.", [
+            ({"agent": name, "tier": tier}, round(total, 3))
+            for name, stats in tiers.items() for tier, total in stats["seconds"].items()
+        ]),
+        ("trendpup_model_tier_escalations_total", "counter", "Fast answers replaced by the strong model, by reason.", [
+            ({"agent": name, "reason": reason}, count)
+            for name, stats in tiers.items() for reason, count in stats["escalations"].items()
+        ]),
+        ("trendpup_shared_cache_total", "counter", "Cross-worker cache lookups and stores by namespace.", [
+            ({"namespace": namespace, "outcome": outcome}, counts[outcome])
+            for namespace, counts in shared.items() for outcome in ("hits", "misses", "stores")
+        ]),
+    ]
+
+
+
+telemetry.add_collector(runtime_metrics)
+if os.getenv("METRICS_PORT"):
+    telemetry.serve(int(os.getenv("METRICS_PORT")), os.getenv("METRICS_HOST", "127.0.0.1"))
+
+
+
 async def get_mcp_agent_async():
     return mcp_agent
 async def get_app_async():
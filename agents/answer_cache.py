@@ -0,0 +1,157 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+
+WORD = re.compile(r"[a-z0-9$]+")
+STOPWORDS = frozenset(
+    "a an the is are was were be been of to in on for at by with about me my i you your we our it its "
+    "what whats which who how please tell can could would should do does did right now currently today "
+    "there here this that these those any some give show".split()
+)
+# Words that flip or pin down the meaning of a question: two questions only
+# share an answer when these appear identically and in the same order.
+ANCHOR_WORDS = frozenset(
+    "not no never dont doesnt isnt arent without except avoid highest lowest high low higher lower top bottom "
+    "best worst most least max min maximum minimum buy sell long short up down gainers losers gainer loser "
+    "increase decrease rising falling bullish bearish safe safest risky riskiest above below over under more "
+    "less first last oldest newest new old cheap cheapest expensive".split()
+)
+SYMBOL = re.compile(r"\$\w+|\b[A-Z][A-Z0-9]{1,10}\b|\b\d+(?:\.\d+)?\b|0x[0-9a-fA-F]+")
+# Anything tied to a wallet, a transaction or a live chain read must always run the agents.
+BYPASS = re.compile(
+    r"0x[0-9a-fA-F]{6,}|\b(wallet|balance|balances|portfolio|holding|holdings|send|transfer|approve|swap|"
+    r"private|key|tx|txn|transaction|receipt|block|gas|nonce|contract|address|mine|my)\b",
+    re.IGNORECASE,
+)
+
+
+
+def normalize_query(text: str) -> tuple:
+    # (exact key, ordered word bigrams, anchors that must match exactly)
+    words = [word for word in WORD.findall((text or "").lower().replace("'", "")) if word not in STOPWORDS]
+    padded = ["^", *words, "$"]
+    grams = frozenset(zip(padded, padded[1:]))
+    anchors = tuple(
+        [word for word in words if word in ANCHOR_WORDS] +
+        sorted(symbol.lower() for symbol in SYMBOL.findall(text or ""))
+    )
+    return " ".join(words), grams, anchors
+
+
+
+class DataVersion:
+    # Content hash over the files an answer depends on. Files are only re-read
+    # when their (mtime, size) changes, so a rewrite with identical content
+    # keeps existing answers valid.
+    def __init__(self, paths: list):
+        self.paths = paths
+        self._stamps = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def _digest(self, path: str) -> str:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return "missing"
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._stamps.get(path) == stamp:
+                return self._digests[path]
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with self._lock:
+            self._stamps[path], self._digests[path] = stamp, digest
+        return digest
+
+    def current(self) -> str:
+        return hashlib.sha1("|".join(self._digest(path) for path in self.paths).encode()).hexdigest()[:16]
+
+
+
+class AnswerCache:
+    def __init__(self, version: DataVersion, ttl: float = 900, max_entries: int = 512, similarity: float = 0.85):
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def cacheable(text: str) -> bool:
+        return bool(text) and not BYPASS.search(text) and bool(normalize_query(text)[0])
+
+    def eligible(self, text: str) -> bool:
+        if not self.cacheable(text):
+            self.bypassed += 1
+            return False
+        return True
+
+    def get(self, text: str) -> str:
+        key, grams, anchors = normalize_query(text)
+        version = self.version.current()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((version, key))
+            if entry and entry["expires"] > now:
+                self._entries.move_to_end((version, key))
+                self.hits += 1
+                return entry["answer"]
+            best, best_score = None, 0
+            if self.similarity and key:
+                for (entry_version, _), candidate in self._entries.items():
+                    if entry_version != version or candidate["expires"] <= now or candidate["anchors"] != anchors:
+                        continue
+                    score = len(grams & candidate["grams"]) / len(grams | candidate["grams"])
+                    if score > best_score:
+                        best, best_score = candidate, score
+            if best is not None and best_score >= self.similarity:
+                self.hits += 1
+                self.similar_hits += 1
+                return best["answer"]
+            self.misses += 1
+            return None
+
+    def put(self, text: str, answer: str):
+        if not answer:
+            return
+        key, grams, anchors = normalize_query(text)
+        version = self.version.current()
+        with self._lock:
+            self._entries[(version, key)] = {
+                "answer": answer, "grams": grams, "anchors": anchors, "expires": time.time() + self.ttl,
+            }
+            self._entries.move_to_end((version, key))
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
@@ -1,8 +1,8 @@
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from agent import root_agent
+from agent import root_agent, app
 
 
 
-__all__ = ['root_agent']
\ No newline at end of file
+__all__ = ['root_agent', 'app']
\ No newline at end of file
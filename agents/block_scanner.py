@@ -0,0 +1,214 @@
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import Counter
+
+
+
+TRANSFER_SELECTOR = "0xa9059cbb"
+TRANSFER_FROM_SELECTOR = "0x23b872dd"
+
+
+
+def _int(value) -> int:
+    if isinstance(value, str) and value.startswith("0x"):
+        return int(value, 16)
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+
+def _word_address(data: str, word: int) -> str:
+    start = 10 + word * 64
+    chunk = data[start:start + 64]
+    return "0x" + chunk[-40:] if len(chunk) == 64 else None
+
+
+
+def slim_block(block: dict) -> dict:
+    transactions = []
+    for tx in block.get("transactions") or []:
+        if not isinstance(tx, dict):
+            transactions.append({"hash": tx})
+            continue
+        entry = {
+            "hash": tx.get("hash"),
+            "from": (tx.get("from") or "").lower() or None,
+            "to": (tx.get("to") or "").lower() or None,
+            "value": str(tx.get("value") or "0"),
+        }
+        data = (tx.get("input") or "").lower()
+        # ERC20 transfer(to, amount) / transferFrom(from, to, amount) calls.
+        if data.startswith(TRANSFER_SELECTOR):
+            entry["token_to"] = _word_address(data, 0)
+        elif data.startswith(TRANSFER_FROM_SELECTOR):
+            entry["token_from"] = _word_address(data, 0)
+            entry["token_to"] = _word_address(data, 1)
+        transactions.append(entry)
+    return {
+        "number": _int(block.get("number")),
+        "timestamp": _int(block.get("timestamp")),
+        "gasUsed": _int(block.get("gasUsed")),
+        "transactions": transactions,
+    }
+
+
+
+class BlockDiskCache:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+            self._ready = True
+        return connection
+
+    def get_many(self, numbers: list) -> dict:
+        if not numbers:
+            return {}
+        with self._lock:
+            connection = self.connect()
+            try:
+                rows = connection.execute(
+                    "SELECT number, data FROM blocks WHERE number BETWEEN ? AND ?", (min(numbers), max(numbers))
+                ).fetchall()
+            finally:
+                connection.close()
+        wanted = set(numbers)
+        return {number: json.loads(data) for number, data in rows if number in wanted}
+
+    def put_many(self, blocks: list):
+        if not blocks:
+            return
+        with self._lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO blocks (number, data) VALUES (?, ?)",
+                        [(block["number"], json.dumps(block, separators=(",", ":"))) for block in blocks],
+                    )
+            finally:
+                connection.close()
+
+
+
+class RangeAggregate:
+    def __init__(self, address: str = None, top: int = 10):
+        self.address = address.lower() if address else None
+        self.top = top
+        self.blocks = 0
+        self.transactions = 0
+        self.gas_used = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.to_addresses = Counter()
+        self.busiest = []
+        self.touching = []
+        self.touching_count = 0
+        self.hash_only_blocks = 0
+
+    def add(self, block: dict):
+        transactions = block["transactions"]
+        self.blocks += 1
+        self.transactions += len(transactions)
+        self.gas_used += block["gasUsed"]
+        timestamp = block["timestamp"]
+        if timestamp:
+            self.first_timestamp = min(self.first_timestamp or timestamp, timestamp)
+            self.last_timestamp = max(self.last_timestamp or timestamp, timestamp)
+        self.busiest.append((len(transactions), block["number"]))
+        if len(self.busiest) > self.top * 4:
+            self.busiest = sorted(self.busiest, reverse=True)[:self.top]
+        if transactions and "from" not in transactions[0]:
+            self.hash_only_blocks += 1
+            return
+        for tx in transactions:
+            if tx.get("to"):
+                self.to_addresses[tx["to"]] += 1
+            if self.address and self.address in (tx.get("from"), tx.get("to"), tx.get("token_from"), tx.get("token_to")):
+                self.touching_count += 1
+                if len(self.touching) < 20:
+                    self.touching.append({**tx, "block": block["number"]})
+
+    def result(self) -> dict:
+        summary = {
+            "blocks_scanned": self.blocks,
+            "transactions": self.transactions,
+            "gas_used": self.gas_used,
+            "avg_transactions_per_block": round(self.transactions / self.blocks, 2) if self.blocks else 0,
+            "avg_gas_per_block": self.gas_used // self.blocks if self.blocks else 0,
+            "time_span_seconds": (self.last_timestamp - self.first_timestamp) if self.first_timestamp else None,
+            "busiest_blocks": [
+                {"block": number, "transactions": count}
+                for count, number in sorted(self.busiest, reverse=True)[:5]
+            ],
+            "top_to_addresses": [
+                {"address": address, "transactions": count}
+                for address, count in self.to_addresses.most_common(self.top)
+            ],
+        }
+        if self.address:
+            summary["address_activity"] = {
+                "address": self.address,
+                "transactions": self.touching_count,
+                "samples": self.touching,
+            }
+        if self.hash_only_blocks:
+            summary["blocks_without_transaction_details"] = self.hash_only_blocks
+        return summary
+
+
+
+class BlockRangeScanner:
+    def __init__(self, fetch_block, disk_cache: BlockDiskCache, concurrency: int = 8, finality_depth: int = 2):
+        self.fetch_block = fetch_block
+        self.disk_cache = disk_cache
+        self.concurrency = concurrency
+        self.finality_depth = finality_depth
+
+    async def scan(self, start: int, end: int, latest: int, address: str = None) -> dict:
+        started = time.perf_counter()
+        numbers = list(range(start, end + 1))
+        aggregate = RangeAggregate(address)
+        cached = await asyncio.to_thread(self.disk_cache.get_many, numbers)
+        for number in numbers:
+            if number in cached:
+                aggregate.add(cached[number])
+        missing = [number for number in numbers if number not in cached]
+        failed, finalized = [], []
+        queue = iter(missing)
+
+        async def worker():
+            for number in queue:
+                block = await self.fetch_block(number)
+                if block is None:
+                    failed.append(number)
+                    continue
+                block = slim_block(block)
+                aggregate.add(block)
+                if number <= latest - self.finality_depth:
+                    finalized.append(block)
+
+        # A fixed pool of workers pulling from one iterator keeps at most
+        # `concurrency` requests in flight without materialising every task.
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(missing)))])
+        await asyncio.to_thread(self.disk_cache.put_many, finalized)
+        return {
+            "start_block": start,
+            "end_block": end,
+            **aggregate.result(),
+            "from_disk_cache": len(cached),
+            "fetched": len(missing) - len(failed),
+            "failed_blocks": sorted(failed)[:20],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
@@ -0,0 +1,113 @@
+import json
+import hashlib
+import threading
+
+
+
+# Session state keys. AgentTool copies the caller's state into RAG_Context's
+# child session and forwards the child's state changes back, so both live in
+# the root session and carry over from one turn to the next.
+LEDGER_KEY = "context_ledger"
+TURN_KEY = "context_turn"
+REQUEST_EXCERPT = 80
+
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+
+def record_key(record: dict) -> str:
+    return str(record.get("id") or record.get("address") or f"{record.get('symbol')}:{record.get('chain')}")
+
+
+
+def token_records(text: str) -> dict:
+    data = json.loads(text)
+    results = data.get("results", []) if isinstance(data, dict) else data
+    return {record_key(item): item for item in results if isinstance(item, dict)}
+
+
+
+def _request_text(tool_context) -> str:
+    content = getattr(tool_context, "user_content", None)
+    text = " ".join(part.text for part in (content.parts or []) if part.text) if content else ""
+    return text if len(text) <= REQUEST_EXCERPT else text[:REQUEST_EXCERPT] + "..."
+
+
+
+class ContextLedger:
+    # Remembers in session state which version of a static document the
+    # conversation has already been given, and in which root turn. Token data
+    # is also tracked per record (as hashes, to keep the state small), so a
+    # new version can go out as the records that were added, changed or
+    # removed without keeping the old text around.
+    def __init__(self, max_diff_ratio: float = 0.5):
+        self.max_diff_ratio = max_diff_ratio
+        self._lock = threading.Lock()
+        self.full = 0
+        self.unchanged = 0
+        self.diffs = 0
+        self.saved_chars = 0
+
+    def count_turn(self, callback_context):
+        callback_context.state[TURN_KEY] = (callback_context.state.get(TURN_KEY) or 0) + 1
+        return None
+
+    def _count(self, form: str, saved: int = 0):
+        with self._lock:
+            setattr(self, form, getattr(self, form) + 1)
+            self.saved_chars += saved
+
+    def deliver(self, tool_context, tool_name: str, text: str, result: dict, records=None) -> dict:
+        digest = content_hash(text)
+        if tool_context is None:
+            self._count("full")
+            return {**result, "content_hash": digest}
+        ledger = dict(tool_context.state.get(LEDGER_KEY) or {})
+        previous = ledger.get(tool_name)
+        if previous and previous["hash"] == digest:
+            self._count("unchanged", len(text))
+            return {
+                "status": "unchanged",
+                "content_hash": digest,
+                "unchanged_since_turn": previous["turn"],
+                "message": f"Identical to the version the conversation received in turn {previous['turn']} "
+                           f"(request: \"{previous['request']}\"); answer from that copy.",
+            }
+        try:
+            current = token_records(text) if records else None
+        except ValueError:
+            current = None
+        hashes = {key: content_hash(json.dumps(record, sort_keys=True)) for key, record in current.items()} if current is not None else None
+        entry = {"hash": digest, "turn": tool_context.state.get(TURN_KEY) or 0, "request": _request_text(tool_context)}
+        if hashes is not None:
+            entry["records"] = hashes
+        ledger[tool_name] = entry
+        tool_context.state[LEDGER_KEY] = ledger
+        if previous and previous.get("records") is not None and hashes is not None:
+            old = previous["records"]
+            changes = {
+                "added": [current[key] for key in hashes.keys() - old.keys()],
+                "changed": [current[key] for key in hashes.keys() & old.keys() if hashes[key] != old[key]],
+                "removed": sorted(old.keys() - hashes.keys()),
+            }
+            size = len(json.dumps(changes, default=str))
+            if size <= len(text) * self.max_diff_ratio:
+                self._count("diffs", len(text) - size)
+                return {
+                    "status": "changed",
+                    "content_hash": digest,
+                    "changes_since_turn": previous["turn"],
+                    "changes": changes,
+                    "message": f"Only the records that changed since turn {previous['turn']} "
+                               f"(request: \"{previous['request']}\") are listed, in full; removed lists record "
+                               f"keys. Apply them to that copy.",
+                }
+        self._count("full")
+        return {**result, "content_hash": digest}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"full": self.full, "unchanged": self.unchanged, "diffs": self.diffs, "saved_chars": self.saved_chars}
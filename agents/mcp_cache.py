@@ -0,0 +1,260 @@
+import os
+import json
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from mcp_client import parse_tool_content
+
+
+
+FOREVER = math.inf
+BALANCE_TOOLS = ("get_balance", "get_erc20_balance", "get_token_balance", "get_token_balance_erc20")
+WRITE_TOOLS = ("transfer_native", "transfer_erc20", "transfer_token", "approve_token_spending", "write_contract")
+
+
+
+def _ok(result: dict) -> bool:
+    return result.get("success") and not (result.get("data") or {}).get("isError")
+
+
+
+def _block_number(value) -> int:
+    try:
+        return int(value, 0) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+
+def _ttl(seconds: float):
+    return lambda result, head: seconds if _ok(result) else 0
+
+
+
+def _forever_once(predicate, pending_ttl: float = 0):
+    def policy(result: dict, head: int) -> float:
+        if not _ok(result):
+            return 0
+        content = parse_tool_content(result)
+        return FOREVER if isinstance(content, dict) and predicate(content) else pending_ttl
+    return policy
+
+
+
+def _final_block(depth: int, pending_ttl: float):
+    # A block near the head can still be replaced by a reorg; it is kept for
+    # good only once `depth` blocks are known to have been built on it.
+    def policy(result: dict, head: int) -> float:
+        if not _ok(result):
+            return 0
+        content = parse_tool_content(result)
+        if not isinstance(content, dict) or not content.get("hash"):
+            return 0
+        number = _block_number(content.get("number"))
+        return FOREVER if number is not None and head is not None and number <= head - depth else pending_ttl
+    return policy
+
+
+
+# Seconds to keep a successful result; FOREVER once the data can no longer change.
+# Tools missing from this table (latest block, gas estimates, contract reads,
+# anything involving a private key) are never cached.
+DEFAULT_POLICIES = {
+    "get_supported_networks": _ttl(3600),
+    "get_chain_info": _ttl(300),
+    "get_token_info": _ttl(3600),
+    "is_contract": _forever_once(lambda content: content.get("isContract") is True, pending_ttl=300),
+    "get_block_by_number": _final_block(depth=2, pending_ttl=2),
+    "get_transaction": _forever_once(lambda content: content.get("blockNumber") is not None),
+    "get_transaction_receipt": _forever_once(lambda content: content.get("status") is not None),
+    "get_balance": _ttl(15),
+    "get_erc20_balance": _ttl(15),
+    "get_token_balance": _ttl(15),
+}
+# Results that reveal how far the chain has got, for _final_block.
+HEAD_TOOLS = ("get_latest_block", "get_block_by_number")
+
+
+
+def normalize_arguments(arguments: dict) -> str:
+    def normalize(value):
+        if isinstance(value, str) and value.startswith("0x"):
+            return value.lower()
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+    return json.dumps(normalize(arguments or {}), sort_keys=True, default=str)
+
+
+
+class ToolResultCache:
+    # With `shared` (a SharedCache), results are also stored for the other
+    # worker processes. Balances then skip the in-process copy and are read
+    # from the shared store only, so an invalidation after a transfer in one
+    # worker is seen by all of them.
+    def __init__(self, policies: dict = None, max_entries: int = None, max_bytes: int = None, shared=None):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.max_entries = max_entries or int(os.getenv("SONIC_MCP_CACHE_ENTRIES", "2048"))
+        self.max_bytes = max_bytes or int(os.getenv("SONIC_MCP_CACHE_BYTES", str(32 * 1024 * 1024)))
+        self.shared = shared
+        self.head = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, name: str, arguments: dict) -> tuple:
+        return (name, normalize_arguments(arguments))
+
+    def cacheable(self, name: str) -> bool:
+        return name in self.policies and name not in WRITE_TOOLS
+
+    def _local(self, name: str) -> bool:
+        return self.shared is None or name not in BALANCE_TOOLS
+
+    def _lookup(self, name: str, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits[name] = self.hits.get(name, 0) + 1
+                return entry[0]
+        return None
+
+    def _lookup_shared(self, name: str, key: tuple):
+        shared = self.shared.get("mcp", "\n".join(key)) if self.shared is not None else None
+        with self._lock:
+            if shared is None:
+                self.misses[name] = self.misses.get(name, 0) + 1
+                return None
+            self.hits[name] = self.hits.get(name, 0) + 1
+        result, remaining = shared
+        if self._local(name):
+            self._store(key, result, FOREVER if remaining is None else remaining)
+        return result
+
+    def get(self, name: str, arguments: dict):
+        if not self.cacheable(name):
+            return None
+        key = self.key(name, arguments)
+        result = self._lookup(name, key)
+        return result if result is not None else self._lookup_shared(name, key)
+
+    async def get_async(self, name: str, arguments: dict):
+        # As get(), with the shared store read in a thread so a busy SQLite
+        # file never stalls the event loop.
+        if not self.cacheable(name):
+            return None
+        key = self.key(name, arguments)
+        result = self._lookup(name, key)
+        if result is not None:
+            return result
+        if self.shared is None:
+            return self._lookup_shared(name, key)
+        return await asyncio.to_thread(self._lookup_shared, name, key)
+
+    def observe(self, name: str, arguments: dict, result: dict):
+        if name in WRITE_TOOLS:
+            # A failed or timed-out write may still have been broadcast, so
+            # invalidate regardless of the result.
+            if name == "write_contract":
+                self.invalidate_balances()
+            elif name in ("transfer_native", "approve_token_spending"):
+                self.invalidate_balances(native_only=True)
+            else:
+                self.invalidate_balances(arguments.get("tokenAddress"))
+            return
+        if name in HEAD_TOOLS and _ok(result):
+            self._advance_head(parse_tool_content(result))
+        if not self.cacheable(name):
+            return
+        ttl = self.policies[name](result, self.head)
+        if not ttl:
+            return
+        key = self.key(name, arguments)
+        if self.shared is not None:
+            self.shared.put("mcp", "\n".join(key), result, None if ttl == FOREVER else ttl, tag=name)
+        if self._local(name):
+            self._store(key, result, ttl)
+
+    def _advance_head(self, content):
+        number = _block_number(content.get("number")) if isinstance(content, dict) else None
+        if number is not None:
+            with self._lock:
+                self.head = number if self.head is None else max(self.head, number)
+
+    async def observe_async(self, name: str, arguments: dict, result: dict):
+        if self.shared is not None and (name in WRITE_TOOLS or self.cacheable(name)):
+            await asyncio.to_thread(self.observe, name, arguments, result)
+        else:
+            self.observe(name, arguments, result)
+
+    def _store(self, key: tuple, result: dict, ttl: float):
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_balances(self, token_address: str = None, native_only: bool = False):
+        # The sender is only known through its private key, so every native
+        # balance may have paid gas; token balances are narrowed by token.
+        token_address = token_address.lower() if token_address else None
+
+        def affected(name: str, arguments: str) -> bool:
+            if name == "get_balance":
+                return True
+            if native_only:
+                return False
+            return not token_address or json.loads(arguments).get("tokenAddress") == token_address
+
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] in BALANCE_TOOLS and affected(*key):
+                    self._remove(key)
+                    self.invalidations += 1
+        if self.shared is not None:
+            stale = [key for key, name in self.shared.tagged("mcp", BALANCE_TOOLS) if affected(*key.split("\n", 1))]
+            self.shared.delete("mcp", stale)
+            with self._lock:
+                self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": sum(self.hits.values()),
+                "misses": sum(self.misses.values()),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "by_tool": {
+                    name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                    for name in sorted(set(self.hits) | set(self.misses))
+                },
+            }
@@ -0,0 +1,355 @@
+import os
+import time
+import asyncio
+import itertools
+import logging
+import threading
+import weakref
+import json
+import httpx
+from resilience import CircuitBreaker, LatencyTracker
+from admission import FairLimiter, AdmissionRejected
+
+
+
+logger = logging.getLogger(__name__)
+
+
+
+def parse_tool_content(result: dict):
+    data = result.get("data") if isinstance(result, dict) else None
+    if not isinstance(data, dict):
+        return None
+    for item in data.get("content") or []:
+        if isinstance(item, dict) and item.get("type") == "text":
+            try:
+                return json.loads(item.get("text", ""))
+            except ValueError:
+                return item.get("text")
+    return None
+
+
+
+class SonicMCPClient:
+    def __init__(self, endpoint: str = None, pool_size: int = None, keepalive: int = None,
+                 timeout: float = None, connect_timeout: float = None):
+        endpoint = endpoint or os.getenv("SONIC_MCP_URL", "http://localhost:3002/api")
+        pool_size = pool_size or int(os.getenv("SONIC_MCP_POOL_SIZE", "20"))
+        keepalive = keepalive or int(os.getenv("SONIC_MCP_KEEPALIVE", "10"))
+        timeout = timeout or float(os.getenv("SONIC_MCP_TIMEOUT", "30"))
+        connect_timeout = connect_timeout or float(os.getenv("SONIC_MCP_CONNECT_TIMEOUT", "5"))
+        self.endpoint = endpoint
+        self.health_url = os.getenv("SONIC_MCP_HEALTH_URL") or str(httpx.URL(endpoint).copy_with(path="/health"))
+        self.max_timeout = timeout
+        self.min_timeout = float(os.getenv("SONIC_MCP_MIN_TIMEOUT", "3"))
+        self.timeout_multiplier = float(os.getenv("SONIC_MCP_TIMEOUT_MULTIPLIER", "4"))
+        self.adaptive_timeouts = os.getenv("SONIC_MCP_ADAPTIVE_TIMEOUT", "1") == "1"
+        self.hedge_quantile = float(os.getenv("SONIC_MCP_HEDGE_QUANTILE", "0.95")) if os.getenv("SONIC_MCP_HEDGE", "0") == "1" else None
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("SONIC_MCP_BREAKER_FAILURES", "5")),
+            probe_interval=float(os.getenv("SONIC_MCP_BREAKER_PROBE_INTERVAL", "2")),
+        )
+        # Bounds the requests in flight against the MCP server; callers beyond
+        # that wait in a per-user fair queue and fail fast once it is full.
+        self.admission = FairLimiter(
+            "Sonic MCP",
+            max_concurrent=int(os.getenv("SONIC_MCP_MAX_CONCURRENT") or pool_size),
+            max_queue=int(os.getenv("SONIC_MCP_MAX_QUEUE", "200")),
+            max_wait=float(os.getenv("SONIC_MCP_QUEUE_TIMEOUT", "10")),
+        )
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=min(keepalive, pool_size),
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sync_client = None
+        # None until the first batch tells us whether /api accepts JSON-RPC arrays.
+        self.batch_supported = None
+        # httpx.AsyncClient connections are bound to the loop that opened them.
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def payload(self, method: str, params: dict = None) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or {},
+            "id": self.next_id()
+        }
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                headers={"Content-Type": "application/json"},
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    headers={"Content-Type": "application/json"},
+                )
+            return self._sync_client
+
+    def _request_timeout(self, timeout: float = None):
+        if timeout is None:
+            return self.timeout
+        return httpx.Timeout(timeout, connect=min(timeout, self.timeout.connect))
+
+    @staticmethod
+    def parse_message(message) -> dict:
+        if not isinstance(message, dict):
+            return {"success": False, "error": f"Invalid JSON-RPC response: {message!r}"}
+        if "result" in message:
+            return {"success": True, "data": message["result"]}
+        if "error" in message:
+            return {"success": False, "error": message["error"]}
+        return {"success": False, "error": "Invalid JSON-RPC response: missing result and error"}
+
+    @classmethod
+    def parse_response(cls, response: httpx.Response) -> dict:
+        if response.status_code != 200:
+            return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
+        return cls.parse_message(response.json())
+
+    @staticmethod
+    def tool_key(method: str, params: dict = None) -> str:
+        return params.get("name", method) if method == "tools/call" and params else method
+
+    def timeout_for(self, key: str, idempotent: bool) -> float:
+        # Writes keep the full timeout: giving up early on a send that still
+        # lands would leave its outcome unknown.
+        if not self.adaptive_timeouts or not idempotent:
+            return None
+        p99 = self.latency.percentile(key, 0.99)
+        if p99 is None:
+            return None
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def _record(self, key: str, started: float, error: str = None):
+        if error is None:
+            self.latency.observe(key, time.perf_counter() - started)
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(error)
+
+    @staticmethod
+    def _transport_error(response: httpx.Response) -> str:
+        return f"HTTP {response.status_code}" if response.status_code in (502, 503, 504) else None
+
+    async def _admit(self) -> dict:
+        if self.breaker.allow():
+            return None
+        if self.breaker.probe_due():
+            self.breaker.on_probe(await self.check_health())
+            if self.breaker.allow():
+                return None
+        return self.breaker.unavailable()
+
+    def _admit_sync(self) -> dict:
+        if self.breaker.allow():
+            return None
+        if self.breaker.probe_due():
+            self.breaker.on_probe(self.check_health_sync())
+            if self.breaker.allow():
+                return None
+        return self.breaker.unavailable()
+
+    async def check_health(self) -> bool:
+        try:
+            response = await self._get_async_client().get(self.health_url, timeout=self._request_timeout(self.min_timeout))
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def check_health_sync(self) -> bool:
+        try:
+            response = self._get_sync_client().get(self.health_url, timeout=self._request_timeout(self.min_timeout))
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def post(self, body, timeout: float = None) -> httpx.Response:
+        client = self._get_async_client()
+        return await client.post(self.endpoint, json=body, timeout=self._request_timeout(timeout))
+
+    async def _attempt(self, key: str, method: str, params: dict, timeout: float) -> dict:
+        try:
+            await self.admission.acquire_async()
+        except AdmissionRejected as e:
+            return e.result()
+        try:
+            return await self._send(key, method, params, timeout)
+        finally:
+            self.admission.release()
+
+    async def _send(self, key: str, method: str, params: dict, timeout: float) -> dict:
+        started = time.perf_counter()
+        try:
+            response = await self.post(self.payload(method, params), timeout=timeout)
+        except httpx.TransportError as e:
+            self._record(key, started, f"{type(e).__name__}: {e}")
+            return {"success": False, "error": str(e) or type(e).__name__}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        self._record(key, started, self._transport_error(response))
+        try:
+            return self.parse_response(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def _hedged(self, key: str, method: str, params: dict, timeout: float, delay: float) -> dict:
+        primary = asyncio.ensure_future(self._attempt(key, method, params, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        self.hedges += 1
+        backup = asyncio.ensure_future(self._attempt(key, method, params, timeout))
+        pending = {primary, backup}
+        first = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result.get("success"):
+                    for other in pending:
+                        other.cancel()
+                    if task is backup:
+                        self.hedge_wins += 1
+                    return result
+                first = first or result
+        return first
+
+    async def call(self, method: str, params: dict = None, timeout: float = None, idempotent: bool = False) -> dict:
+        blocked = await self._admit()
+        if blocked is not None:
+            return blocked
+        key = self.tool_key(method, params)
+        timeout = timeout or self.timeout_for(key, idempotent)
+        if idempotent and self.hedge_quantile is not None:
+            delay = self.latency.percentile(key, self.hedge_quantile)
+            if delay is not None:
+                return await self._hedged(key, method, params, timeout, delay)
+        return await self._attempt(key, method, params, timeout)
+
+    async def call_batch(self, calls: list, timeout: float = None, idempotent: bool = False) -> list:
+        if not calls:
+            return []
+        if self.batch_supported is False or len(calls) == 1:
+            return await self._call_concurrently(calls, timeout, idempotent)
+        blocked = await self._admit()
+        if blocked is not None:
+            return [blocked for _ in calls]
+        payloads = [self.payload(method, params) for method, params in calls]
+        try:
+            await self.admission.acquire_async()
+        except AdmissionRejected as e:
+            return [e.result() for _ in calls]
+        started = time.perf_counter()
+        try:
+            response = await self.post(payloads, timeout=timeout or self.timeout_for("batch", idempotent))
+        except Exception as e:
+            if isinstance(e, httpx.TransportError):
+                self._record("batch", started, f"{type(e).__name__}: {e}")
+            return [{"success": False, "error": str(e) or type(e).__name__} for _ in calls]
+        finally:
+            self.admission.release()
+        self._record("batch", started, self._transport_error(response))
+        messages = None
+        if response.status_code == 200:
+            try:
+                messages = response.json()
+            except ValueError:
+                messages = None
+        if not isinstance(messages, list):
+            logger.info(f"MCP endpoint rejected JSON-RPC batch (HTTP {response.status_code}), using single calls")
+            if response.status_code < 500:
+                self.batch_supported = False
+            return await self._call_concurrently(calls, timeout, idempotent)
+        self.batch_supported = True
+        by_id = {message.get("id"): message for message in messages if isinstance(message, dict)}
+        results = []
+        for payload in payloads:
+            message = by_id.get(payload["id"])
+            if message is None:
+                results.append({"success": False, "error": f"No response for request id {payload['id']}"})
+            else:
+                results.append(self.parse_message(message))
+        return results
+
+    async def _call_concurrently(self, calls: list, timeout: float = None, idempotent: bool = False) -> list:
+        return list(await asyncio.gather(*[
+            self.call(method, params, timeout=timeout, idempotent=idempotent) for method, params in calls
+        ]))
+
+    def call_sync(self, method: str, params: dict = None, timeout: float = None, idempotent: bool = False) -> dict:
+        blocked = self._admit_sync()
+        if blocked is not None:
+            return blocked
+        try:
+            self.admission.acquire()
+        except AdmissionRejected as e:
+            return e.result()
+        try:
+            return self._send_sync(method, params, timeout, idempotent)
+        finally:
+            self.admission.release()
+
+    def _send_sync(self, method: str, params: dict, timeout: float, idempotent: bool) -> dict:
+        key = self.tool_key(method, params)
+        started = time.perf_counter()
+        try:
+            client = self._get_sync_client()
+            response = client.post(
+                self.endpoint,
+                json=self.payload(method, params),
+                timeout=self._request_timeout(timeout or self.timeout_for(key, idempotent)),
+            )
+        except httpx.TransportError as e:
+            self._record(key, started, f"{type(e).__name__}: {e}")
+            return {"success": False, "error": str(e) or type(e).__name__}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        self._record(key, started, self._transport_error(response))
+        try:
+            return self.parse_response(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def stats(self) -> dict:
+        return {
+            "breaker": self.breaker.stats(),
+            "admission": self.admission.stats(),
+            "latency": self.latency.stats(),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "batch_supported": self.batch_supported,
+        }
+
+    async def aclose(self):
+        clients = list(self._async_clients.values())
+        self._async_clients = weakref.WeakKeyDictionary()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close MCP client: {e}")
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
@@ -0,0 +1,167 @@
+import re
+import time
+import logging
+import threading
+from typing import Any, Optional
+from pydantic import PrivateAttr
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+
+
+logger = logging.getLogger(__name__)
+FAST, STRONG = "fast", "strong"
+SIGNING_WORDS = re.compile(
+    r"\b(send|transfer|approve|allowance|swap|sign|signing|private\s+key|bulk|airdrop|pay|deploy|mint|"
+    r"write_contract|write\s+to)\b",
+    re.IGNORECASE,
+)
+MULTI_STEP_WORDS = re.compile(
+    r"\b(and then|after that|step|steps|compare|comparison|versus|vs|analy[sz]e|analysis|explain why|why|"
+    r"strategy|plan|recommend|should i|each|every|all of)\b",
+    re.IGNORECASE,
+)
+ADDRESS = re.compile(r"\b0x[0-9a-fA-F]{40}\b")
+LONG_QUERY = 400
+# Anything other than a clean stop means the fast model did not finish the job.
+DONE_REASONS = (None, types.FinishReason.STOP, types.FinishReason.FINISH_REASON_UNSPECIFIED)
+
+
+
+def classify(text: str, writes_possible: bool) -> tuple:
+    text = (text or "").strip()
+    if writes_possible and SIGNING_WORDS.search(text):
+        return STRONG, "signing"
+    if len(text) > LONG_QUERY:
+        return STRONG, "long"
+    if MULTI_STEP_WORDS.search(text) or len(set(ADDRESS.findall(text))) > 1 or text.count("?") > 1:
+        return STRONG, "multi_step"
+    return FAST, "simple"
+
+
+
+def _turn(contents: list) -> tuple:
+    # The request's own text plus the tool calls made since it arrived.
+    calls = []
+    for content in reversed(contents or []):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts) and not any(part.function_response for part in parts):
+            return " ".join(part.text for part in parts if part.text), calls
+        calls.extend(part.function_call.name for part in parts if part.function_call)
+    return "", calls
+
+
+
+class TieredLlm(BaseLlm):
+    # Routes each model turn to `fast` or `strong` (model names or BaseLlm
+    # instances). Fast answers are held back until they are complete so a
+    # weak one can be replaced by the strong model without the caller ever
+    # seeing it.
+    model: str = "tiered"
+    fast: Any = "gemini-2.5-flash"
+    strong: Any = "gemini-2.5-pro"
+    write_tools: tuple = ()
+    signing_tools: tuple = ()
+    max_fast_rounds: int = 3
+    min_avg_logprob: Optional[float] = None
+    _resolved: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _counters: dict = PrivateAttr(default_factory=dict)
+
+    def _delegate(self, tier: str) -> BaseLlm:
+        entry = self.fast if tier == FAST else self.strong
+        if isinstance(entry, BaseLlm):
+            return entry
+        if tier not in self._resolved:
+            self._resolved[tier] = LLMRegistry.new_llm(entry)
+        return self._resolved[tier]
+
+    @property
+    def capabilities(self):
+        return self._delegate(STRONG).capabilities
+
+    def _count(self, kind: str, key: tuple, amount: float = 1):
+        with self._lock:
+            self._counters[(kind, *key)] = self._counters.get((kind, *key), 0) + amount
+
+    def route(self, llm_request) -> tuple:
+        text, calls = _turn(llm_request.contents)
+        if any(name in self.signing_tools for name in calls):
+            return STRONG, "signing"
+        if len(calls) >= self.max_fast_rounds:
+            return STRONG, "multi_step"
+        return classify(text, any(name in self.write_tools for name in llm_request.tools_dict))
+
+    def weak_answer(self, responses: list) -> str:
+        final = [response for response in responses if not response.partial] or responses
+        if not final:
+            return "empty"
+        if any(response.error_code for response in final):
+            return "error"
+        parts = [part for response in final if response.content for part in response.content.parts or []]
+        if not any(part.text or part.function_call for part in parts):
+            return "empty"
+        if any(part.function_call and part.function_call.name in self.signing_tools for part in parts):
+            return "signing"
+        if final[-1].finish_reason not in DONE_REASONS:
+            return "finish_reason"
+        logprobs = [response.avg_logprobs for response in final if response.avg_logprobs is not None]
+        if self.min_avg_logprob is not None and logprobs and min(logprobs) < self.min_avg_logprob:
+            return "low_confidence"
+        return None
+
+    async def _generate(self, tier: str, llm_request, stream: bool):
+        delegate = self._delegate(tier)
+        # Models read the name off the request, which the flow filled in from this wrapper.
+        llm_request.model = delegate.model
+        async for response in delegate.generate_content_async(llm_request, stream):
+            response.model_version = response.model_version or delegate.model
+            yield response
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        tier, reason = self.route(llm_request)
+        self._count("routed", (tier, reason))
+        if tier == FAST:
+            # Models edit the request in place, so keep a copy for the strong retry.
+            contents = [content.model_copy(deep=True) for content in llm_request.contents]
+            config = llm_request.config.model_copy(deep=True)
+            started = time.perf_counter()
+            responses, weakness = [], None
+            try:
+                async for response in self._generate(FAST, llm_request, stream):
+                    responses.append(response)
+                weakness = self.weak_answer(responses)
+            except Exception as e:
+                logger.warning(f"Fast model failed, escalating: {e}")
+                weakness = "exception"
+            self._count("seconds", (FAST,), time.perf_counter() - started)
+            if weakness is None:
+                self._count("calls", (FAST, "success"))
+                for response in responses:
+                    yield response
+                return
+            self._count("calls", (FAST, "escalated"))
+            self._count("escalations", (weakness,))
+            llm_request.contents, llm_request.config = contents, config
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            async for response in self._generate(STRONG, llm_request, stream):
+                if response.error_code:
+                    outcome = "error"
+                yield response
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._count("seconds", (STRONG,), time.perf_counter() - started)
+            self._count("calls", (STRONG, outcome))
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        stats = {"routed": {}, "calls": {}, "escalations": {}, "seconds": {}}
+        for (kind, *key), count in counters.items():
+            stats[kind][key[0] if len(key) == 1 else tuple(key)] = count
+        return stats
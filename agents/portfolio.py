@@ -0,0 +1,78 @@
+import re
+import threading
+from decimal import Decimal
+from token_index import parse_numeric_value
+
+
+
+ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+BALANCE_OF_ABI = [{
+    "type": "function",
+    "name": "balanceOf",
+    "stateMutability": "view",
+    "inputs": [{"name": "account", "type": "address"}],
+    "outputs": [{"name": "", "type": "uint256"}],
+}]
+
+
+
+class TokenMetadataCache:
+    # Symbol and decimals never change for a deployed ERC20, so entries never expire.
+    def __init__(self):
+        self._by_address = {}
+        self._by_symbol = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_address: str) -> dict:
+        return self._by_address.get(token_address.lower())
+
+    def update(self, token_address: str, symbol: str, decimals: int):
+        if symbol is None or decimals is None:
+            return
+        with self._lock:
+            self._by_address[token_address.lower()] = {"symbol": symbol, "decimals": int(decimals)}
+            self._by_symbol.setdefault(symbol.upper(), token_address.lower())
+
+    def address_for(self, symbol: str) -> str:
+        return self._by_symbol.get(symbol.upper().lstrip("$"))
+
+
+
+def resolve_tokens(tokens: list, metadata: TokenMetadataCache, tracked: list) -> tuple:
+    addresses, unresolved = [], []
+    for token in tokens if tokens else tracked:
+        token = (token or "").strip()
+        address = token if ADDRESS.match(token) else metadata.address_for(token)
+        if address is None:
+            unresolved.append(token)
+        elif address.lower() not in (a.lower() for a in addresses):
+            addresses.append(address)
+    return addresses, unresolved
+
+
+
+def format_units(raw, decimals: int) -> str:
+    value = Decimal(int(raw)) / (Decimal(10) ** int(decimals))
+    return format(value.normalize(), "f") if value else "0"
+
+
+
+def value_holding(token_address: str, symbol: str, raw, decimals: int, analysis: dict) -> dict:
+    formatted = format_units(raw, decimals)
+    holding = {
+        "token_address": token_address,
+        "symbol": symbol,
+        "balance": formatted,
+        "raw": str(raw),
+        "decimals": decimals,
+    }
+    if analysis:
+        price = parse_numeric_value(analysis.get("price"))
+        holding.update({
+            "price": analysis.get("price"),
+            "value_usd": round(float(Decimal(formatted) * Decimal(str(price))), 2) if price else None,
+            "risk": analysis.get("risk"),
+            "investmentPotential": analysis.get("investmentPotential"),
+            "change24h": analysis.get("change24h"),
+        })
+    return holding
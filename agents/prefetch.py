@@ -0,0 +1,47 @@
+import time
+import asyncio
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class ParallelPrefetch:
+    def __init__(self, branches: dict, timeouts: dict = None, default_timeout: float = 20):
+        self.branches = branches
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+
+    async def _run_branch(self, name: str, tool, request: str, tool_context) -> dict:
+        timeout = self.timeouts.get(name, self.default_timeout)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                tool.run_async(args={"request": request}, tool_context=tool_context),
+                timeout=timeout,
+            )
+            status = "success"
+        except asyncio.TimeoutError:
+            logger.warning(f"Prefetch branch {name} timed out after {timeout}s")
+            result, status = f"{name} did not answer within {timeout}s", "timeout"
+        except Exception as e:
+            logger.warning(f"Prefetch branch {name} failed: {e}")
+            result, status = str(e), "error"
+        return {
+            "status": status,
+            "result": result,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def run(self, request: str, tool_context) -> dict:
+        names = list(self.branches)
+        outcomes = await asyncio.gather(*[
+            self._run_branch(name, self.branches[name], request, tool_context) for name in names
+        ])
+        branches = dict(zip(names, outcomes))
+        return {
+            "status": "success" if any(b["status"] == "success" for b in outcomes) else "error",
+            **branches,
+        }
@@ -0,0 +1,129 @@
+import os
+import re
+import json
+from mcp_client import parse_tool_content
+
+
+
+HEX = re.compile(r"^0x[0-9a-fA-F]*$")
+MAX_ITEMS = 10
+MAX_HEX_CHARS = 66
+BLOCK_FIELDS = (
+    "number", "hash", "parentHash", "timestamp", "miner", "gasUsed", "gasLimit",
+    "baseFeePerGas", "size", "transactionCount", "transactions",
+)
+TRANSACTION_FIELDS = ("hash", "from", "to", "value", "blockNumber", "nonce", "gas", "gasPrice", "input")
+RECEIPT_FIELDS = (
+    "status", "transactionHash", "blockNumber", "from", "to", "gasUsed", "effectiveGasPrice",
+    "contractAddress", "logCount", "logs",
+)
+
+
+
+def elide_hex(value: str, max_chars: int = MAX_HEX_CHARS) -> str:
+    if len(value) <= max_chars or not HEX.match(value):
+        return value
+    return f"{value[:18]}…{value[-8:]} ({(len(value) - 2) // 2} bytes)"
+
+
+
+def compact(value, max_items: int = MAX_ITEMS, max_hex: int = MAX_HEX_CHARS):
+    if isinstance(value, str):
+        return elide_hex(value, max_hex)
+    if isinstance(value, dict):
+        return {key: compact(item, max_items, max_hex) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [compact(item, max_items, max_hex) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append({"omitted": len(value) - max_items, "total": len(value)})
+        return items
+    return value
+
+
+
+def _pick(content: dict, fields) -> dict:
+    return {key: content[key] for key in fields if key in content}
+
+
+
+def summarize_block(content: dict) -> dict:
+    transactions = content.get("transactions") or []
+    summary = {**content, "transactionCount": len(transactions)}
+    summary["transactions"] = [tx.get("hash") if isinstance(tx, dict) else tx for tx in transactions]
+    return _pick(summary, BLOCK_FIELDS)
+
+
+
+def summarize_receipt(content: dict) -> dict:
+    logs = content.get("logs") or []
+    summary = {**content, "logCount": len(logs)}
+    summary["logs"] = [
+        {"address": log.get("address"), "topic0": (log.get("topics") or [None])[0], "logIndex": log.get("logIndex")}
+        for log in logs if isinstance(log, dict)
+    ]
+    return _pick(summary, RECEIPT_FIELDS)
+
+
+
+SUMMARIES = {
+    "get_latest_block": summarize_block,
+    "get_block_by_number": summarize_block,
+    "get_transaction": lambda content: _pick(content, TRANSACTION_FIELDS),
+    "get_transaction_receipt": summarize_receipt,
+}
+
+
+
+def replace_content(result: dict, content) -> dict:
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    return {**result, "data": {**result["data"], "content": [{"type": "text", "text": text}]}}
+
+
+
+def project_result(name: str, result: dict, detail: str = "summary", fields: list = None) -> dict:
+    content = parse_tool_content(result)
+    if not result.get("success") or result["data"].get("isError") or not isinstance(content, (dict, list)):
+        return result
+    if isinstance(content, dict):
+        if detail != "full" and name in SUMMARIES:
+            content = SUMMARIES[name](content)
+        if fields:
+            content = {key: value for key, value in content.items() if key in fields}
+    if detail != "full":
+        content = compact(content)
+    return replace_content(result, content)
+
+
+
+def fit_budget(response, max_bytes: int = None):
+    max_bytes = max_bytes or int(os.getenv("TOOL_RESULT_MAX_BYTES", "16000"))
+    if len(json.dumps(response, default=str)) <= max_bytes:
+        return response
+    for max_items in (10, 5, 2):
+        shrunk = compact(_expand_content(response), max_items=max_items, max_hex=MAX_HEX_CHARS)
+        if len(json.dumps(shrunk, default=str)) <= max_bytes:
+            return shrunk
+    text = json.dumps(shrunk, default=str)
+    return {
+        "success": response.get("success", True) if isinstance(response, dict) else True,
+        "truncated": True,
+        "original_bytes": len(json.dumps(response, default=str)),
+        "data": text[:max(0, max_bytes - 200)],
+        "note": "Result exceeded the tool result byte budget; ask for a narrower query or fewer fields.",
+    }
+
+
+
+def _expand_content(value):
+    # MCP results carry their payload as a JSON string; parse it so the
+    # compaction can reach inside instead of truncating the string blindly.
+    if isinstance(value, dict):
+        if value.get("type") == "text" and isinstance(value.get("text"), str):
+            try:
+                return {**value, "text": json.loads(value["text"])}
+            except ValueError:
+                return value
+        return {key: _expand_content(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand_content(item) for item in value]
+    return value
@@ -0,0 +1,124 @@
+import os
+import re
+import math
+import threading
+from collections import Counter
+
+
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+WORD = re.compile(r"[a-z0-9][a-z0-9_\-]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it its me my of on or our "
+    "the this to what when where which who why with you your".split()
+)
+
+
+
+def tokenize(text: str) -> list:
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+
+def split_sections(text: str) -> list:
+    sections, trail, lines, in_code = [], [], [], False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body or trail:
+            sections.append({"heading": " > ".join(title for _, title in trail) or "Introduction", "content": body})
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING.match(line)
+        if match:
+            flush()
+            lines = []
+            level = len(match.group(1))
+            trail = [(lvl, title) for lvl, title in trail if lvl < level] + [(level, match.group(2))]
+        else:
+            lines.append(line)
+    flush()
+    return [section for section in sections if section["content"]]
+
+
+
+class ReadmeIndex:
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.mtime = None
+        self.sections = []
+        self.idf = {}
+        self.average_length = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            if mtime == self.mtime:
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                sections = split_sections(f.read())
+            for section in sections:
+                # Headings are repeated so a title match outweighs a passing mention.
+                terms = tokenize(section["heading"]) * 2 + tokenize(section["content"])
+                section["terms"] = Counter(terms)
+                section["length"] = len(terms)
+                section["tokens"] = estimate_tokens(section["content"])
+            document_frequency = Counter(term for section in sections for term in section["terms"])
+            count = len(sections)
+            self.idf = {
+                term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for term, df in document_frequency.items()
+            }
+            self.average_length = sum(s["length"] for s in sections) / count if count else 0
+            self.sections = sections
+            self.mtime = mtime
+
+    def score(self, section: dict, terms: list, idf: dict, average_length: float) -> float:
+        score = 0.0
+        norm = self.k1 * (1 - self.b + self.b * section["length"] / (average_length or 1))
+        for term in terms:
+            frequency = section["terms"].get(term, 0)
+            if frequency:
+                score += idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+        return score
+
+    def search(self, query: str, top_k: int = 3, token_budget: int = 1200) -> dict:
+        self.refresh()
+        # One consistent version: a concurrent refresh swaps all of these together.
+        with self._lock:
+            sections, idf, average_length, mtime = self.sections, self.idf, self.average_length, self.mtime
+        terms = list(dict.fromkeys(tokenize(query)))
+        ranked = sorted(
+            ((self.score(section, terms, idf, average_length), position) for position, section in enumerate(sections)),
+            key=lambda item: (-item[0], item[1]),
+        )
+        results, used = [], 0
+        for score, position in ranked:
+            if score <= 0 or len(results) >= top_k:
+                break
+            section = sections[position]
+            content = section["content"]
+            if used + section["tokens"] > token_budget:
+                if results:
+                    continue
+                content = content[:max(0, token_budget - used) * 4]
+            used += estimate_tokens(content)
+            results.append({"heading": section["heading"], "content": content, "score": round(score, 3)})
+        return {
+            "sections": results,
+            "total_sections": len(sections),
+            "estimated_tokens": used,
+            "last_updated": mtime,
+        }
@@ -0,0 +1,121 @@
+import time
+import logging
+import threading
+from collections import deque
+
+
+
+logger = logging.getLogger(__name__)
+CLOSED = "closed"
+OPEN = "open"
+
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, quantile: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples.get(key) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = list(self._samples)
+        return {
+            key: {
+                "samples": len(self._samples[key]),
+                "p50_ms": _ms(self.percentile(key, 0.5)),
+                "p95_ms": _ms(self.percentile(key, 0.95)),
+                "p99_ms": _ms(self.percentile(key, 0.99)),
+            }
+            for key in keys
+        }
+
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive transport failures. While open
+    # every call fails fast; at most one caller per `probe_interval` checks the
+    # health route, and a healthy answer closes the circuit again.
+    def __init__(self, failure_threshold: int = 5, probe_interval: float = 2):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_probe = 0
+        self.last_error = None
+        self.fast_failed = 0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = self.last_probe = time.monotonic()
+                self.trips += 1
+                logger.warning(f"MCP circuit opened after {self.failures} consecutive failures: {error}")
+
+    def probe_due(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED or now - self.last_probe < self.probe_interval:
+                return False
+            self.last_probe = now
+            return True
+
+    def on_probe(self, healthy: bool):
+        with self._lock:
+            if healthy and self.state == OPEN:
+                logger.info(f"MCP health check passed, closing circuit after {time.monotonic() - self.opened_at:.1f}s")
+                self.state = CLOSED
+                self.failures = 0
+                self.opened_at = None
+
+    def unavailable(self) -> dict:
+        with self._lock:
+            self.fast_failed += 1
+            down_for = time.monotonic() - self.opened_at if self.opened_at else 0
+        return {
+            "success": False,
+            "unavailable": True,
+            "error": f"MCP unavailable: the Sonic MCP server has been unreachable for {down_for:.0f}s "
+                     f"(last error: {self.last_error}). Try again shortly.",
+        }
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "fast_failed": self.fast_failed,
+        }
@@ -0,0 +1,186 @@
+import re
+import json
+import time
+import logging
+from mcp_client import parse_tool_content
+
+
+
+logger = logging.getLogger(__name__)
+ADDRESS = re.compile(r"\b0x[0-9a-fA-F]{40}\b")
+TX_HASH = re.compile(r"\b0x[0-9a-fA-F]{64}\b")
+BLOCK_NUMBER = re.compile(r"\bblock\s*(?:number\s*|no\.?\s*|#\s*)?(\d{1,12})\b", re.IGNORECASE)
+LATEST_BLOCK = re.compile(r"\b(latest|current|newest|last|recent)\s+block\b|\bblock\s+(height|number)\b", re.IGNORECASE)
+BALANCE = re.compile(r"\bbalances?\b|\bhow much\b.*\b(hold|have|own)s?\b", re.IGNORECASE)
+TOKEN_INFO = re.compile(r"\btoken\b.*\b(info|information|details|metadata|name|symbol|decimals|supply)\b|"
+                        r"\b(info|information|details|metadata)\b.*\btoken\b", re.IGNORECASE)
+TX_WORDS = re.compile(r"\b(tx|txn|transaction|hash|receipt|status|confirmed)\b", re.IGNORECASE)
+RECEIPT_WORDS = re.compile(r"\b(receipt|status|confirmed|succeed(ed)?|fail(ed)?|mined)\b", re.IGNORECASE)
+# Anything that needs judgement, a signature or more than one lookup goes to the agents.
+AGENT_WORDS = re.compile(
+    r"\b(send|transfer|approve|swap|buy|sell|write|sign|private|key|recommend|should|analy[sz]e|"
+    r"compare|why|explain|risk|potential|memecoin|best|predict|and then|also)\b",
+    re.IGNORECASE,
+)
+# Any other asset or chain means the native Sonic answer would be the wrong one.
+OTHER_ASSET = re.compile(
+    r"\$\w+|\b(tokens?|erc-?20|erc-?721|nfts?|coins?|stablecoins?|usdc(\.e)?|usdt|dai|eth|weth|btc|wbtc|ws|wrapped|"
+    r"bnb|matic|pol|sol|avax|ftm|arb|op|shadow|beets|equal|metro|anon)\b",
+    re.IGNORECASE,
+)
+TICKER = re.compile(r"\b[A-Z][A-Z0-9]{1,10}\b")
+ALLOWED_TICKERS = {"S", "TX", "TXN", "ID", "API", "USD"}
+OTHER_CHAIN = re.compile(
+    r"\b(ethereum|mainnet\s+eth|bsc|binance|bnb\s+chain|polygon|arbitrum|optimism|avalanche|solana|fantom|opera|"
+    r"blast|linea|scroll|zksync|gnosis|celo|tron|bitcoin)\b|\bon\s+(eth|base|op|arb|avax|ftm|sol)\b",
+    re.IGNORECASE,
+)
+# Lookups the router has no route for; together with a routable one they mean a second question.
+OTHER_LOOKUP = re.compile(
+    r"\b(contract|code|bytecode|nonce|gas|allowance|history|price|worth|value|usd|dollars?|ens|owner|holders?)\b",
+    re.IGNORECASE,
+)
+NUMBER = re.compile(r"(?<![\w.])\d+(?![\w.])")
+MAX_QUERY_LENGTH = 160
+
+
+
+def _intents(text: str) -> set:
+    intents = set()
+    if BALANCE.search(text):
+        intents.add("balance")
+    if TOKEN_INFO.search(text):
+        intents.add("token_info")
+    if TX_WORDS.search(text):
+        intents.add("transaction")
+    if BLOCK_NUMBER.search(text) or LATEST_BLOCK.search(text):
+        intents.add("block")
+    if OTHER_LOOKUP.search(text):
+        intents.add("other")
+    return intents
+
+
+
+def _ambiguous(text: str, route: str) -> bool:
+    # Falling through costs an agent turn; a confident wrong answer costs more.
+    if text.count("?") > 1 or OTHER_CHAIN.search(text):
+        return True
+    if any(ticker not in ALLOWED_TICKERS for ticker in TICKER.findall(ADDRESS.sub("", TX_HASH.sub("", text)))):
+        return True
+    assets = [match.group(0).lower() for match in OTHER_ASSET.finditer(text)]
+    if any(asset != "token" for asset in assets) or (assets and route != "token_info"):
+        return True
+    intents = _intents(text)
+    if route == "transaction_receipt":
+        route = "transaction"
+    if route == "latest_block":
+        route = "block"
+    return intents - {route} != set()
+
+
+
+def classify(text: str):
+    text = (text or "").strip()
+    if not text or len(text) > MAX_QUERY_LENGTH or AGENT_WORDS.search(text):
+        return None
+    routed = _route(text)
+    if routed is None or _ambiguous(text, routed[0]):
+        return None
+    return routed
+
+
+
+def _route(text: str):
+    addresses = ADDRESS.findall(text)
+    hashes = TX_HASH.findall(text)
+    if len(hashes) == 1 and not addresses and TX_WORDS.search(text):
+        return ("transaction_receipt" if RECEIPT_WORDS.search(text) else "transaction", {"tx_hash": hashes[0]})
+    if hashes:
+        return None
+    if len(set(address.lower() for address in addresses)) == 1:
+        if TOKEN_INFO.search(text):
+            return ("token_info", {"token_address": addresses[0]})
+        if BALANCE.search(text):
+            return ("balance", {"address": addresses[0]})
+        return None
+    if addresses:
+        return None
+    numbers = NUMBER.findall(text)
+    match = BLOCK_NUMBER.search(text)
+    if match:
+        return ("block", {"block_number": int(match.group(1))}) if len(numbers) == 1 else None
+    if LATEST_BLOCK.search(text) and not numbers:
+        return ("latest_block", {})
+    return None
+
+
+
+def _summary(content, keys: tuple) -> str:
+    if not isinstance(content, dict):
+        return str(content)
+    lines = [f"- {key}: {content[key]}" for key in keys if content.get(key) not in (None, "", [])]
+    return "\n".join(lines)
+
+
+
+def format_answer(route: str, args: dict, content) -> str:
+    if route == "balance" and isinstance(content, dict):
+        return f"Woof! 🐾 The native balance of `{args['address']}` on Sonic is **{content.get('sonic')} S** ({content.get('wei')} wei)."
+    if route == "token_info":
+        return f"Here's the token info for `{args['token_address']}` on Sonic 🐾\n" + _summary(
+            content, ("name", "symbol", "decimals", "totalSupply", "formattedTotalSupply", "network"))
+    if route in ("block", "latest_block"):
+        if isinstance(content, dict):
+            count = content.get("transactionCount", len(content.get("transactions") or []))
+            content = {**content, "transactions": count}
+        return "Here's the Sonic block you asked about 🐾\n" + _summary(
+            content, ("number", "hash", "timestamp", "transactions", "gasUsed", "gasLimit", "miner", "baseFeePerGas"))
+    if route == "transaction":
+        return f"Here's transaction `{args['tx_hash']}` on Sonic 🐾\n" + _summary(
+            content, ("from", "to", "value", "blockNumber", "nonce", "gas", "gasPrice"))
+    if route == "transaction_receipt":
+        return f"Here's the receipt for `{args['tx_hash']}` on Sonic 🐾\n" + _summary(
+            content, ("status", "blockNumber", "from", "to", "gasUsed", "effectiveGasPrice", "contractAddress"))
+    return json.dumps(content, default=str)
+
+
+
+class FastPathRouter:
+    def __init__(self, handlers: dict, enabled: bool = True):
+        self.handlers = handlers
+        self.enabled = enabled
+        self.stats = {}
+
+    def _record(self, route: str, outcome: str, elapsed: float):
+        entry = self.stats.setdefault(route, {"answered": 0, "fell_through": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry[outcome] += 1
+        entry["total_ms"] += elapsed * 1000
+        entry["max_ms"] = max(entry["max_ms"], elapsed * 1000)
+
+    async def answer(self, text: str):
+        if not self.enabled:
+            return None
+        routed = classify(text)
+        if routed is None or routed[0] not in self.handlers:
+            return None
+        route, args = routed
+        started = time.perf_counter()
+        try:
+            result = await self.handlers[route](**args)
+            content = parse_tool_content(result)
+            if not result.get("success") or result["data"].get("isError") or content is None:
+                self._record(route, "fell_through", time.perf_counter() - started)
+                return None
+            answer = format_answer(route, args, content)
+        except Exception as e:
+            logger.warning(f"Fast path {route} failed, falling back to agents: {e}")
+            self._record(route, "fell_through", time.perf_counter() - started)
+            return None
+        self._record(route, "answered", time.perf_counter() - started)
+        return answer
+
+    def metrics(self) -> dict:
+        return {
+            route: {**entry, "avg_ms": entry["total_ms"] / max(1, entry["answered"] + entry["fell_through"])}
+            for route, entry in self.stats.items()
+        }
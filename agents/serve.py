@@ -0,0 +1,335 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import asyncio
+import logging
+import argparse
+import subprocess
+from contextlib import asynccontextmanager
+import httpx
+import uvicorn
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from admission import FairLimiter, AdmissionRejected
+
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("trendpup.serve")
+AGENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(AGENTS_DIR, '..', '.env'))
+SESSION_PATH = re.compile(r"^/apps/[^/]+/users/[^/]+/sessions/([^/]+)")
+# Agent turns, which the proxy admits before they reach a worker.
+TURN_PATHS = {"/run", "/run_sse"}
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "host", "content-length",
+}
+RESTART_DELAY = 3
+
+
+
+def session_key(path: str, body: bytes, content_type: str) -> str:
+    # The session a request belongs to: from the URL for session routes, from
+    # the JSON body (sessionId or session_id) for /run and /run_sse.
+    match = SESSION_PATH.match(path)
+    if match:
+        return match.group(1)
+    if body and "json" in content_type:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(data, dict):
+            return data.get("sessionId") or data.get("session_id")
+    return None
+
+
+
+class Worker:
+    def __init__(self, index: int, port: int, command: list, env: dict):
+        self.index = index
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.command = command
+        self.env = env
+        self.process = None
+        self.healthy = False
+        self.restarts = 0
+        self.requests = 0
+        self.inflight = 0
+        self.exited_at = None
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, env=self.env)
+        self.healthy = False
+        self.exited_at = None
+        logger.info(f"Worker {self.index} started on port {self.port} (pid {self.process.pid})")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+    def stats(self) -> dict:
+        return {
+            "index": self.index,
+            "port": self.port,
+            "pid": self.process.pid if self.process else None,
+            "healthy": self.healthy,
+            "restarts": self.restarts,
+            "requests": self.requests,
+            "inflight": self.inflight,
+        }
+
+
+
+class WorkerPool:
+    # N `adk api_server` processes on consecutive local ports. A session always
+    # goes to the same worker (crc32 of its id), so its turns never race each
+    # other across processes and stay next to that worker's in-memory caches;
+    # the session store itself (agents/.adk/session.db by default) is shared,
+    # so a session simply moves on to the next worker while its own restarts.
+    def __init__(self, workers: list, health_interval: float = 2):
+        self.workers = workers
+        self.health_interval = health_interval
+        self._client = None
+
+    def candidates(self, key: str) -> list:
+        if key is None:
+            # No session yet: least busy first.
+            ordered = sorted(self.workers, key=lambda worker: (worker.inflight, worker.requests))
+        else:
+            start = zlib.crc32(key.encode("utf-8")) % len(self.workers)
+            ordered = self.workers[start:] + self.workers[:start]
+        return [worker for worker in ordered if worker.healthy] or ordered
+
+    async def check(self, worker: Worker):
+        try:
+            response = await self._client.get(f"{worker.url}/list-apps", timeout=2)
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy and not worker.healthy:
+            logger.info(f"Worker {worker.index} is ready")
+        worker.healthy = healthy
+
+    async def supervise(self):
+        # Restarts crashed workers the way start.sh restarts the tmux sessions.
+        while True:
+            for worker in self.workers:
+                code = worker.process.poll()
+                if code is not None:
+                    if worker.exited_at is None:
+                        logger.warning(f"Worker {worker.index} exited with {code}, restarting in {RESTART_DELAY}s")
+                        worker.healthy = False
+                        worker.exited_at = time.monotonic()
+                    elif time.monotonic() - worker.exited_at >= RESTART_DELAY:
+                        worker.restarts += 1
+                        worker.start()
+                elif not worker.healthy or worker.inflight == 0:
+                    await self.check(worker)
+            await asyncio.sleep(self.health_interval if all(w.healthy for w in self.workers) else 0.2)
+
+    def start(self):
+        self._client = httpx.AsyncClient()
+        for worker in self.workers:
+            worker.start()
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            try:
+                await asyncio.to_thread(worker.process.wait, 10)
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        return {"workers": [worker.stats() for worker in self.workers]}
+
+
+
+class ProxiedResponse(StreamingResponse):
+    # Streams a worker's response. `on_close` runs exactly once however the
+    # client goes away: Starlette skips background tasks on a disconnect.
+    def __init__(self, upstream: httpx.Response, on_close):
+        self.upstream = upstream
+        self.on_close = on_close
+        super().__init__(self.relay(), status_code=upstream.status_code)
+        self.raw_headers = [
+            (name, value) for name, value in upstream.headers.raw
+            if name.decode("latin-1").lower() not in HOP_HEADERS - {"content-length"}
+        ]
+
+    async def relay(self):
+        try:
+            async for chunk in self.upstream.aiter_raw():
+                yield chunk
+        finally:
+            await self.close()
+
+    async def close(self):
+        on_close, self.on_close = self.on_close, None
+        if on_close is not None:
+            on_close()
+            await self.upstream.aclose()
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.close()
+
+
+
+def create_proxy(pool: WorkerPool, limiter: FairLimiter = None) -> Starlette:
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(None, connect=5),
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=256),
+    )
+
+    async def forward(request: Request):
+        body = await request.body()
+        key = session_key(request.url.path, body, request.headers.get("content-type", ""))
+        admitted = False
+        if limiter is not None and request.method == "POST" and request.url.path in TURN_PATHS:
+            # One limit across all workers, checked before any response starts,
+            # so a busy server answers 429 instead of failing mid-stream.
+            try:
+                await limiter.acquire_async(key or "anonymous")
+            except AdmissionRejected as e:
+                return JSONResponse({"error": e.detail}, status_code=429, headers=e.headers)
+            admitted = True
+        headers = [(name, value) for name, value in request.headers.items() if name not in HOP_HEADERS]
+        headers.append(("x-forwarded-for", request.client.host if request.client else ""))
+        try:
+            for worker in pool.candidates(key):
+                upstream = client.build_request(
+                    request.method, f"{worker.url}{request.url.path}", params=request.url.query,
+                    headers=headers, content=body,
+                )
+                worker.inflight += 1
+                try:
+                    response = await client.send(upstream, stream=True)
+                except httpx.ConnectError:
+                    # Nothing reached the worker, so the next one can take the request.
+                    worker.inflight -= 1
+                    worker.healthy = False
+                    continue
+                except BaseException:
+                    worker.inflight -= 1
+                    raise
+                worker.requests += 1
+
+                def done(worker=worker, admitted=admitted):
+                    worker.inflight -= 1
+                    if admitted:
+                        limiter.release()
+
+                admitted = False
+                return ProxiedResponse(response, done)
+        finally:
+            if admitted:
+                limiter.release()
+        return JSONResponse({"error": "No agent worker is available"}, status_code=503, headers={"Retry-After": "3"})
+
+    async def workers(request: Request):
+        stats = pool.stats()
+        if limiter is not None:
+            stats["admission"] = limiter.stats()
+        return JSONResponse(stats)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        pool.start()
+        supervisor = asyncio.create_task(pool.supervise())
+        try:
+            yield
+        finally:
+            supervisor.cancel()
+            await pool.stop()
+            await client.aclose()
+
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+    return Starlette(
+        routes=[Route("/serve/workers", workers), Route("/{path:path}", forward, methods=methods)],
+        lifespan=lifespan,
+    )
+
+
+
+def turn_limiter() -> FairLimiter:
+    # The same AGENT_* limits one `adk api_server` applies to itself, applied
+    # once across the whole pool.
+    return FairLimiter(
+        "TrendPup",
+        max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "16")),
+        max_queue=int(os.getenv("AGENT_MAX_QUEUE", "64")),
+        max_wait=float(os.getenv("AGENT_QUEUE_TIMEOUT", "30")),
+        user_rate=float(os.getenv("AGENT_USER_RATE", "0")),
+        user_burst=float(os.getenv("AGENT_USER_BURST", "5")),
+    )
+
+
+
+def split_limit(value: str, workers: int) -> str:
+    return str(max(1, math.ceil(int(value) / workers)))
+
+
+
+def build_pool(options, extra_args: list) -> WorkerPool:
+    env = dict(os.environ)
+    # Workers share MCP results and the parsed token data through one SQLite file.
+    env["SHARED_CACHE_PATH"] = env.get("SHARED_CACHE_PATH") or os.path.join(
+        AGENTS_DIR, '..', 'backend', 'data', 'shared_cache.sqlite'
+    )
+    # The proxy admits turns against the global AGENT_* limits, so a worker
+    # never sees more than AGENT_MAX_CONCURRENT of them and skips the per-session
+    # rate it would otherwise apply a second time. Each worker has its own MCP
+    # limiter, so the MCP limits are split between the workers to keep their
+    # sum at the configured totals.
+    env["AGENT_USER_RATE"] = "0"
+    mcp_concurrent = env.get("SONIC_MCP_MAX_CONCURRENT") or env.get("SONIC_MCP_POOL_SIZE") or "20"
+    env["SONIC_MCP_MAX_CONCURRENT"] = split_limit(mcp_concurrent, options.workers)
+    env["SONIC_MCP_MAX_QUEUE"] = split_limit(env.get("SONIC_MCP_MAX_QUEUE") or "200", options.workers)
+    workers = []
+    for index in range(options.workers):
+        port = options.worker_base_port + index
+        worker_env = {**env, "SERVE_WORKER_INDEX": str(index)}
+        if env.get("METRICS_PORT"):
+            worker_env["METRICS_PORT"] = str(int(env["METRICS_PORT"]) + index)
+        command = [
+            sys.executable, "-m", "google.adk.cli", "api_server", options.agents_dir,
+            "--host", "127.0.0.1", "--port", str(port), *extra_args,
+        ]
+        workers.append(Worker(index, port, command, worker_env))
+    return WorkerPool(workers)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the agents from several `adk api_server` workers behind one port. "
+                    "Unrecognised options are passed on to every worker."
+    )
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVE_WORKERS", "4")))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--worker_base_port", type=int, default=int(os.getenv("SERVE_WORKER_BASE_PORT", "8100")))
+    parser.add_argument("--agents_dir", default=AGENTS_DIR)
+    options, extra_args = parser.parse_known_args()
+    pool = build_pool(options, extra_args)
+    uvicorn.run(create_proxy(pool, turn_limiter()), host=options.host, port=options.port, log_level="warning")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+
+
+
+logger = logging.getLogger(__name__)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tag TEXT,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored REAL NOT NULL,
+    expires REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_tag ON entries (namespace, tag);
+CREATE INDEX IF NOT EXISTS entries_stored ON entries (stored);
+"""
+
+
+
+class SharedCache:
+    # Pickled values in one SQLite file, so every worker process behind
+    # serve.py reuses what another one already fetched or parsed. Entries
+    # expire by wall-clock time; the oldest entries go once `max_bytes` is
+    # exceeded. Each thread keeps its own connection. A lookup that finds the
+    # file locked for longer than `busy_timeout` seconds counts as a miss
+    # instead of waiting on the writer.
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, prune_every: int = 200,
+                 busy_timeout: float = 0.1):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = {}
+        self.misses = {}
+        self.stores = {}
+        self.errors = 0
+
+    def connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter: dict, namespace: str):
+        with self._lock:
+            counter[namespace] = counter.get(namespace, 0) + 1
+
+    def get(self, namespace: str, key: str) -> tuple:
+        # (value, seconds left or None for no expiry), or None on a miss.
+        try:
+            row = self.connect().execute(
+                "SELECT value, expires FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            self._count(self.misses, namespace)
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+        now = time.time()
+        if row is None or (row[1] is not None and row[1] <= now):
+            self._count(self.misses, namespace)
+            return None
+        self._count(self.hits, namespace)
+        return pickle.loads(row[0]), (row[1] - now if row[1] is not None else None)
+
+    def put(self, namespace: str, key: str, value, ttl: float = None, tag: str = None):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, tag, value, size, stored, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, key, tag, payload, len(payload), now, now + ttl if ttl is not None else None),
+                )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache write failed: {e}")
+            return
+        self._count(self.stores, namespace)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def tagged(self, namespace: str, tags: tuple) -> list:
+        # (key, tag) of every entry carrying one of `tags`.
+        marks = ",".join("?" * len(tags))
+        try:
+            return self.connect().execute(
+                f"SELECT key, tag FROM entries WHERE namespace = ? AND tag IN ({marks})", (namespace, *tags)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache read failed: {e}")
+            return []
+
+    def delete(self, namespace: str, keys: list):
+        if not keys:
+            return
+        try:
+            connection = self.connect()
+            with connection:
+                connection.executemany(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", [(namespace, key) for key in keys]
+                )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache delete failed: {e}")
+
+    def prune(self):
+        try:
+            connection = self.connect()
+            with connection:
+                connection.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    # Drop the oldest entries until the file is back under 90% of the cap.
+                    excess, freed = total - self.max_bytes * 0.9, 0
+                    stale = []
+                    for namespace, key, size in connection.execute(
+                        "SELECT namespace, key, size FROM entries ORDER BY stored"
+                    ):
+                        stale.append((namespace, key))
+                        freed += size
+                        if freed >= excess:
+                            break
+                    connection.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", stale)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache prune failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = sorted(set(self.hits) | set(self.misses) | set(self.stores))
+            return {
+                "errors": self.errors,
+                "by_namespace": {
+                    namespace: {
+                        "hits": self.hits.get(namespace, 0),
+                        "misses": self.misses.get(namespace, 0),
+                        "stores": self.stores.get(namespace, 0),
+                    }
+                    for namespace in namespaces
+                },
+            }
@@ -0,0 +1,43 @@
+import asyncio
+
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.calls = {}
+        self.coalesced = {}
+
+    async def do(self, key, fn, label: str = None):
+        label = label or str(key)
+        flight_key = (id(asyncio.get_running_loop()), key)
+        self.calls[label] = self.calls.get(label, 0) + 1
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish(flight_key, done))
+        else:
+            self.coalesced[label] = self.coalesced.get(label, 0) + 1
+        # Shielded so one caller giving up doesn't cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key, task):
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        return {
+            "calls": sum(self.calls.values()),
+            "coalesced": sum(self.coalesced.values()),
+            "in_flight": self.in_flight(),
+            "by_key": {
+                label: {"calls": self.calls[label], "coalesced": self.coalesced.get(label, 0)}
+                for label in sorted(self.calls)
+            },
+        }
@@ -0,0 +1,343 @@
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+
+
+logger = logging.getLogger(__name__)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+TRACE_KEY = "trace_session_id"
+
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative(self) -> list:
+        total, out = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+
+def _size(value) -> int:
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+
+def _is_error(response) -> bool:
+    return isinstance(response, dict) and (response.get("success") is False or response.get("status") == "error")
+
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+
+def _model_name(callback_context) -> str:
+    agent = getattr(callback_context._invocation_context, "agent", None)
+    model = getattr(agent, "model", None)
+    return model if isinstance(model, str) else getattr(model, "model", None) or "unknown"
+
+
+
+class Telemetry:
+    # Callbacks for ADK agents: tool calls (FunctionTool and AgentTool hops),
+    # agent runs and model calls are timed and sized, aggregated into
+    # Prometheus series and optionally kept as spans keyed by session id.
+    def __init__(self, trace_spans: bool = False, max_spans: int = 5000, max_inflight_age: float = 900):
+        self.trace_spans = trace_spans
+        self.max_inflight_age = max_inflight_age
+        self._series = {}
+        self._inflight = {}
+        self._swept = time.perf_counter()
+        self._tokens = {}
+        self._spans = deque(maxlen=max_spans)
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @staticmethod
+    def trace_id(context) -> str:
+        try:
+            return context.state.get(TRACE_KEY) or context.session.id
+        except Exception:
+            return None
+
+    def record(self, kind: str, name: str, agent: str, seconds: float, error: bool = False,
+               request_bytes: int = 0, response_bytes: int = 0, trace_id: str = None, started_at: float = None,
+               attributes: dict = None):
+        key = (kind, name, agent or "")
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "request_bytes": 0,
+                    "latency": Histogram(LATENCY_BUCKETS),
+                    "response_bytes": Histogram(SIZE_BUCKETS),
+                }
+            series["calls"] += 1
+            series["errors"] += int(bool(error))
+            series["request_bytes"] += request_bytes
+            series["latency"].observe(seconds)
+            series["response_bytes"].observe(response_bytes)
+            if self.trace_spans:
+                self._spans.append({
+                    "trace_id": trace_id,
+                    "kind": kind,
+                    "name": name,
+                    "agent": agent,
+                    "start": started_at,
+                    "duration_ms": round(seconds * 1000, 2),
+                    "error": bool(error),
+                    "request_bytes": request_bytes,
+                    "response_bytes": response_bytes,
+                    **(attributes or {}),
+                })
+
+    def _start(self, key: tuple, request_bytes: int = 0):
+        now = time.perf_counter()
+        with self._lock:
+            self._inflight[key] = (now, time.time(), request_bytes)
+            if now - self._swept >= 60:
+                # A cancelled run gets no after/error callback; drop what it left behind.
+                self._swept = now
+                for stale in [k for k, v in self._inflight.items() if now - v[0] > self.max_inflight_age]:
+                    del self._inflight[stale]
+
+    def _finish(self, key: tuple):
+        with self._lock:
+            started = self._inflight.pop(key, None)
+        if started is None:
+            return None
+        return time.perf_counter() - started[0], started[1], started[2]
+
+    @staticmethod
+    def _tool_key(tool, tool_context) -> tuple:
+        return ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name)
+
+    def before_tool(self, tool, args, tool_context):
+        self._start(self._tool_key(tool, tool_context), _size(args))
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        finished = self._finish(self._tool_key(tool, tool_context))
+        if finished is not None:
+            elapsed, started_at, request_bytes = finished
+            self.record("tool", tool.name, tool_context.agent_name, elapsed, _is_error(tool_response),
+                        request_bytes, _size(tool_response), self.trace_id(tool_context), started_at)
+        return None
+
+    def on_tool_error(self, tool, args, tool_context, error):
+        finished = self._finish(self._tool_key(tool, tool_context))
+        if finished is not None:
+            elapsed, started_at, request_bytes = finished
+            self.record("tool", tool.name, tool_context.agent_name, elapsed, True, request_bytes, 0,
+                        self.trace_id(tool_context), started_at, {"exception": type(error).__name__})
+        return None
+
+    def before_agent(self, callback_context):
+        if self.trace_spans and not callback_context.state.get(TRACE_KEY):
+            # Copied into AgentTool child sessions so sub-agent spans share the root session's trace.
+            callback_context.state[TRACE_KEY] = callback_context.session.id
+        self._start(("agent", callback_context.invocation_id, callback_context.agent_name))
+        return None
+
+    def after_agent(self, callback_context, attributes: dict = None):
+        finished = self._finish(("agent", callback_context.invocation_id, callback_context.agent_name))
+        if finished is not None:
+            elapsed, started_at, _ = finished
+            self.record("agent", callback_context.agent_name, callback_context.agent_name, elapsed,
+                        trace_id=self.trace_id(callback_context), started_at=started_at, attributes=attributes)
+        return None
+
+    def before_model(self, callback_context, llm_request):
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name), _size(
+            [content.model_dump(exclude_none=True) for content in llm_request.contents or []]
+        ))
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        if getattr(llm_response, "partial", False):
+            return None
+        finished = self._finish(("model", callback_context.invocation_id, callback_context.agent_name))
+        if finished is None:
+            return None
+        elapsed, started_at, request_bytes = finished
+        usage = llm_response.usage_metadata
+        tokens = {
+            "prompt": (usage.prompt_token_count or 0) if usage else 0,
+            "completion": (usage.candidates_token_count or 0) if usage else 0,
+        }
+        with self._lock:
+            for token_type, count in tokens.items():
+                key = (callback_context.agent_name, token_type)
+                self._tokens[key] = self._tokens.get(key, 0) + count
+        response_bytes = _size(llm_response.content.model_dump(exclude_none=True)) if llm_response.content else 0
+        # Tiered models stamp the concrete model that answered on the response.
+        model = llm_response.model_version or _model_name(callback_context)
+        self.record("model", model, callback_context.agent_name, elapsed,
+                    bool(llm_response.error_code), request_bytes, response_bytes,
+                    self.trace_id(callback_context), started_at,
+                    {"prompt_tokens": tokens["prompt"], "completion_tokens": tokens["completion"]})
+        return None
+
+    def on_model_error(self, callback_context, llm_request, error):
+        finished = self._finish(("model", callback_context.invocation_id, callback_context.agent_name))
+        if finished is not None:
+            elapsed, started_at, request_bytes = finished
+            self.record("model", _model_name(callback_context), callback_context.agent_name, elapsed, True,
+                        request_bytes, 0, self.trace_id(callback_context), started_at,
+                        {"exception": type(error).__name__})
+        return None
+
+    def callbacks(self, before_agent: list = None, after_agent: list = None, after_tool: list = None) -> dict:
+        return {
+            "before_agent_callback": [self.before_agent, *(before_agent or [])],
+            "after_agent_callback": [self.after_agent, *(after_agent or [])],
+            "before_model_callback": self.before_model,
+            "after_model_callback": self.after_model,
+            "on_model_error_callback": self.on_model_error,
+            "before_tool_callback": self.before_tool,
+            "after_tool_callback": [self.after_tool, *(after_tool or [])],
+            "on_tool_error_callback": self.on_tool_error,
+        }
+
+    def add_collector(self, collector):
+        # collector() -> [(metric, type, help, [(labels, value), ...]), ...]
+        self._collectors.append(collector)
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def family(metric: str, kind: str, help_text: str, samples: list):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric}{suffix}{_labels(labels)} {_number(value)}")
+
+        def histogram(metric: str, help_text: str, field: str):
+            samples = []
+            for (kind, name, agent), value in sorted(series.items()):
+                labels = {"kind": kind, "name": name, "agent": agent}
+                for bound, count in value[field].cumulative():
+                    samples.append(("_bucket", {**labels, "le": _number(bound)}, count))
+                samples.append(("_bucket", {**labels, "le": "+Inf"}, value[field].count))
+                samples.append(("_sum", labels, round(value[field].sum, 6)))
+                samples.append(("_count", labels, value[field].count))
+            family(metric, "histogram", help_text, samples)
+
+        def counter(metric: str, help_text: str, field: str):
+            family(metric, "counter", help_text, [
+                ("", {"kind": kind, "name": name, "agent": agent}, value[field])
+                for (kind, name, agent), value in sorted(series.items())
+            ])
+
+        with self._lock:
+            series = self._series
+            counter("trendpup_calls_total", "Completed tool, agent and model calls.", "calls")
+            counter("trendpup_errors_total", "Calls that raised or returned an error result.", "errors")
+            counter("trendpup_request_bytes_total", "Serialized size of call arguments.", "request_bytes")
+            histogram("trendpup_latency_seconds", "Call latency.", "latency")
+            histogram("trendpup_response_bytes", "Serialized size of call results.", "response_bytes")
+            family("trendpup_model_tokens_total", "Model tokens by agent.", "counter", [
+                ("", {"agent": agent, "type": token_type}, count)
+                for (agent, token_type), count in sorted(self._tokens.items())
+            ])
+        for collector in self._collectors:
+            try:
+                for metric, kind, help_text, samples in collector():
+                    family(metric, kind, help_text, [("", labels, value) for labels, value in samples])
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        return "\n".join(lines) + "\n"
+
+    def spans(self, trace_id: str = None, limit: int = 200) -> list:
+        with self._lock:
+            spans = [span for span in self._spans if trace_id is None or span["trace_id"] == trace_id]
+        return spans[-limit:]
+
+    def slowest(self, limit: int = 20) -> list:
+        with self._lock:
+            spans = list(self._spans)
+        return sorted(spans, key=lambda span: span["duration_ms"], reverse=True)[:limit]
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        if self._server is not None:
+            return self._server
+        # Imported here so processes without METRICS_PORT never load the HTTP server modules.
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from urllib.parse import urlparse, parse_qs
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: str, content_type: str):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path == "/metrics":
+                    self._send(200, telemetry.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+                elif url.path == "/traces":
+                    limit = int(query.get("limit", "200"))
+                    spans = telemetry.slowest(limit) if query.get("slowest") else telemetry.spans(query.get("session_id"), limit)
+                    self._send(200, json.dumps({"spans": spans}), "application/json")
+                else:
+                    self._send(404, json.dumps({"error": "Not found"}), "application/json")
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # Another worker already owns the port; keep collecting without an endpoint.
+            logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return self._server
@@ -0,0 +1,220 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+from itertools import takewhile
+from statistics import median
+
+
+
+logger = logging.getLogger(__name__)
+ROW_FIELDS = ("symbol", "chain", "risk", "investmentPotential", "change24h")
+LOW_RISK = 4
+CHANGE_EDGES = (-50, -20, -5, 5, 20, 50)
+AGE_BUCKETS = (("<1h", 3600), ("1h-24h", 86400), ("1d-7d", 604800), ("7d-30d", 2592000), (">30d", math.inf))
+# name: (column, descending, row filter)
+RANKINGS = {
+    "top_potential": ("investmentPotential", True, None),
+    "lowest_risk": ("risk", False, None),
+    "low_risk_high_potential": (
+        "investmentPotential", True, lambda columns, p: columns["risk"][p] is not None and columns["risk"][p] <= LOW_RISK,
+    ),
+    "top_gainers": ("change24h", True, None),
+    "top_losers": ("change24h", False, None),
+    "highest_volume": ("volume", True, None),
+    "largest_market_cap": ("marketCap", True, None),
+    "newest": ("age", False, lambda columns, p: columns["age"][p] != math.inf),
+}
+VIEWS = ("summary", "ranking", "histograms", "age_buckets", "chains", "change_above")
+
+
+
+def _present(values: list) -> list:
+    return [value for value in values if value is not None and value != math.inf]
+
+
+
+def _summary(values: list) -> dict:
+    values = _present(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+        "mean": round(sum(values) / len(values), 4),
+        "median": round(median(values), 4),
+    }
+
+
+
+def _histogram(values: list, edges: tuple) -> list:
+    counts = [0] * (len(edges) + 1)
+    for value in _present(values):
+        counts[sum(1 for edge in edges if value > edge)] += 1
+    labels = [f"<={edges[0]}"] + [f"{low}..{high}" for low, high in zip(edges, edges[1:])] + [f">{edges[-1]}"]
+    return [{"bucket": label, "count": count} for label, count in zip(labels, counts)]
+
+
+
+def _score_histogram(values: list) -> list:
+    counts = [0] * 11
+    for value in _present(values):
+        counts[max(0, min(10, int(value)))] += 1
+    return [{"score": score, "count": count} for score, count in enumerate(counts)]
+
+
+
+def _mean(values: list) -> float:
+    values = _present(values)
+    return round(sum(values) / len(values), 2) if values else None
+
+
+
+def build_snapshot(tokens: list, columns: dict, version: float, top: int = 25) -> dict:
+    # Works column by column over the parsed token table: each ranking is one
+    # sort of a position list, each histogram one pass over a column.
+    positions = range(len(tokens))
+    rows = [{field: token[field] for field in ROW_FIELDS} for token in tokens]
+
+    def ranked(column: str, descending: bool, keep) -> list:
+        values = columns[column]
+        chosen = [p for p in positions if values[p] is not None and (keep is None or keep(columns, p))]
+        chosen.sort(key=lambda p: values[p], reverse=descending)
+        return [{**rows[p], column: values[p]} for p in chosen[:top]]
+
+    by_age, by_chain = {}, {}
+    for p in positions:
+        age = columns["age"][p]
+        label = next((name for name, limit in AGE_BUCKETS if age < limit), "unknown")
+        by_age.setdefault(label, []).append(p)
+        by_chain.setdefault(tokens[p]["chain"] or "unknown", []).append(p)
+
+    def group(members: list) -> dict:
+        return {
+            "count": len(members),
+            **{
+                f"avg_{column}": _mean([columns[column][p] for p in members])
+                for column in ("risk", "investmentPotential", "change24h")
+            },
+        }
+
+    change = columns["change24h"]
+    return {
+        "version": version,
+        "generated_at": time.time(),
+        "total_tokens": len(tokens),
+        "rankings": {name: ranked(*spec) for name, spec in RANKINGS.items()},
+        "histograms": {
+            "risk": _score_histogram(columns["risk"]),
+            "investmentPotential": _score_histogram(columns["investmentPotential"]),
+            "change24h": _histogram(change, CHANGE_EDGES),
+        },
+        "stats": {
+            column: _summary(columns[column])
+            for column in ("risk", "investmentPotential", "change24h", "price", "volume", "marketCap")
+        },
+        "age_buckets": {
+            name: group(by_age[name]) for name, _ in (*AGE_BUCKETS, ("unknown", None)) if name in by_age
+        },
+        "chains": {chain: group(members) for chain, members in sorted(by_chain.items())},
+        # change24h descending, for threshold questions.
+        "by_change": [rows[p] for p in sorted((p for p in positions if change[p] is not None), key=lambda p: -change[p])],
+    }
+
+
+
+class AnalyticsSnapshot:
+    # Recomputes the snapshot whenever the TokenIndex's source file changes,
+    # either from the watcher thread or lazily on read. With `path` set, each
+    # snapshot is also written there for other processes to read; with
+    # `shared` (a SharedCache) worker processes build each version only once.
+    def __init__(self, index, path: str = None, shared=None):
+        self.index = index
+        self.path = path
+        self.shared = shared
+        self.snapshot = None
+        self.builds = 0
+        self.build_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self) -> dict:
+        tokens, columns, version = self.index.table()
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot["version"] == version:
+            return snapshot
+        with self._lock:
+            if self.snapshot is not None and self.snapshot["version"] == version:
+                return self.snapshot
+            key = f"{os.path.abspath(self.index.path)}:{version}"
+            shared = self.shared.get("analytics", key) if self.shared is not None else None
+            if shared is not None:
+                self.snapshot = shared[0]
+                return self.snapshot
+            started = time.perf_counter()
+            snapshot = build_snapshot(tokens, columns, version)
+            self.build_seconds = time.perf_counter() - started
+            self.builds += 1
+            self.snapshot = snapshot
+            if self.shared is not None:
+                tag = os.path.abspath(self.index.path)
+                self.shared.delete("analytics", [old for old, _ in self.shared.tagged("analytics", (tag,)) if old != key])
+                self.shared.put("analytics", key, snapshot, tag=tag)
+        if self.path:
+            self._write(snapshot)
+        return snapshot
+
+    def _write(self, snapshot: dict):
+        try:
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write analytics snapshot: {e}")
+
+    def start_watcher(self, interval: float = 5):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    if os.path.exists(self.index.path):
+                        self.refresh()
+                except Exception as e:
+                    logger.warning(f"Analytics snapshot refresh failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="token-analytics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def view(self, view: str = "summary", ranking: str = "", min_change24h: float = None, limit: int = 10) -> dict:
+        if view not in VIEWS:
+            raise ValueError(f"view must be one of {', '.join(VIEWS)}")
+        snapshot = self.refresh()
+        limit = max(1, min(int(limit or 10), 25))
+        meta = {"view": view, "total_tokens": snapshot["total_tokens"], "last_updated": snapshot["version"]}
+        if view == "summary":
+            return {**meta, "stats": snapshot["stats"], "rankings": list(RANKINGS), "top": {
+                name: [row["symbol"] for row in rows[:3]] for name, rows in snapshot["rankings"].items()
+            }}
+        if view == "ranking":
+            if ranking not in RANKINGS:
+                raise ValueError(f"ranking must be one of {', '.join(RANKINGS)}")
+            return {**meta, "ranking": ranking, "results": snapshot["rankings"][ranking][:limit]}
+        if view == "change_above":
+            threshold = float(min_change24h or 0)
+            matches = list(takewhile(lambda row: row["change24h"] > threshold, snapshot["by_change"]))
+            return {**meta, "min_change24h": threshold, "matched": len(matches), "results": matches[:limit]}
+        return {**meta, view: snapshot[view]}
+
+    def stats(self) -> dict:
+        return {"builds": self.builds, "build_seconds": self.build_seconds}
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import math
+import threading
+
+
+
+TOKEN_FIELDS = (
+    "symbol", "symbol1", "address", "chain", "risk", "investmentPotential", "rationale", "price",
+    "volume", "marketCap", "change24h", "age", "href", "imageUrl", "lastAnalyzed",
+)
+SORT_FIELDS = ("investmentPotential", "risk", "change24h", "price", "volume", "marketCap", "age")
+DEFAULT_FIELDS = ("symbol", "chain", "risk", "investmentPotential", "price", "change24h", "volume", "marketCap", "age")
+
+
+
+def parse_numeric_value(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value or value in ("N/A", "-"):
+        return 0.0
+    cleaned = re.sub(r"[,$\s]", "", str(value).lower())
+    multiplier = 1
+    if "k" in cleaned:
+        multiplier = 1_000
+    elif "m" in cleaned:
+        multiplier = 1_000_000
+    elif "b" in cleaned:
+        multiplier = 1_000_000_000
+    try:
+        return float(re.sub(r"[kmb]", "", cleaned)) * multiplier
+    except ValueError:
+        return 0.0
+
+
+
+def parse_age_seconds(value) -> float:
+    match = re.search(r"(\d+)(mo|[smhdy])", str(value or ""))
+    if not match:
+        return math.inf
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "mo": 2592000, "y": 31536000}
+    return int(match.group(1)) * units[match.group(2)]
+
+
+
+def _number(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+
+def normalize_token(item: dict) -> dict:
+    # ai_analyzer.json stores investmentPotential as "potential".
+    return {
+        "symbol": item.get("symbol", ""),
+        "symbol1": item.get("symbol1") or "",
+        "address": item.get("address") or item.get("tokenAddress") or item.get("contractAddress"),
+        "chain": item.get("chain") or "",
+        "risk": _number(item.get("risk")),
+        "investmentPotential": _number(item.get("investmentPotential", item.get("potential"))),
+        "rationale": item.get("rationale") or "",
+        "price": item.get("price"),
+        "volume": item.get("volume"),
+        "marketCap": item.get("marketCap"),
+        "change24h": _number(item.get("change24h")),
+        "age": item.get("age"),
+        "href": item.get("href"),
+        "imageUrl": item.get("imageUrl"),
+        "lastAnalyzed": item.get("lastAnalyzed"),
+    }
+
+
+
+def _bucket(score) -> int:
+    return max(0, min(10, int(score))) if score is not None else -1
+
+
+
+class TokenIndex:
+    # With `shared` (a SharedCache), the parsed table for each file version is
+    # stored once and loaded by the other worker processes instead of each
+    # re-parsing ai_analyzer.json.
+    def __init__(self, path: str, shared=None):
+        self.path = path
+        self.shared = shared
+        self.mtime = None
+        self.tokens = []
+        self.by_symbol = {}
+        self.by_chain = {}
+        self.by_risk = {}
+        self.by_potential = {}
+        self.sort_keys = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            if mtime == self.mtime:
+                return
+            key = f"{os.path.abspath(self.path)}:{mtime}"
+            parsed = self.shared.get("token_index", key) if self.shared is not None else None
+            if parsed is not None:
+                self._assign(*parsed[0])
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._build([normalize_token(item) for item in data.get("results", []) if isinstance(item, dict)])
+                if self.shared is not None:
+                    self._share(key)
+            self.mtime = mtime
+
+    def _share(self, key: str):
+        tag = os.path.abspath(self.path)
+        self.shared.delete("token_index", [old for old, _ in self.shared.tagged("token_index", (tag,)) if old != key])
+        self.shared.put("token_index", key, (
+            self.tokens, self.by_symbol, self.by_chain, self.by_risk, self.by_potential, self.sort_keys,
+        ), tag=tag)
+
+    def _assign(self, tokens, by_symbol, by_chain, by_risk, by_potential, sort_keys):
+        self.tokens, self.by_symbol, self.by_chain = tokens, by_symbol, by_chain
+        self.by_risk, self.by_potential, self.sort_keys = by_risk, by_potential, sort_keys
+
+    def _build(self, tokens: list):
+        by_symbol, by_chain, by_risk, by_potential = {}, {}, {}, {}
+        for position, token in enumerate(tokens):
+            for symbol in (token["symbol"], token["symbol1"]):
+                if symbol:
+                    by_symbol.setdefault(symbol.upper().lstrip("$"), []).append(position)
+            by_chain.setdefault(token["chain"].lower(), []).append(position)
+            by_risk.setdefault(_bucket(token["risk"]), []).append(position)
+            by_potential.setdefault(_bucket(token["investmentPotential"]), []).append(position)
+        sort_keys = {
+            "investmentPotential": [t["investmentPotential"] for t in tokens],
+            "risk": [t["risk"] for t in tokens],
+            "change24h": [t["change24h"] for t in tokens],
+            "price": [parse_numeric_value(t["price"]) for t in tokens],
+            "volume": [parse_numeric_value(t["volume"]) for t in tokens],
+            "marketCap": [parse_numeric_value(t["marketCap"]) for t in tokens],
+            "age": [parse_age_seconds(t["age"]) for t in tokens],
+        }
+        self._assign(tokens, by_symbol, by_chain, by_risk, by_potential, sort_keys)
+
+    def _candidates(self, symbol, chain, min_risk, max_risk, min_potential, max_potential) -> set:
+        candidates = set(range(len(self.tokens)))
+        if symbol:
+            candidates &= set(self.by_symbol.get(symbol.upper().lstrip("$"), []))
+        if chain:
+            candidates &= set(self.by_chain.get(chain.lower(), []))
+        for index, low, high in ((self.by_risk, min_risk, max_risk), (self.by_potential, min_potential, max_potential)):
+            if low is None and high is None:
+                continue
+            low_bucket = _bucket(low) if low is not None else 0
+            high_bucket = _bucket(high) if high is not None else 10
+            candidates &= {p for b in range(low_bucket, high_bucket + 1) for p in index.get(b, [])}
+        return candidates
+
+    def table(self) -> tuple:
+        self.refresh()
+        with self._lock:
+            return self.tokens, self.sort_keys, self.mtime
+
+    def tracked_addresses(self) -> list:
+        self.refresh()
+        return [token["address"] for token in self.tokens if token["address"]]
+
+    def query(self, symbol: str = None, chain: str = None, min_risk: float = None, max_risk: float = None,
+              min_potential: float = None, max_potential: float = None, min_change24h: float = None,
+              max_change24h: float = None, sort_by: str = "investmentPotential", descending: bool = True,
+              limit: int = 10, fields: list = None) -> dict:
+        self.refresh()
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_FIELDS)}")
+        fields = [f for f in (fields or DEFAULT_FIELDS) if f in TOKEN_FIELDS] or list(DEFAULT_FIELDS)
+        with self._lock:
+            tokens, keys = self.tokens, self.sort_keys[sort_by]
+            candidates = sorted(self._candidates(symbol, chain, min_risk, max_risk, min_potential, max_potential))
+        bounds = (
+            ("risk", min_risk, max_risk),
+            ("investmentPotential", min_potential, max_potential),
+            ("change24h", min_change24h, max_change24h),
+        )
+        matches = []
+        for position in candidates:
+            token = tokens[position]
+            if all(
+                (low is None or (token[name] is not None and token[name] >= low)) and
+                (high is None or (token[name] is not None and token[name] <= high))
+                for name, low, high in bounds
+            ):
+                matches.append(position)
+        # Tokens without a value for the sort field always go last.
+        matches.sort(key=lambda p: (keys[p] is None, -keys[p] if descending and keys[p] is not None else keys[p] or 0))
+        limit = max(1, min(int(limit or 10), 100))
+        return {
+            "total_tokens": len(tokens),
+            "matched": len(matches),
+            "results": [{f: tokens[p][f] for f in fields} for p in matches[:limit]],
+            "last_updated": self.mtime,
+        }
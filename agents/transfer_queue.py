@@ -0,0 +1,142 @@
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+
+
+
+NATIVE_TOKENS = ("", "s", "native", "sonic")
+QUEUED = "queued"
+SUBMITTING = "submitting"
+SUBMITTED = "submitted"
+# Rejected before anything was broadcast, so a retry may send it again.
+FAILED = "failed"
+# The send may or may not have been broadcast; never re-sent automatically.
+UNKNOWN = "unknown"
+
+
+
+def is_native(token) -> bool:
+    return (token or "").strip().lower() in NATIVE_TOKENS
+
+
+
+def item_fingerprint(item: dict) -> str:
+    token = "native" if is_native(item.get("token")) else item["token"].lower()
+    return json.dumps([item["to"].lower(), token, str(item["amount"])])
+
+
+
+class IdempotencyStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS transfers ("
+                "item_key TEXT PRIMARY KEY, job_key TEXT NOT NULL, item_index INTEGER NOT NULL, "
+                "fingerprint TEXT NOT NULL, to_address TEXT, token TEXT, amount TEXT, status TEXT NOT NULL, "
+                "tx_hash TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS transfers_job ON transfers (job_key, item_index)")
+            self._ready = True
+        return connection
+
+    def claim(self, job_key: str, index: int, item: dict) -> dict:
+        # Returns the stored row when this item was already handled, otherwise
+        # marks it as submitting so a concurrent retry of the same job skips it.
+        item_key = f"{job_key}:{index}"
+        fingerprint = item_fingerprint(item)
+        with self._lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    # The implicit transaction only starts at the INSERT; take the
+                    # write lock first so workers sharing the file cannot both claim.
+                    connection.execute("BEGIN IMMEDIATE")
+                    row = connection.execute("SELECT * FROM transfers WHERE item_key = ?", (item_key,)).fetchone()
+                    if row is not None and row["fingerprint"] != fingerprint:
+                        return {**dict(row), "status": FAILED, "claimed": False,
+                                "error": "Idempotency key was already used for a different transfer"}
+                    if row is not None and row["status"] != FAILED:
+                        return {**dict(row), "claimed": False}
+                    connection.execute(
+                        "INSERT OR REPLACE INTO transfers (item_key, job_key, item_index, fingerprint, to_address, token, "
+                        "amount, status, tx_hash, error, attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                        (item_key, job_key, index, fingerprint, item["to"], item.get("token") or "native",
+                         str(item["amount"]), SUBMITTING, (row["attempts"] if row else 0) + 1, time.time()),
+                    )
+            finally:
+                connection.close()
+        return {"item_key": item_key, "status": SUBMITTING, "claimed": True}
+
+    def finish(self, item_key: str, tx_hash: str = None, error: str = None, rejected: bool = False) -> str:
+        status = SUBMITTED if tx_hash else FAILED if rejected else UNKNOWN
+        with self._lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "UPDATE transfers SET status = ?, tx_hash = ?, error = ?, updated_at = ? WHERE item_key = ?",
+                        (status, tx_hash, error, time.time(), item_key),
+                    )
+            finally:
+                connection.close()
+        return status
+
+    def job(self, job_key: str) -> list:
+        with self._lock:
+            connection = self.connect()
+            try:
+                rows = connection.execute(
+                    "SELECT * FROM transfers WHERE job_key = ? ORDER BY item_index", (job_key,)
+                ).fetchall()
+            finally:
+                connection.close()
+        return [dict(row) for row in rows]
+
+
+
+class BulkTransferQueue:
+    # `submit(item, private_key)` returns (tx_hash, error, rejected), where
+    # `rejected` is True only when the send definitely did not go out.
+    def __init__(self, submit, store: IdempotencyStore, concurrency: int = 1):
+        self.submit = submit
+        self.store = store
+        self.concurrency = max(1, concurrency)
+
+    async def _process(self, job_key: str, index: int, item: dict, private_key: str) -> dict:
+        claim = await asyncio.to_thread(self.store.claim, job_key, index, item)
+        report = {"index": index, "to": item["to"], "token": item.get("token") or "native", "amount": str(item["amount"])}
+        if not claim["claimed"]:
+            # A row stuck in "submitting" or marked "unknown" may already have
+            # been broadcast, so it is reported rather than re-sent.
+            return {**report, "status": claim["status"], "tx_hash": claim.get("tx_hash"),
+                    "error": claim.get("error"), "deduplicated": True}
+        try:
+            tx_hash, error, rejected = await self.submit(item, private_key)
+        except Exception as e:
+            tx_hash, error, rejected = None, str(e), False
+        status = await asyncio.to_thread(self.store.finish, claim["item_key"], tx_hash, error, rejected)
+        return {**report, "status": status, "tx_hash": tx_hash, "error": error, "deduplicated": False}
+
+    async def run(self, job_key: str, items: list, private_key: str) -> list:
+        queue = asyncio.Queue()
+        for index, item in enumerate(items):
+            queue.put_nowait((index, item))
+        reports = [None] * len(items)
+
+        async def worker():
+            while not queue.empty():
+                index, item = queue.get_nowait()
+                reports[index] = await self._process(job_key, index, item, private_key)
+
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(items)))])
+        return reports
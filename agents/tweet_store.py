@@ -0,0 +1,228 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+
+
+
+logger = logging.getLogger(__name__)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    handle TEXT,
+    author TEXT,
+    text TEXT,
+    ts INTEGER,
+    likes INTEGER,
+    retweets INTEGER,
+    replies INTEGER,
+    PRIMARY KEY (id, symbol)
+);
+CREATE INDEX IF NOT EXISTS tweets_symbol_ts ON tweets (symbol, ts);
+CREATE INDEX IF NOT EXISTS tweets_ts ON tweets (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5 (text, content='tweets', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS tweets_fts_insert AFTER INSERT ON tweets BEGIN
+    INSERT INTO tweets_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+
+def parse_count(value) -> int:
+    text = str(value or "0").strip().upper().replace(",", "")
+    multiplier = 1
+    if text.endswith("K"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("M"):
+        multiplier, text = 1_000_000, text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return 0
+
+
+
+def parse_timestamp(value) -> int:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+
+def token_entries(data) -> list:
+    # tweets.json maps symbol -> scrape result; older scrapers wrote a plain list of results.
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = [(entry.get("symbol"), entry) for entry in data if isinstance(entry, dict)]
+    else:
+        items = []
+    return [(symbol, entry) for symbol, entry in items if isinstance(entry, dict) and (entry.get("symbol") or symbol)]
+
+
+
+def fts_query(text: str) -> str:
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{word}"' for word in words)
+
+
+
+class TweetStore:
+    def __init__(self, json_path: str, db_path: str):
+        self.json_path = json_path
+        self.db_path = db_path
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_sync = None
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def sync(self) -> int:
+        if not os.path.exists(self.json_path):
+            return 0
+        with self._sync_lock:
+            connection = self.connect()
+            try:
+                connection.executescript(SCHEMA)
+                mtime = str(os.path.getmtime(self.json_path))
+                row = connection.execute("SELECT value FROM meta WHERE key = 'source_mtime'").fetchone()
+                if row and row["value"] == mtime:
+                    return 0
+                with open(self.json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                changed = 0
+                with connection:
+                    before = connection.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+                    for symbol, entry in token_entries(data):
+                        symbol = (entry.get("symbol") or symbol).upper()
+                        for tweet in entry.get("tweets") or []:
+                            if not tweet.get("id"):
+                                continue
+                            engagement = tweet.get("engagement") or {}
+                            author = tweet.get("author") or {}
+                            # Re-scraped tweets keep their row (and search entry) but take the latest engagement.
+                            cursor = connection.execute(
+                                "INSERT INTO tweets (id, symbol, handle, author, text, ts, likes, retweets, replies) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                                "ON CONFLICT (id, symbol) DO UPDATE SET likes = excluded.likes, "
+                                "retweets = excluded.retweets, replies = excluded.replies "
+                                "WHERE likes IS NOT excluded.likes OR retweets IS NOT excluded.retweets "
+                                "OR replies IS NOT excluded.replies",
+                                (
+                                    str(tweet["id"]), symbol, author.get("handle"), author.get("name"),
+                                    tweet.get("text") or "", parse_timestamp(tweet.get("timestamp")),
+                                    parse_count(engagement.get("likes")), parse_count(engagement.get("retweets")),
+                                    parse_count(engagement.get("replies")),
+                                ),
+                            )
+                            changed += cursor.rowcount
+                    added = connection.execute("SELECT COUNT(*) FROM tweets").fetchone()[0] - before
+                    connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_mtime', ?)", (mtime,))
+                self.last_sync = time.time()
+                if changed:
+                    logger.info(f"Tweet store added {added} tweets, updated engagement on {changed - added}")
+                return added
+            finally:
+                connection.close()
+
+    def start_background_sync(self, interval: float = 60):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.warning(f"Tweet store sync failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="tweet-store-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def query(self, symbol: str = "", text: str = "", hours: float = 24, bucket_hours: float = 0,
+              limit: int = 5, now: float = None) -> dict:
+        if not os.path.exists(self.db_path):
+            return {"status": "warming_up", "mentions": 0, "top_tweets": []}
+        now = int(now or time.time())
+        since = now - int(hours * 3600)
+        clauses, params = ["t.ts >= ?"], [since]
+        source = "tweets t"
+        if symbol:
+            clauses.append("t.symbol = ?")
+            params.append(symbol.upper().lstrip("$"))
+        match = fts_query(text)
+        if match:
+            source = "tweets_fts f JOIN tweets t ON t.rowid = f.rowid"
+            clauses.append("tweets_fts MATCH ?")
+            params.append(match)
+        where = " AND ".join(clauses)
+        connection = self.connect()
+        try:
+            summary = connection.execute(
+                f"SELECT COUNT(*) AS mentions, COUNT(DISTINCT t.handle) AS authors, "
+                f"COALESCE(SUM(t.likes), 0) AS likes, COALESCE(SUM(t.retweets), 0) AS retweets, "
+                f"COALESCE(SUM(t.replies), 0) AS replies FROM {source} WHERE {where}",
+                params,
+            ).fetchone()
+            top = connection.execute(
+                f"SELECT t.symbol, t.handle, t.text, t.ts, t.likes, t.retweets FROM {source} WHERE {where} "
+                f"ORDER BY t.likes + t.retweets DESC, t.ts DESC LIMIT ?",
+                params + [max(0, min(int(limit), 20))],
+            ).fetchall()
+            result = {
+                "status": "success",
+                "symbol": symbol.upper().lstrip("$") or None,
+                "hours": hours,
+                "mentions": summary["mentions"],
+                "unique_authors": summary["authors"],
+                "engagement": {"likes": summary["likes"], "retweets": summary["retweets"], "replies": summary["replies"]},
+                "top_tweets": [
+                    {
+                        "symbol": row["symbol"],
+                        "handle": row["handle"],
+                        "text": row["text"][:280],
+                        "timestamp": datetime.fromtimestamp(row["ts"], timezone.utc).isoformat(),
+                        "likes": row["likes"],
+                        "retweets": row["retweets"],
+                    }
+                    for row in top
+                ],
+            }
+            if bucket_hours:
+                width = max(1, int(bucket_hours * 3600))
+                buckets = max(1, (now - since + width - 1) // width)
+                rows = connection.execute(
+                    f"SELECT MIN((t.ts - ?) / ?, ?) AS bucket, COUNT(*) AS mentions FROM {source} WHERE {where} "
+                    f"GROUP BY bucket ORDER BY bucket",
+                    [since, width, buckets - 1] + params,
+                ).fetchall()
+                counts = {row["bucket"]: row["mentions"] for row in rows}
+                result["trend"] = [
+                    {
+                        "start": datetime.fromtimestamp(since + bucket * width, timezone.utc).isoformat(),
+                        "mentions": counts.get(bucket, 0),
+                    }
+                    for bucket in range(buckets)
+                ]
+            return result
+        finally:
+            connection.close()
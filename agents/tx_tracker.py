@@ -0,0 +1,169 @@
+import time
+import asyncio
+import logging
+import threading
+
+
+
+logger = logging.getLogger(__name__)
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+DROPPED = "dropped"
+
+
+
+class ConfirmationTracker:
+    # One poller task serves every session: each round fetches receipts for all
+    # pending hashes in a single batch, then backs off until something changes
+    # or a new hash is submitted.
+    def __init__(self, fetch_receipts, min_interval: float = 1, max_interval: float = 15,
+                 backoff: float = 1.5, give_up_after: float = 600, keep: int = 1000):
+        self.fetch_receipts = fetch_receipts
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.give_up_after = give_up_after
+        self.keep = keep
+        self._entries = {}
+        self._waiters = {}
+        self._lock = threading.Lock()
+        self._task = None
+        self._wake = None
+        self.polls = 0
+
+    def _entry_view(self, tx_hash: str, entry: dict) -> dict:
+        view = {
+            "tx_hash": tx_hash,
+            "status": entry["status"],
+            "source": entry["source"],
+            "submitted_at": entry["submitted_at"],
+            "checks": entry["checks"],
+        }
+        if entry["settled_at"]:
+            view["confirmation_seconds"] = round(entry["settled_at"] - entry["submitted_at"], 2)
+        if entry["receipt"]:
+            view["receipt"] = entry["receipt"]
+        return view
+
+    def track(self, tx_hash: str, source: str = None) -> dict:
+        tx_hash = tx_hash.lower()
+        with self._lock:
+            entry = self._entries.get(tx_hash)
+            if entry is None:
+                entry = self._entries[tx_hash] = {
+                    "status": PENDING,
+                    "source": source,
+                    "submitted_at": time.time(),
+                    "settled_at": None,
+                    "checks": 0,
+                    "receipt": None,
+                }
+                self._prune()
+            view = self._entry_view(tx_hash, entry)
+        if entry["status"] == PENDING:
+            self._ensure_running()
+        return view
+
+    def status(self, tx_hash: str) -> dict:
+        with self._lock:
+            entry = self._entries.get(tx_hash.lower())
+            return self._entry_view(tx_hash.lower(), entry) if entry else None
+
+    def pending(self) -> list:
+        with self._lock:
+            return [tx_hash for tx_hash, entry in self._entries.items() if entry["status"] == PENDING]
+
+    async def wait(self, tx_hash: str, timeout: float) -> dict:
+        tx_hash = tx_hash.lower()
+        view = self.track(tx_hash)
+        if view["status"] != PENDING:
+            return view
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.setdefault(tx_hash, []).append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max(0, timeout))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(tx_hash, [])
+                if future in waiters:
+                    waiters.remove(future)
+        return self.status(tx_hash)
+
+    def _ensure_running(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        else:
+            self._wake.set()
+
+    def _settle(self, tx_hash: str, status: str, receipt: dict = None):
+        with self._lock:
+            entry = self._entries[tx_hash]
+            entry.update({"status": status, "settled_at": time.time(), "receipt": receipt})
+            waiters = self._waiters.pop(tx_hash, [])
+        for future in waiters:
+            future.get_loop().call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    def _prune(self):
+        if len(self._entries) <= self.keep:
+            return
+        settled = sorted(
+            (entry["settled_at"], tx_hash) for tx_hash, entry in self._entries.items() if entry["settled_at"]
+        )
+        for _, tx_hash in settled[:len(self._entries) - self.keep]:
+            del self._entries[tx_hash]
+
+    async def _run(self):
+        interval = self.min_interval
+        last_poll = time.monotonic()
+        while self.pending():
+            self._wake.clear()
+            delay = last_poll + interval - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    # A new submission restarts the schedule so fresh hashes are checked quickly.
+                    interval = self.min_interval
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            pending = self.pending()
+            try:
+                receipts = await self.fetch_receipts(pending)
+            except Exception as e:
+                logger.warning(f"Receipt poll for {len(pending)} transactions failed: {e}")
+                receipts = {}
+            last_poll = time.monotonic()
+            self.polls += 1
+            settled = 0
+            now = time.time()
+            for tx_hash in pending:
+                with self._lock:
+                    entry = self._entries.get(tx_hash)
+                    if entry is None:
+                        continue
+                    entry["checks"] += 1
+                    submitted_at = entry["submitted_at"]
+                receipt = receipts.get(tx_hash)
+                if receipt is not None:
+                    self._settle(tx_hash, CONFIRMED if receipt.get("status") in ("success", 1, "0x1") else FAILED, receipt)
+                    settled += 1
+                elif now - submitted_at > self.give_up_after:
+                    self._settle(tx_hash, DROPPED)
+                    settled += 1
+            interval = self.min_interval if settled else min(self.max_interval, interval * self.backoff)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for entry in self._entries.values():
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return {"tracked": counts, "polls": self.polls, "running": bool(self._task and not self._task.done())}
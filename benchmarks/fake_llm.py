@@ -0,0 +1,54 @@
+import asyncio
+import itertools
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+
+_ids = itertools.count(1)
+
+
+
+def _calls_since_user(contents: list) -> int:
+    # Number of tool rounds already answered in this invocation: the script
+    # is stateless, so the position comes from the conversation itself.
+    rounds = 0
+    for content in reversed(contents or []):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts) and not any(part.function_response for part in parts):
+            break
+        if any(part.function_response for part in parts):
+            rounds += 1
+    return rounds
+
+
+
+class ScriptedLlm(BaseLlm):
+    # script: one list of (tool_name, args) per model turn; args may be a
+    # callable returning the arguments so every run can use fresh inputs.
+    # Once the script is exhausted the model answers with `final_text`.
+    model: str = "scripted"
+    script: list = []
+    final_text: str = "Done."
+    latency_ms: float = 0
+    prompt_tokens: int = 800
+    completion_tokens: int = 60
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        step = _calls_since_user(llm_request.contents)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=self.prompt_tokens, candidates_token_count=self.completion_tokens,
+        )
+        if step < len(self.script):
+            parts = [
+                types.Part(function_call=types.FunctionCall(
+                    id=f"bench-{next(_ids)}", name=name, args=args() if callable(args) else args,
+                ))
+                for name, args in self.script[step]
+            ]
+        else:
+            parts = [types.Part(text=self.final_text)]
+        yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
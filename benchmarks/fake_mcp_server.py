@@ -0,0 +1,230 @@
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+
+# Arguments each tool's zod schema in mcp/src/core/tools.ts requires. The
+# HTTP server calls the tool callback without validating them, so a missing
+# one surfaces as the callback's isError result.
+REQUIRED_ARGUMENTS = {
+    "get_balance": ("address",),
+    "get_erc20_balance": ("tokenAddress", "holderAddress"),
+    "get_token_balance": ("tokenAddress", "ownerAddress"),
+    "get_token_info": ("tokenAddress",),
+    "is_contract": ("address",),
+    "get_block_by_number": ("blockNumber",),
+    "get_transaction": ("hash",),
+    "get_transaction_receipt": ("hash",),
+    "estimate_gas": ("to",),
+    "read_contract": ("contractAddress", "abi", "functionName"),
+    "transfer_native": ("to", "amount"),
+    "transfer_erc20": ("tokenAddress", "toAddress", "amount"),
+    "transfer_token": ("privateKey", "tokenAddress", "toAddress", "amount"),
+    "approve_token_spending": ("privateKey", "tokenAddress", "spenderAddress", "amount"),
+    "write_contract": ("contractAddress", "abi", "functionName", "args", "privateKey"),
+}
+
+
+
+# Stand-in for mcp/src/server/http-server.ts: POST /api takes JSON-RPC
+# tools/call requests and answers with the same content/isError envelope,
+# GET /health reports status. Latency and payload sizes are configurable.
+class FakeMCP:
+    def __init__(self, latency_ms: float = 5, jitter_ms: float = 0, block_txs: int = 200,
+                 receipt_logs: int = 20, batch: bool = False, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.block_txs = block_txs
+        self.receipt_logs = receipt_logs
+        self.batch = batch
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.latest = 5_000_000
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        delay = self.latency_ms + (self.random.random() * self.jitter_ms if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    @staticmethod
+    def _hash(*parts) -> str:
+        return "0x" + hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
+
+    @staticmethod
+    def _address(*parts) -> str:
+        return "0x" + hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()[:40]
+
+    def block(self, number: int, full: bool) -> dict:
+        transactions = [
+            {
+                "hash": self._hash("tx", number, index),
+                "from": self._address("from", index % 17),
+                "to": self._address("to", index % 23),
+                "value": str(index * 10 ** 15),
+                "input": "0xa9059cbb" + "0" * 24 + self._address("to", index)[2:] + "0" * 63 + "1",
+                "nonce": index,
+                "gas": "21000",
+                "gasPrice": "1000000000",
+                "blockNumber": str(number),
+            } if full else self._hash("tx", number, index)
+            for index in range(self.block_txs)
+        ]
+        return {
+            "number": str(number),
+            "hash": self._hash("block", number),
+            "parentHash": self._hash("block", number - 1),
+            "timestamp": str(1_700_000_000 + number),
+            "miner": self._address("miner"),
+            "gasUsed": str(21000 * self.block_txs),
+            "gasLimit": "30000000",
+            "baseFeePerGas": "1000000000",
+            "logsBloom": "0x" + "00" * 256,
+            "transactions": transactions,
+        }
+
+    def tool(self, name: str, args: dict):
+        if name == "get_balance":
+            return {"address": args.get("address"), "wei": "1500000000000000000", "sonic": "1.5", "network": "testnet"}
+        if name in ("get_token_info", "get_chain_info", "get_supported_networks", "is_contract"):
+            return {
+                "get_token_info": {"address": args.get("tokenAddress"), "name": "Bench Token", "symbol": "BENCH",
+                                   "decimals": 18, "totalSupply": "1000000000000000000000000",
+                                   "formattedTotalSupply": "1000000"},
+                "get_chain_info": {"network": "testnet", "chainId": 57054, "blockNumber": str(self.latest)},
+                "get_supported_networks": {"supportedNetworks": ["sonic", "testnet"]},
+                "is_contract": {"address": args.get("address"), "isContract": True},
+            }[name]
+        if name in ("get_erc20_balance", "get_token_balance"):
+            return {"tokenAddress": args.get("tokenAddress"), "owner": args.get("ownerAddress") or args.get("holderAddress"),
+                    "raw": "2500000000000000000000", "formatted": "2500", "symbol": "BENCH", "decimals": 18}
+        if name == "get_latest_block":
+            return self.block(self.latest, False)
+        if name == "get_block_by_number":
+            return self.block(int(args["blockNumber"]), bool(args.get("includeTransactions")))
+        if name == "get_transaction":
+            return {"hash": args.get("hash"), "from": self._address("from"), "to": self._address("to"), "value": "0",
+                    "blockNumber": str(self.latest - 1), "nonce": 1, "gas": "21000", "gasPrice": "1000000000",
+                    "input": "0x" + "ab" * 500}
+        if name == "get_transaction_receipt":
+            return {"status": "success", "transactionHash": args.get("hash"), "blockNumber": str(self.latest - 1),
+                    "from": self._address("from"), "to": self._address("to"), "gasUsed": "21000",
+                    "effectiveGasPrice": "1000000000", "contractAddress": None,
+                    "logs": [{"address": self._address("log", index), "topics": [self._hash("topic", index)] * 3,
+                              "data": "0x" + "00" * 64, "logIndex": index} for index in range(self.receipt_logs)]}
+        if name == "estimate_gas":
+            return {"estimatedGas": "21000"}
+        if name == "read_contract":
+            return "2500000000000000000000"
+        if name in ("transfer_native", "transfer_erc20", "transfer_token", "approve_token_spending", "write_contract"):
+            with self._lock:
+                self.requests += 1
+                counter = self.requests
+            tx_hash, network = self._hash("sent", counter), args.get("network") or "testnet"
+            # Same fields as the tools in mcp/src/core/tools.ts.
+            if name == "transfer_native":
+                return {"success": True, "txHash": tx_hash, "to": args.get("to"), "amount": args.get("amount"),
+                        "network": network}
+            if name == "transfer_erc20":
+                return {"success": True, "txHash": tx_hash, "network": network, "tokenAddress": args.get("tokenAddress"),
+                        "recipient": args.get("toAddress"), "amount": args.get("amount"), "symbol": "BENCH"}
+            if name == "approve_token_spending":
+                return {"success": True, "txHash": tx_hash, "network": network, "tokenAddress": args.get("tokenAddress"),
+                        "spender": args["spenderAddress"], "amount": args.get("amount"), "symbol": "BENCH"}
+            if name == "transfer_token":
+                return {"success": True, "txHash": tx_hash, "tokenAddress": args.get("tokenAddress"),
+                        "toAddress": args.get("toAddress"), "amount": args.get("amount"), "symbol": "BENCH",
+                        "network": network}
+            return {"network": network, "transactionHash": tx_hash, "message": "Contract write transaction sent successfully"}
+        if name == "get_address_from_private_key":
+            return {"address": self._address("key", args.get("privateKey"))}
+        return None
+
+    def handle(self, message: dict) -> dict:
+        params = message.get("params") or {}
+        name, arguments = params.get("name"), params.get("arguments") or {}
+        missing = [key for key in REQUIRED_ARGUMENTS.get(name, ()) if arguments.get(key) is None]
+        if missing:
+            text = f"Error executing {name}: missing required argument {', '.join(missing)}"
+            return {"jsonrpc": "2.0", "result": {"content": [{"type": "text", "text": text}], "isError": True},
+                    "id": message.get("id")}
+        data = self.tool(name, arguments)
+        if data is None:
+            result = {"content": [{"type": "text", "text": f"Unknown tool: {params.get('name')}"}], "isError": True}
+        else:
+            result = {"content": [{"type": "text", "text": json.dumps(data, indent=2)}]}
+        return {"jsonrpc": "2.0", "result": result, "id": message.get("id")}
+
+
+
+def make_handler(fake: FakeMCP):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; without this, delayed ACKs add ~40 ms per request.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "server": "Fake Sonic MCP Server"})
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            fake.sleep()
+            if isinstance(body, list):
+                if not fake.batch:
+                    self._send(400, {"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}, "id": None})
+                else:
+                    self._send(200, [fake.handle(message) for message in body])
+                return
+            self._send(200, fake.handle(body))
+
+    return Handler
+
+
+
+class FakeMCPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under fan-out and
+    # shows up as one-second SYN retransmits in the client percentiles.
+    request_queue_size = 256
+    daemon_threads = True
+
+
+
+def serve(port: int, **options) -> ThreadingHTTPServer:
+    return FakeMCPServer(("127.0.0.1", port), make_handler(FakeMCP(**options)))
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Sonic MCP HTTP server for benchmarks")
+    parser.add_argument("--port", type=int, default=3902)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--block-txs", type=int, default=200)
+    parser.add_argument("--receipt-logs", type=int, default=20)
+    parser.add_argument("--batch", action="store_true", help="Accept JSON-RPC batches (the real server rejects them)")
+    options = parser.parse_args()
+    server = serve(
+        options.port, latency_ms=options.latency_ms, jitter_ms=options.jitter_ms,
+        block_txs=options.block_txs, receipt_logs=options.receipt_logs, batch=options.batch,
+    )
+    print(f"Fake MCP server listening on http://127.0.0.1:{options.port}/api", flush=True)
+    server.serve_forever()
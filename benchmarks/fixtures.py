@@ -0,0 +1,105 @@
+import os
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+
+
+# tokens in ai_analyzer.json, README sections, tweets per symbol
+SIZES = {
+    "small": (50, 20, 5),
+    "medium": (1000, 150, 20),
+    "large": (10000, 800, 50),
+}
+WORDS = (
+    "sonic memecoin liquidity wallet agent trend analysis risk potential market volume holders contract "
+    "token blaze testnet transfer bridge swap dex pool whale community launch audit rug momentum"
+).split()
+
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+
+def token_rows(count: int, rng: random.Random) -> list:
+    return [
+        {
+            "id": index + 1,
+            "symbol": f"TK{index}",
+            "symbol1": "S",
+            "chain": "sonic",
+            "price": f"${rng.random() / 100:.6f}",
+            "volume": f"${rng.randint(1, 900)}K",
+            "marketCap": f"${rng.randint(1, 90)}M",
+            "change24h": round(rng.uniform(-90, 400), 2),
+            "age": f"{rng.randint(1, 72)}h",
+            "favorite": False,
+            "potential": rng.randint(1, 10),
+            "risk": round(rng.uniform(1, 10), 1),
+            "rationale": " ".join(_sentence(rng, 14) for _ in range(3)),
+            "href": f"https://dexscreener.com/sonic/0x{index:040x}",
+            "imageUrl": None,
+            "address": f"0x{index + 1:040x}",
+        }
+        for index in range(count)
+    ]
+
+
+
+def readme_text(sections: int, rng: random.Random) -> str:
+    parts = ["# TrendPup Benchmark README", "", _sentence(rng, 30), ""]
+    for index in range(sections):
+        parts += [f"{'##' if index % 4 == 0 else '###'} Section {index} {rng.choice(WORDS)}", ""]
+        parts += [_sentence(rng, rng.randint(20, 60)) for _ in range(rng.randint(2, 5))]
+        if index % 7 == 0:
+            parts += ["", "```bash", f"pnpm run step-{index}", "```"]
+        parts.append("")
+    return "\n".join(parts)
+
+
+
+def tweets(symbols: list, per_symbol: int, rng: random.Random) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        symbol: {
+            "symbol": symbol,
+            "tweets": [
+                {
+                    "id": f"{symbol}-{index}",
+                    "text": f"${symbol} " + _sentence(rng, 12),
+                    "author": {"name": f"user{index}", "handle": f"@user{index}"},
+                    "timestamp": (now - timedelta(minutes=rng.randint(1, 48 * 60))).isoformat().replace("+00:00", "Z"),
+                    "engagement": {"likes": str(rng.randint(0, 500)), "retweets": str(rng.randint(0, 90)),
+                                   "replies": str(rng.randint(0, 40))},
+                }
+                for index in range(per_symbol)
+            ],
+        }
+        for symbol in symbols
+    }
+
+
+
+def write_fixtures(directory: str, size: str, seed: int = 7) -> dict:
+    token_count, sections, tweets_per_symbol = SIZES[size]
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        "readme": os.path.join(directory, "README.md"),
+        "tokens": os.path.join(directory, "ai_analyzer.json"),
+        "tweets": os.path.join(directory, "tweets.json"),
+    }
+    rows = token_rows(token_count, rng)
+    with open(paths["tokens"], "w", encoding="utf-8") as f:
+        json.dump({"results": rows}, f, indent=2)
+    with open(paths["readme"], "w", encoding="utf-8") as f:
+        f.write(readme_text(sections, rng))
+    with open(paths["tweets"], "w", encoding="utf-8") as f:
+        json.dump(tweets([row["symbol"] for row in rows[:50]], tweets_per_symbol, rng), f)
+    # Indexes refresh on mtime; make sure a size switch within one second is still seen.
+    stamp = datetime.now().timestamp() + list(SIZES).index(size)
+    for path in paths.values():
+        os.utime(path, (stamp, stamp))
+    return {name: os.path.getsize(path) for name, path in paths.items()}
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# `adk api_server` has already imported these before it loads agents/app,
+# so "module" isolates what agents/agent.py itself adds to a restart.
+ADK_PRELOAD = (
+    "import google.adk.cli.fast_api\n"
+    "from google.adk.agents import Agent\n"
+    "from google.adk.tools import google_search, FunctionTool, AgentTool\n"
+)
+CHILD = """
+import sys, time, json, threading
+sys.path.insert(0, {agents!r})
+{preload}
+started = time.perf_counter()
+import agent
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "threads": threading.active_count() - 1}}))
+"""
+
+
+
+def sample(mode: str, env: dict) -> dict:
+    code = CHILD.format(agents=os.path.join(ROOT, "agents"), preload=ADK_PRELOAD if mode == "module" else "")
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard the cold-start import time of agents/agent.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-cold-ms", type=float, default=3000, help="Budget for a from-scratch import")
+    parser.add_argument("--max-module-ms", type=float, default=150, help="Budget for agent.py once ADK is loaded")
+    parser.add_argument("--output", default=None)
+    options = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="trendpup-import-")
+    env = {
+        **os.environ,
+        "TWEET_STORE_PATH": os.path.join(workdir, "tweets.sqlite"),
+        "BLOCK_CACHE_PATH": os.path.join(workdir, "blocks.sqlite"),
+        "BULK_TRANSFER_STORE_PATH": os.path.join(workdir, "transfers.sqlite"),
+        "METRICS_PORT": "",
+    }
+    results, failed = {}, False
+    for mode, budget in (("cold", options.max_cold_ms), ("module", options.max_module_ms)):
+        runs = [sample(mode, env) for _ in range(options.runs)]
+        median_ms = statistics.median(run["seconds"] for run in runs) * 1000
+        results[mode] = {
+            "median_ms": round(median_ms, 1),
+            "min_ms": round(min(run["seconds"] for run in runs) * 1000, 1),
+            "max_ms": round(max(run["seconds"] for run in runs) * 1000, 1),
+            "threads_started": max(run["threads"] for run in runs),
+            "budget_ms": budget,
+        }
+        threads = results[mode]["threads_started"]
+        # Importing the agent must not start background threads; they start with the first turn.
+        problems = [label for label, bad in (("OVER BUDGET", median_ms > budget), ("STARTED THREADS", threads)) if bad]
+        failed = failed or bool(problems)
+        status = " ".join(problems) or "ok"
+        print(f"{mode:<7} median {median_ms:8.1f} ms (budget {budget:.0f} ms), {threads} threads started {status}")
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+
+if __name__ == "__main__":
+    main()
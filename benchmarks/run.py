@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+import subprocess
+import statistics
+import urllib.request
+
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+_counter = itertools.count(1)
+TOTAL_SUPPLY_ABI = [{
+    "type": "function",
+    "name": "totalSupply",
+    "stateMutability": "view",
+    "inputs": [],
+    "outputs": [{"name": "", "type": "uint256"}],
+}]
+
+
+
+def percentile(samples: list, quantile: float) -> float:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+
+def summarize(suite: str, name: str, samples: list, errors: int, elapsed: float, **labels) -> dict:
+    return {
+        "suite": suite,
+        "name": name,
+        **labels,
+        "ops": len(samples),
+        "errors": errors,
+        "throughput_ops_s": round(len(samples) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else None,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3) if samples else None,
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3) if samples else None,
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3) if samples else None,
+    }
+
+
+
+async def measure(operation, iterations: int, concurrency: int) -> tuple:
+    samples, errors = [], 0
+    remaining = iter(range(iterations))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                result = await operation()
+                if isinstance(result, dict) and (result.get("success") is False or result.get("status") == "error"):
+                    errors += 1
+            except Exception:
+                errors += 1
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return samples, errors, time.perf_counter() - started
+
+
+
+def unique_address() -> str:
+    return f"0x{next(_counter):040x}"
+
+
+
+def unique_hash() -> str:
+    return f"0x{next(_counter):064x}"
+
+
+
+def mcp_operations(agent) -> dict:
+    return {
+        "get_sonic_balance": lambda: agent.get_sonic_balance(unique_address()),
+        "get_sonic_balance_cached": lambda: agent.get_sonic_balance("0x" + "ab" * 20),
+        "get_token_balance": lambda: agent.get_token_balance(unique_address(), "0x" + "cd" * 20),
+        "get_latest_block": lambda: agent.get_latest_block(),
+        "get_block_by_number": lambda: agent.get_block_by_number(next(_counter)),
+        "get_transaction_receipt": lambda: agent.get_transaction_receipt(unique_hash()),
+        "read_contract": lambda: agent.read_contract(unique_address(), TOTAL_SUPPLY_ABI, "totalSupply", []),
+        "get_balances_x10": lambda: agent.get_balances([unique_address() for _ in range(10)]),
+        "get_portfolio_x5": lambda: agent.get_portfolio(unique_address(), [unique_address() for _ in range(5)]),
+        "scan_blocks_x50": lambda: agent.scan_blocks(block_count=50, end_block=1_000_000 + next(_counter) * 100),
+    }
+
+
+
+def file_operations(agent) -> dict:
+    async def threaded(function, *args, **kwargs):
+        return await asyncio.to_thread(function, *args, **kwargs)
+    return {
+        "token_data": lambda: threaded(agent.token_data),
+        "readme_data": lambda: threaded(agent.readme_data),
+        "query_token_data": lambda: threaded(agent.query_token_data, max_risk=5, sort_by="change24h", limit=10),
+        "search_readme": lambda: threaded(agent.search_readme, "liquidity risk wallet"),
+        "query_tweets": lambda: threaded(agent.query_tweets, symbol="TK1", hours=48, bucket_hours=6),
+    }
+
+
+
+def use_model(llm_agent, scripted):
+    # Keep model tiering in the measured path: both tiers answer from the script.
+    if hasattr(llm_agent.model, "fast") and hasattr(llm_agent.model, "strong"):
+        llm_agent.model.fast = llm_agent.model.strong = scripted
+    else:
+        llm_agent.model = scripted
+
+
+
+def install_scripted_models(agent, llm_latency_ms: float):
+    from fake_llm import ScriptedLlm
+    use_model(agent.root_agent, ScriptedLlm(
+        script=[[("Sonic_MCP", lambda: {"request": f"Portfolio and latest block for {unique_address()}"})]],
+        final_text="Here is the wallet summary.", latency_ms=llm_latency_ms,
+    ))
+    use_model(agent.mcp_agent, ScriptedLlm(
+        script=[
+            [("get_sonic_balance", lambda: {"address": unique_address()}), ("get_latest_block", {})],
+            [("get_transaction_receipt", lambda: {"tx_hash": unique_hash()})],
+        ],
+        final_text="Balance is 1.5 S and the receipt succeeded.", latency_ms=llm_latency_ms,
+    ))
+    use_model(agent.rag_agent, ScriptedLlm(
+        script=[[("query_token_data", {"max_risk": 5, "limit": 5})]],
+        final_text="Top low-risk tokens listed.", latency_ms=llm_latency_ms,
+    ))
+
+
+
+def agent_turn(agent, runner, text: str):
+    from google.genai import types
+
+    async def turn():
+        session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+        answered = False
+        async for event in runner.run_async(
+            user_id="bench", session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+        ):
+            if event.is_final_response() and event.content and event.content.parts:
+                answered = True
+        return {"success": answered}
+    return turn
+
+
+
+def start_fake_server(port: int, latency_ms: float, jitter_ms: float, block_txs: int, batch: bool) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(BENCH_DIR, "fake_mcp_server.py"), "--port", str(port),
+               "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms), "--block-txs", str(block_txs)]
+    if batch:
+        command.append("--batch")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Fake MCP server did not start")
+
+
+
+def bench_env(workdir: str, fixture_dir: str, port: int) -> dict:
+    return {
+        "SONIC_MCP_URL": f"http://127.0.0.1:{port}/api",
+        "README_PATH": os.path.join(fixture_dir, "README.md"),
+        "TOKEN_DATA_PATH": os.path.join(fixture_dir, "ai_analyzer.json"),
+        "TWEETS_PATH": os.path.join(fixture_dir, "tweets.json"),
+        "TWEET_STORE_PATH": os.path.join(workdir, "tweets.sqlite"),
+        "TWEET_STORE_SYNC_INTERVAL": "5",
+        "BLOCK_CACHE_PATH": os.path.join(workdir, "blocks.sqlite"),
+        "BULK_TRANSFER_STORE_PATH": os.path.join(workdir, "transfers.sqlite"),
+        "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY", "offline-benchmark"),
+        # Every benchmark turn comes from one user; measure the pipeline, not the per-user rate limit.
+        "AGENT_USER_RATE": os.getenv("AGENT_USER_RATE", "0"),
+        "AGENT_MAX_CONCURRENT": os.getenv("AGENT_MAX_CONCURRENT", "64"),
+    }
+
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+
+def compare(previous_path: str, results: list):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    keyed = {
+        (row["suite"], row["name"], row.get("concurrency"), row.get("size")): row for row in previous["results"]
+    }
+    print(f"\nCompared with {previous['meta'].get('revision')} ({previous_path}):")
+    for row in results:
+        old = keyed.get((row["suite"], row["name"], row.get("concurrency"), row.get("size")))
+        if not old or not old.get("p50_ms") or not row.get("p50_ms"):
+            continue
+        deltas = [
+            f"{metric} {(row[metric] - old[metric]) / old[metric] * 100:+.1f}%"
+            for metric in ("p50_ms", "p99_ms", "throughput_ops_s") if old.get(metric)
+        ]
+        label = f"{row['suite']}/{row['name']} c={row.get('concurrency')}" + (f" {row['size']}" if row.get("size") else "")
+        print(f"  {label:<52} " + "  ".join(deltas))
+
+
+
+def print_table(results: list):
+    print(f"\n{'suite/name':<44}{'size':>8}{'conc':>6}{'ops':>7}{'err':>5}{'ops/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for row in results:
+        print(
+            f"{row['suite'] + '/' + row['name']:<44}{row.get('size') or '':>8}{row.get('concurrency') or '':>6}"
+            f"{row['ops']:>7}{row['errors']:>5}{row['throughput_ops_s'] or 0:>10.1f}"
+            f"{row['p50_ms'] or 0:>9.2f}{row['p95_ms'] or 0:>9.2f}{row['p99_ms'] or 0:>9.2f}"
+        )
+
+
+
+async def run(options) -> list:
+    import agent
+    results = []
+    concurrency_levels = [int(level) for level in options.concurrency.split(",")]
+    suites = options.suites.split(",")
+    if "mcp" in suites:
+        operations = mcp_operations(agent)
+        for name, operation in operations.items():
+            if options.only and name not in options.only.split(","):
+                continue
+            for concurrency in concurrency_levels:
+                iterations = max(options.iterations // 10, concurrency) if name.startswith("scan_blocks") else options.iterations
+                samples, errors, elapsed = await measure(operation, iterations, concurrency)
+                results.append(summarize("mcp", name, samples, errors, elapsed, concurrency=concurrency))
+    if "files" in suites:
+        from fixtures import write_fixtures
+        for size in options.sizes.split(","):
+            fixture_bytes = write_fixtures(options.fixture_dir, size)
+            for name, operation in file_operations(agent).items():
+                await operation()
+                samples, errors, elapsed = await measure(operation, options.iterations, 1)
+                results.append(summarize("files", name, samples, errors, elapsed, concurrency=1, size=size,
+                                         fixture_bytes=fixture_bytes))
+    if "agent" in suites:
+        from google.adk.runners import InMemoryRunner
+        install_scripted_models(agent, options.llm_latency_ms)
+        scenarios = {
+            "root_to_mcp_turn": (agent.root_agent, "Summarise this wallet"),
+            "mcp_agent_turn": (agent.mcp_agent, "Check the balance and the receipt"),
+            "rag_agent_turn": (agent.rag_agent, "Which tokens look safest?"),
+        }
+        for name, (root, text) in scenarios.items():
+            runner = InMemoryRunner(agent=root, app_name="bench")
+            for concurrency in concurrency_levels:
+                iterations = max(options.iterations // 5, concurrency)
+                samples, errors, elapsed = await measure(agent_turn(agent, runner, text), iterations, concurrency)
+                results.append(summarize("agent", name, samples, errors, elapsed, concurrency=concurrency))
+    return results
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the TrendPup agent layer")
+    parser.add_argument("--suites", default="mcp,files,agent")
+    parser.add_argument("--only", default="", help="Comma-separated MCP operation names to run")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sizes", default="small,medium,large")
+    parser.add_argument("--latency-ms", type=float, default=5, help="Fake MCP server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=2)
+    parser.add_argument("--block-txs", type=int, default=200)
+    parser.add_argument("--batch", action="store_true", help="Let the fake server accept JSON-RPC batches")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated model latency per turn")
+    parser.add_argument("--port", type=int, default=3912)
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to diff against")
+    options = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="trendpup-bench-")
+    options.fixture_dir = os.path.join(workdir, "data")
+    from fixtures import write_fixtures
+    write_fixtures(options.fixture_dir, options.sizes.split(",")[0])
+    # Everything the agent module reads or writes is pointed at the fixtures
+    # and the stand-in server before it is imported.
+    os.environ.update(bench_env(workdir, options.fixture_dir, options.port))
+    os.environ.pop("METRICS_PORT", None)
+    sys.path.insert(0, os.path.join(ROOT, "agents"))
+    import logging
+    logging.disable(logging.WARNING)
+
+    server = start_fake_server(options.port, options.latency_ms, options.jitter_ms, options.block_txs, options.batch)
+    try:
+        results = asyncio.run(run(options))
+    finally:
+        server.terminate()
+        server.wait()
+
+    revision = git_revision()
+    output = options.output or os.path.join(BENCH_DIR, "results", f"{revision}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "revision": revision,
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "options": {key: value for key, value in vars(options).items() if key != "fixture_dir"},
+            },
+            "results": results,
+        }, f, indent=2)
+    print_table(results)
+    print(f"\nResults written to {output}")
+    if options.compare:
+        compare(options.compare, results)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import httpx
+
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from run import ROOT, bench_env, git_revision, measure, print_table, start_fake_server, summarize
+from fixtures import write_fixtures
+
+
+
+# The agents dir the workers load: the real agent tree with the scripted models installed.
+BENCH_AGENT = """
+import sys
+sys.path.insert(0, {agents!r})
+sys.path.insert(0, {bench!r})
+import agent as trendpup
+from google.adk.apps import App
+from run import install_scripted_models
+install_scripted_models(trendpup, {llm_latency_ms!r})
+root_agent = trendpup.root_agent
+app = App(name="bench", root_agent=root_agent, plugins=[trendpup.admission])
+"""
+
+
+
+def write_bench_agent(workdir: str, llm_latency_ms: float) -> str:
+    agents_dir = os.path.join(workdir, "agents")
+    os.makedirs(os.path.join(agents_dir, "bench"), exist_ok=True)
+    with open(os.path.join(agents_dir, "bench", "agent.py"), "w", encoding="utf-8") as f:
+        f.write(BENCH_AGENT.format(agents=os.path.join(ROOT, "agents"), bench=BENCH_DIR, llm_latency_ms=llm_latency_ms))
+    return agents_dir
+
+
+
+def start_serve(workers: int, port: int, agents_dir: str, env: dict, timeout: float) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(ROOT, "agents", "serve.py"), "--workers", str(workers),
+               "--port", str(port), "--worker_base_port", str(port + 1), "--agents_dir", agents_dir]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = httpx.get(f"http://127.0.0.1:{port}/serve/workers", timeout=1).json()
+            if all(worker["healthy"] for worker in status["workers"]):
+                return process
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    stop_serve(process)
+    raise RuntimeError(f"{workers} workers did not become ready within {timeout}s")
+
+
+
+def stop_serve(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+
+def http_turn(client: httpx.AsyncClient, base: str, text: str):
+    # One chat turn the way the frontend sends it: create a session, then /run.
+    async def turn():
+        session_id = str(uuid.uuid4())
+        created = await client.post(f"{base}/apps/bench/users/bench/sessions/{session_id}")
+        if created.status_code != 200:
+            return {"success": False}
+        response = await client.post(f"{base}/run", json={
+            "appName": "bench",
+            "userId": "bench",
+            "sessionId": session_id,
+            "newMessage": {"role": "user", "parts": [{"text": text}]},
+        })
+        events = response.json() if response.status_code == 200 else []
+        answered = any(part.get("text") for event in events for part in (event.get("content") or {}).get("parts") or [])
+        return {"success": answered}
+    return turn
+
+
+
+async def load(port: int, iterations: int, concurrency: int) -> tuple:
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        operation = http_turn(client, f"http://127.0.0.1:{port}", "Summarise this wallet")
+        await measure(operation, concurrency, concurrency)
+        return await measure(operation, iterations, concurrency)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of agents/serve.py at each worker count")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5, help="Fake MCP server latency per request")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated model latency per model call")
+    parser.add_argument("--port", type=int, default=3920, help="Proxy port; workers use the ports after it")
+    parser.add_argument("--mcp-port", type=int, default=3912)
+    parser.add_argument("--ready-timeout", type=float, default=180)
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/serve-<revision>.json)")
+    options = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="trendpup-serve-")
+    fixture_dir = os.path.join(workdir, "data")
+    write_fixtures(fixture_dir, "small")
+    agents_dir = write_bench_agent(workdir, options.llm_latency_ms)
+    env = {
+        **os.environ,
+        **bench_env(workdir, fixture_dir, options.mcp_port),
+        "SHARED_CACHE_PATH": os.path.join(workdir, "shared_cache.sqlite"),
+        # Distinct sessions ask the same question; every turn should run the agents.
+        "ANSWER_CACHE": "0",
+    }
+    env.pop("METRICS_PORT", None)
+
+    server = start_fake_server(options.mcp_port, options.latency_ms, 2, 200, False)
+    results = []
+    try:
+        for workers in [int(count) for count in options.workers.split(",")]:
+            serve = start_serve(workers, options.port, agents_dir, env, options.ready_timeout)
+            try:
+                samples, errors, elapsed = asyncio.run(load(options.port, options.iterations, options.concurrency))
+            finally:
+                stop_serve(serve)
+            results.append(summarize("serve", f"http_turn_w{workers}", samples, errors, elapsed,
+                                     concurrency=options.concurrency, workers=workers))
+    finally:
+        server.terminate()
+        server.wait()
+
+    revision = git_revision()
+    output = options.output or os.path.join(BENCH_DIR, "results", f"serve-{revision}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "revision": revision,
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "options": vars(options),
+            },
+            "results": results,
+        }, f, indent=2)
+    print_table(results)
+    baseline = results[0]["throughput_ops_s"] if results else None
+    for row in results:
+        if baseline:
+            print(f"  {row['workers']} worker(s): {row['throughput_ops_s'] / baseline:.2f}x the {results[0]['workers']}-worker throughput")
+    print(f"\nResults written to {output} ({os.cpu_count()} CPUs)")
+
+
+
+if __name__ == "__main__":
+    main()
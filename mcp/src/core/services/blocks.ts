@@ -12,10 +12,11 @@ export async function getBlockNumber(network = "testnet"): Promise<bigint> {
 
 export async function getBlockByNumber(
   blockNumber: number, 
-  network = "testnet"
+  network = "testnet",
+  includeTransactions = false
 ): Promise<Block> {
   const client = getPublicClient(network);
-  return await client.getBlock({ blockNumber: BigInt(blockNumber) });
+  return await client.getBlock({ blockNumber: BigInt(blockNumber), includeTransactions });
 }
 
 
@@ -85,11 +85,12 @@ export function registerSonicTools(server: McpServer) {
     "Get a block by its block number",
     {
       blockNumber: z.number().describe("The block number to fetch"),
-      network: z.string().optional().describe("Network name or chain ID. Defaults to Sonic Blaze Testnet.")
+      network: z.string().optional().describe("Network name or chain ID. Defaults to Sonic Blaze Testnet."),
+      includeTransactions: z.boolean().optional().describe("Return full transaction objects instead of hashes. Defaults to false.")
     },
-    async ({ blockNumber, network = "testnet" }) => {
+    async ({ blockNumber, network = "testnet", includeTransactions = false }) => {
       try {
-        const block = await services.getBlockByNumber(blockNumber, network);
+        const block = await services.getBlockByNumber(blockNumber, network, includeTransactions);
         return {
           content: [{
             type: "text",
@@ -23,7 +23,7 @@ fi
 
 
 if ! tmux has-session -t agents 2>/dev/null; then
-  tmux new-session -d -s agents "bash -c 'while true; do cd $HOME/trendpup && source venv/bin/activate && adk api_server agents --allow_origins=\"*\"; echo \"agents crashed. Restarting in 3s...\"; sleep 3; done'"
+  tmux new-session -d -s agents "bash -c 'while true; do cd $HOME/trendpup && source venv/bin/activate && python agents/serve.py --allow_origins=\"*\"; echo \"agents crashed. Restarting in 3s...\"; sleep 3; done'"
   echo "Started tmux session: agents"
 else
   echo "tmux session 'agents' already exists."
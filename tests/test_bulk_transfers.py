@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dependencies: requirements-dev.txt (the runtime requirements plus pytest).
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from fake_mcp_server import FakeMCP, FakeMCPServer, make_handler
+from mcp_client import SonicMCPClient
+from resilience import CircuitBreaker
+from admission import FairLimiter
+from transfer_queue import BulkTransferQueue, IdempotencyStore, SUBMITTED, FAILED, UNKNOWN
+
+WRITE_TOOLS = ("transfer_native", "transfer_erc20")
+RECIPIENTS = ["0x" + digit * 40 for digit in "123456"]
+TOKEN = "0x" + "ab" * 20
+
+
+
+class FaultyMCP(FakeMCP):
+    # The benchmark stand-in, plus per-recipient faults: "timeout" answers
+    # after the client gave up, "drop" closes the connection without an
+    # answer (both after the send went out), "reject" is an isError result.
+    def __init__(self):
+        super().__init__(latency_ms=0)
+        self.faults = {}
+        self.sends = []
+
+    def handle(self, message: dict) -> dict:
+        params = message.get("params") or {}
+        arguments = params.get("arguments") or {}
+        recipient = arguments.get("to") or arguments.get("toAddress")
+        fault = self.faults.get(recipient)
+        if fault == "reject":
+            return {"jsonrpc": "2.0", "id": message.get("id"), "result": {
+                "content": [{"type": "text", "text": "Error transferring Sonic: insufficient funds"}], "isError": True,
+            }}
+        if params.get("name") in WRITE_TOOLS:
+            self.sends.append(recipient)
+        if fault == "timeout":
+            time.sleep(0.5)
+        elif fault == "drop":
+            raise ConnectionResetError("dropped by test")
+        return super().handle(message)
+
+
+
+class QuietServer(FakeMCPServer):
+    def handle_error(self, request, client_address):
+        pass
+
+
+
+@pytest.fixture(scope="module")
+def agent(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("agent")
+    with pytest.MonkeyPatch.context() as patch:
+        for name, filename in (("TWEET_STORE_PATH", "tweets.sqlite"), ("BLOCK_CACHE_PATH", "blocks.sqlite"),
+                               ("BULK_TRANSFER_STORE_PATH", "transfers.sqlite")):
+            patch.setenv(name, str(directory / filename))
+        patch.delenv("SHARED_CACHE_PATH", raising=False)
+        patch.delenv("METRICS_PORT", raising=False)
+        import agent
+    return agent
+
+
+
+@pytest.fixture
+def fake():
+    faulty = FaultyMCP()
+    httpd = QuietServer(("127.0.0.1", 0), make_handler(faulty))
+    faulty.url = f"http://127.0.0.1:{httpd.server_address[1]}/api"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield faulty
+    httpd.shutdown()
+
+
+
+@pytest.fixture
+def bulk(agent, fake, tmp_path, monkeypatch):
+    # A queue wired like agent.bulk_transfers, sending through agent.submit_bulk_item
+    # to the stand-in server with a short write timeout.
+    client = SonicMCPClient(endpoint=fake.url, timeout=0.2)
+    monkeypatch.setattr(agent, "mcp_client", client)
+    queue = BulkTransferQueue(agent.submit_bulk_item, IdempotencyStore(str(tmp_path / "transfers.sqlite")))
+    queue.client = client
+    return queue
+
+
+
+def items(*recipients, amount: str = "1") -> list:
+    return [{"to": recipient, "amount": amount} for recipient in recipients]
+
+
+
+def run(queue: BulkTransferQueue, job_key: str, transfers: list) -> list:
+    return asyncio.run(queue.run(job_key, transfers, "0x" + "11" * 32))
+
+
+
+def statuses(reports: list) -> list:
+    return [report["status"] for report in reports]
+
+
+
+def test_retry_with_the_same_key_does_not_resend(bulk, fake):
+    transfers = items(RECIPIENTS[0]) + [{"to": RECIPIENTS[1], "token": TOKEN, "amount": "5"}]
+    first = run(bulk, "job-1", transfers)
+    assert statuses(first) == [SUBMITTED, SUBMITTED]
+    assert all(report["tx_hash"] for report in first)
+    second = run(bulk, "job-1", transfers)
+    assert statuses(second) == [SUBMITTED, SUBMITTED]
+    assert all(report["deduplicated"] for report in second)
+    assert [report["tx_hash"] for report in second] == [report["tx_hash"] for report in first]
+    assert fake.sends == RECIPIENTS[:2]
+
+
+
+def test_reused_key_for_a_different_transfer_is_refused(bulk, fake):
+    run(bulk, "job-1", items(RECIPIENTS[0]))
+    reports = run(bulk, "job-1", items(RECIPIENTS[0], amount="2"))
+    assert statuses(reports) == [FAILED]
+    assert "different transfer" in reports[0]["error"]
+    assert fake.sends == RECIPIENTS[:1]
+    # The original transfer keeps its record.
+    assert [row["status"] for row in bulk.store.job("job-1")] == [SUBMITTED]
+
+
+
+def test_timeouts_and_transport_errors_are_unknown_and_never_resent(bulk, fake):
+    fake.faults = {RECIPIENTS[0]: "timeout", RECIPIENTS[1]: "drop"}
+    transfers = items(*RECIPIENTS[:3])
+    assert statuses(run(bulk, "job-1", transfers)) == [UNKNOWN, UNKNOWN, SUBMITTED]
+    fake.faults = {}
+    retry = run(bulk, "job-1", transfers)
+    assert statuses(retry) == [UNKNOWN, UNKNOWN, SUBMITTED]
+    assert all(report["deduplicated"] for report in retry)
+    assert fake.sends == RECIPIENTS[:3]
+
+
+
+@pytest.mark.parametrize("rejection", ["is_error", "unavailable", "busy"])
+def test_definite_rejections_can_be_claimed_again(bulk, fake, rejection):
+    if rejection == "is_error":
+        fake.faults = {RECIPIENTS[0]: "reject"}
+    elif rejection == "unavailable":
+        bulk.client.breaker = CircuitBreaker(failure_threshold=1, probe_interval=3600)
+        bulk.client.breaker.record_failure("ConnectError")
+    else:
+        bulk.client.admission = FairLimiter("Sonic MCP", max_concurrent=1, max_queue=0, max_wait=1)
+        bulk.client.admission.acquire()
+    first = run(bulk, "job-1", items(RECIPIENTS[0]))
+    assert statuses(first) == [FAILED]
+    assert fake.sends == []
+
+    fake.faults = {}
+    bulk.client.breaker = CircuitBreaker()
+    if rejection == "busy":
+        bulk.client.admission.release()
+    retry = run(bulk, "job-1", items(RECIPIENTS[0]))
+    assert statuses(retry) == [SUBMITTED]
+    assert not retry[0]["deduplicated"]
+    assert fake.sends == RECIPIENTS[:1]
+    assert [row["attempts"] for row in bulk.store.job("job-1")] == [2]
+
+
+
+def test_concurrent_runs_of_one_job_send_each_item_once(bulk, fake):
+    # Two workers behind serve.py share the store file but not the queue.
+    fake.latency_ms = 20
+    other = BulkTransferQueue(bulk.submit, IdempotencyStore(bulk.store.path))
+    transfers = items(*RECIPIENTS)
+
+    async def both():
+        return await asyncio.gather(*[
+            queue.run("job-1", transfers, "0x" + "11" * 32) for queue in (bulk, other, bulk, other)
+        ])
+
+    runs = asyncio.run(both())
+    assert sorted(fake.sends) == sorted(RECIPIENTS)
+    for index in range(len(transfers)):
+        sent = [reports[index] for reports in runs if not reports[index]["deduplicated"]]
+        assert len(sent) == 1 and sent[0]["status"] == SUBMITTED
+    assert [row["status"] for row in bulk.store.job("job-1")] == [SUBMITTED] * len(RECIPIENTS)
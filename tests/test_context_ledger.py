@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import asyncio
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import AgentTool, FunctionTool, ToolContext
+from google.genai import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dependencies: requirements-dev.txt (the runtime requirements plus pytest).
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from fake_llm import ScriptedLlm
+from context_ledger import ContextLedger, LEDGER_KEY, TURN_KEY
+
+
+
+def tokens(count: int, risk: int = 3) -> str:
+    return json.dumps({"results": [
+        {"id": index, "symbol": f"TKN{index}", "chain": "sonic", "risk": risk, "rationale": "x" * 200}
+        for index in range(count)
+    ]})
+
+
+
+def conversation(documents: list) -> tuple:
+    # Root -> AgentTool(RAG) -> token_data, one root turn per document, all in
+    # one session. Returns what token_data answered each turn and the session.
+    ledger, delivered = ContextLedger(), []
+
+    def token_data(tool_context: ToolContext) -> dict:
+        content = documents[len(delivered)]
+        result = ledger.deliver(tool_context, "token_data", content, {"content": content, "status": "success"},
+                                records=True)
+        delivered.append(result)
+        return result
+
+    rag = Agent(name="RAG_Context", model=ScriptedLlm(script=[[("token_data", {})]], final_text="rag"),
+                tools=[FunctionTool(token_data)])
+    root = Agent(name="TrendPup", model=ScriptedLlm(script=[[("RAG_Context", {"request": "Top Sonic tokens"})]]),
+                 tools=[AgentTool(agent=rag)], before_agent_callback=ledger.count_turn)
+
+    async def turns():
+        runner = InMemoryRunner(agent=root, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="user")
+        for index in range(len(documents)):
+            message = types.Content(role="user", parts=[types.Part(text=f"question {index}")])
+            async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+                pass
+        return await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+
+    return delivered, asyncio.run(turns()), ledger
+
+
+
+def test_repeat_turns_get_a_reference_through_the_child_session():
+    delivered, session, ledger = conversation([tokens(20)] * 3)
+    assert [result["status"] for result in delivered] == ["success", "unchanged", "unchanged"]
+    assert delivered[2]["unchanged_since_turn"] == 1
+    assert "Top Sonic tokens" in delivered[2]["message"]
+    # The ledger lives in the root session, not in the sub-agent's throwaway one.
+    assert session.state[TURN_KEY] == 3
+    assert session.state[LEDGER_KEY]["token_data"]["turn"] == 1
+    assert ledger.stats()["unchanged"] == 2
+
+
+
+def test_changed_token_data_is_sent_as_record_changes():
+    old = tokens(20)
+    data = json.loads(old)
+    data["results"][0]["risk"] = 9
+    del data["results"][5]
+    data["results"].append({"id": 99, "symbol": "NEW", "chain": "sonic", "risk": 1})
+    delivered, session, ledger = conversation([old, json.dumps(data), json.dumps(data)])
+    assert [result["status"] for result in delivered] == ["success", "changed", "unchanged"]
+    changes = delivered[1]["changes"]
+    assert delivered[1]["changes_since_turn"] == 1
+    assert [record["id"] for record in changes["changed"]] == [0] and changes["changed"][0]["risk"] == 9
+    assert [record["id"] for record in changes["added"]] == [99]
+    assert changes["removed"] == ["5"]
+    assert delivered[2]["unchanged_since_turn"] == 2
+
+
+
+def test_large_changes_fall_back_to_the_full_document():
+    delivered, session, ledger = conversation([tokens(20), tokens(20, risk=7)])
+    assert [result["status"] for result in delivered] == ["success", "success"]
+    assert session.state[LEDGER_KEY]["token_data"]["turn"] == 2
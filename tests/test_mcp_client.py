@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+# Dependencies: requirements-dev.txt (the runtime requirements plus pytest).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents"))
+from mcp_client import SonicMCPClient
+
+
+
+class StandInServer:
+    # JSON-RPC endpoint on /api: single calls echo their params; `batch_mode`
+    # decides how array requests are answered.
+    def __init__(self):
+        self.batch_mode = "reversed"
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._send(200, {"status": "ok"})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append(body)
+                if not isinstance(body, list):
+                    self._send(200, server.answer(body))
+                elif server.batch_mode == "reversed":
+                    self._send(200, [server.answer(message) for message in reversed(body)])
+                elif server.batch_mode == "not_a_list":
+                    self._send(200, {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}})
+                elif server.batch_mode == "http_400":
+                    self._send(400, {"error": "batch requests are not supported"})
+                elif server.batch_mode == "http_503":
+                    self._send(503, {"error": "overloaded"})
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def answer(message: dict) -> dict:
+        params = message.get("params") or {}
+        if params.get("name") == "fail":
+            return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32000, "message": "tool failed"}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": {"echo": params.get("arguments")}}
+
+    def batches(self) -> list:
+        return [request for request in self.requests if isinstance(request, list)]
+
+    def singles(self) -> list:
+        return [request for request in self.requests if isinstance(request, dict)]
+
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.httpd.shutdown()
+
+
+
+def calls(*names) -> list:
+    return [("tools/call", {"name": name, "arguments": {"index": index}}) for index, name in enumerate(names)]
+
+
+
+def run_batch(client: SonicMCPClient, batch: list) -> list:
+    async def run():
+        try:
+            return await client.call_batch(batch)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+
+def test_batch_responses_are_matched_by_id_when_out_of_order(server):
+    client = SonicMCPClient(endpoint=server.url)
+    results = run_batch(client, calls("a", "b", "c"))
+    assert [result["data"]["echo"]["index"] for result in results] == [0, 1, 2]
+    assert len(server.batches()) == 1 and not server.singles()
+    assert client.batch_supported is True
+
+
+
+def test_batch_item_error_only_fails_that_item(server):
+    client = SonicMCPClient(endpoint=server.url)
+    results = run_batch(client, calls("a", "fail", "c"))
+    assert [result["success"] for result in results] == [True, False, True]
+    assert results[1]["error"]["message"] == "tool failed"
+    assert results[2]["data"]["echo"]["index"] == 2
+
+
+
+@pytest.mark.parametrize("mode", ["not_a_list", "http_400"])
+def test_rejected_batch_falls_back_to_single_calls(server, mode):
+    server.batch_mode = mode
+    client = SonicMCPClient(endpoint=server.url)
+    results = run_batch(client, calls("a", "b"))
+    assert [result["data"]["echo"]["index"] for result in results] == [0, 1]
+    assert len(server.singles()) == 2
+    assert client.batch_supported is False
+    # Later batches go straight to single calls.
+    run_batch(client, calls("c", "d"))
+    assert len(server.batches()) == 1 and len(server.singles()) == 4
+
+
+
+def test_server_error_on_batch_does_not_disable_batching(server):
+    server.batch_mode = "http_503"
+    client = SonicMCPClient(endpoint=server.url)
+    results = run_batch(client, calls("a", "b"))
+    assert [result["data"]["echo"]["index"] for result in results] == [0, 1]
+    assert client.batch_supported is None
+    server.batch_mode = "reversed"
+    run_batch(client, calls("c", "d"))
+    assert len(server.batches()) == 2
@@ -0,0 +1,190 @@
+import os
+import sys
+import asyncio
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+
+# Dependencies: requirements-dev.txt (the runtime requirements plus pytest).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents"))
+from model_tiers import TieredLlm
+
+ADDRESS = "0x" + "12" * 20
+OTHER = "0x" + "34" * 20
+
+
+
+def get_sonic_balance(address: str) -> dict:
+    return {}
+
+
+
+def transfer_sonic_tokens(to_address: str, amount: str, private_key: str) -> dict:
+    return {}
+
+
+
+class RecordingLlm(BaseLlm):
+    # Yields `responses` (raising any exception among them) and keeps a copy
+    # of every request as it arrived. With `meddle` it edits the request in
+    # place afterwards, as the real models do when they add their own config.
+    responses: list = []
+    meddle: bool = False
+    finished: bool = False
+    requests: list = []
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.requests.append(llm_request.model_copy(deep=True))
+        if self.meddle:
+            llm_request.contents[0].parts[0].text += " (edited)"
+            llm_request.contents.append(types.Content(role="model", parts=[types.Part(text="scratch")]))
+            llm_request.config.system_instruction = "Rewritten."
+        for response in self.responses:
+            if isinstance(response, Exception):
+                raise response
+            yield response.model_copy(deep=True)
+        self.finished = True
+
+
+
+def text(value: str, **fields) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=value)]), **fields)
+
+
+
+def call(name: str, **args) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+
+
+def answer(name: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(name=name, response={}))])
+
+
+
+def request(prompt: str, history: list = (), writes: bool = True) -> LlmRequest:
+    tools = [get_sonic_balance] + ([transfer_sonic_tokens] if writes else [])
+    return LlmRequest(
+        model="tiered",
+        contents=[types.Content(role="user", parts=[types.Part(text=prompt)]), *history],
+        config=types.GenerateContentConfig(system_instruction="Answer briefly.", temperature=0.2),
+        tools_dict={tool.__name__: FunctionTool(tool) for tool in tools},
+    )
+
+
+
+def tiers(fast_responses: list = None, meddle: bool = False, **options):
+    fast = RecordingLlm(model="fast-model", responses=fast_responses or [text("Fast answer.")], meddle=meddle)
+    strong = RecordingLlm(model="strong-model", responses=[text("Strong answer.")])
+    llm = TieredLlm(fast=fast, strong=strong, write_tools=("transfer_sonic_tokens",),
+                    signing_tools=("transfer_sonic_tokens",), **options)
+    return llm, fast, strong
+
+
+
+def generate(llm: TieredLlm, llm_request: LlmRequest, stream: bool = False) -> list:
+    async def collect():
+        return [response async for response in llm.generate_content_async(llm_request, stream)]
+    return asyncio.run(collect())
+
+
+
+def answered_by(responses: list) -> set:
+    return {response.model_version for response in responses}
+
+
+
+def test_simple_question_is_answered_by_the_fast_tier():
+    llm, fast, strong = tiers()
+    responses = generate(llm, request(f"What is the balance of {ADDRESS}?"))
+    assert answered_by(responses) == {"fast-model"}
+    assert [response.content.parts[0].text for response in responses] == ["Fast answer."]
+    assert fast.requests[0].model == "fast-model" and not strong.requests
+    assert llm.stats()["routed"] == {("fast", "simple"): 1}
+    assert llm.stats()["calls"] == {("fast", "success"): 1}
+
+
+
+@pytest.mark.parametrize("prompt, history, writes, reason", [
+    (f"Send 5 S to {ADDRESS}", [], True, "signing"),
+    (f"Is {ADDRESS} a contract? " + "Some background on what I am after. " * 12, [], True, "long"),
+    (f"Compare {ADDRESS} with {OTHER}", [], True, "multi_step"),
+    ("Check my wallet", [call("transfer_sonic_tokens", to_address=ADDRESS, amount="1", private_key="0x1"),
+                         answer("transfer_sonic_tokens")], True, "signing"),
+    ("Check my wallet", [call("get_sonic_balance", address=ADDRESS), answer("get_sonic_balance")] * 3,
+     True, "multi_step"),
+])
+def test_routing_sends_hard_turns_to_the_strong_tier(prompt, history, writes, reason):
+    llm, fast, strong = tiers()
+    responses = generate(llm, request(prompt, history, writes))
+    assert answered_by(responses) == {"strong-model"}
+    assert not fast.requests and strong.requests[0].model == "strong-model"
+    assert llm.stats()["routed"] == {("strong", reason): 1}
+
+
+
+def test_signing_words_without_write_tools_stay_on_the_fast_tier():
+    llm, fast, strong = tiers()
+    responses = generate(llm, request(f"How do I send S to {ADDRESS}", writes=False))
+    assert answered_by(responses) == {"fast-model"}
+    assert llm.stats()["routed"] == {("fast", "simple"): 1}
+
+
+
+def test_two_tool_rounds_stay_under_the_round_limit():
+    llm, fast, strong = tiers()
+    history = [call("get_sonic_balance", address=ADDRESS), answer("get_sonic_balance")] * 2
+    assert answered_by(generate(llm, request("Check my wallet", history))) == {"fast-model"}
+
+
+
+def test_fast_stream_is_held_back_until_complete():
+    chunks = [text("Fast ", partial=True), text("answer", partial=True), text("Fast answer.")]
+    llm, fast, strong = tiers(chunks)
+
+    async def collect():
+        seen = []
+        async for response in llm.generate_content_async(request("What is the latest block?"), True):
+            # Nothing reaches the caller while the fast model is still going.
+            assert fast.finished
+            seen.append(response)
+        return seen
+
+    responses = asyncio.run(collect())
+    assert [response.content.parts[0].text for response in responses] == ["Fast ", "answer", "Fast answer."]
+    assert [response.partial for response in responses] == [True, True, None]
+    assert not strong.requests
+
+
+
+@pytest.mark.parametrize("fast_responses, weakness", [
+    ([text("Fast ", partial=True), LlmResponse(error_code="SAFETY", error_message="blocked")], "error"),
+    ([RuntimeError("quota exhausted")], "exception"),
+    ([LlmResponse(content=types.Content(role="model", parts=[types.Part(text="")]))], "empty"),
+    ([text("Fast answ", finish_reason=types.FinishReason.MAX_TOKENS)], "finish_reason"),
+    ([LlmResponse(content=call("transfer_sonic_tokens", to_address=ADDRESS, amount="1", private_key="0x1"))],
+     "signing"),
+    ([text("Probably fine.", avg_logprobs=-2.5)], "low_confidence"),
+])
+def test_weak_fast_answers_escalate_with_the_original_request(fast_responses, weakness):
+    llm, fast, strong = tiers(fast_responses, meddle=True, min_avg_logprob=-1.0)
+    original = request("What is the latest block?")
+    responses = generate(llm, original.model_copy(deep=True), stream=True)
+    assert answered_by(responses) == {"strong-model"}
+    assert [response.content.parts[0].text for response in responses] == ["Strong answer."]
+    # The fast model's edits are undone before the strong retry.
+    sent = strong.requests[0]
+    assert sent.contents == original.contents
+    assert sent.config == original.config
+    assert llm.stats()["escalations"] == {weakness: 1}
+    assert llm.stats()["calls"] == {("fast", "escalated"): 1, ("strong", "success"): 1}
+
+
+
+def test_confident_answer_is_kept_above_the_logprob_floor():
+    llm, fast, strong = tiers([text("Block 5000000.", avg_logprobs=-0.2)], min_avg_logprob=-1.0)
+    assert answered_by(generate(llm, request("What is the latest block?"))) == {"fast-model"}
+    assert not strong.requests